@@ -108,7 +108,7 @@ def _get_data(url: str, algorithm_id: str, start: datetime, stop: datetime,
         # 如果输入的时间不是整小时数
         # 需要做切割
         if sep_start < start < sep_end or sep_start < stop < sep_end:
-            for f in cache.generator():
+            for f in cache.iter_cursor():
                 if f.time > stop:
                     break
                 if f.time >= start:
@@ -313,7 +313,7 @@ def _do_request(url: str, algorithm_id: str, start: datetime, stop: datetime,
         if column.has_hrtime(select_column):
             hr_curr_time = None
             reso = reso or config.HF_RESOLUTION
-            for feature in flist.generator():
+            for feature in flist.iter_cursor():
                 feature.hrtime = lrtime_to_hrtime(hr_curr_time, feature.time, reso)
                 hr_curr_time = feature.time
         return flist
@@ -125,7 +125,7 @@ def parse_stat_history(algorithm_id: str, node_id: int,
     """
     result = list()
 
-    for ritem in final_result.generator():
+    for ritem in final_result.iter_cursor():
         if ritem.stat_item is None:
             continue
 
@@ -241,10 +241,33 @@ class Configure(BaseConfigure):
     # 容器最大容量，超过容量将删除溢出的数据
     CONTAINER_MAXLEN = 60 * 60 * 1
     RESULT_MAXLEN = 60 * 60 * 4
+    # 容器字段的储存方式, 详细见scdap.data.storage
+    # list: 所有字段使用list储存
+    # ring: 标量字段(meanhf/mean/status/time等)使用numpy环形缓冲储存, 删除溢出数据为O(1), 获取范围数据时返回视图
+    # matrix: 在ring的基础上, 定长的高分特征字段(feature1~4等)使用(maxlen, width)的二维矩阵储存
+    # ring/matrix下时间字段以int64毫秒时间戳储存, 高分时间只在读取的时候生成
+    CONTAINER_STORAGE = 'list'
+    RESULT_STORAGE = 'list'
     # 在mq模式下如果数据发送失败则将缓存数据
     # 该参数用于配置最多的数据缓存量
     RESULT_CACHELEN = RESULT_MAXLEN * 2
 
+    # 汇总算法工作组中子算法工作组的执行方式, 可通过option.extra.worker.sub_executor配置
+    # serial: 按照配置的顺序逐个计算
+    # thread: 使用线程池并行计算, 适用于计算时会释放GIL的算法(numpy等)
+    # 所有子算法工作组计算完毕后才会运行汇总算法
+    SUMMARY_SUB_EXECUTOR = 'serial'
+    # 线程池的线程数量, 可通过option.extra.worker.sub_pool_size配置, 0代表与子算法工作组的数量相同
+    SUMMARY_SUB_POOL_SIZE = 0
+
+    # 多设备(非md)算法工作组中各个点位的执行方式, 可通过option.extra.worker.device_executor配置
+    # serial: 所有点位在同一个线程中逐笔轮流计算, 所有点位共享同一个算法实例
+    # thread: 每一个点位拥有独立的算法实例, 各个点位在线程池中并行计算, 同一个点位的数据依旧按照顺序计算
+    #         注意该模式下算法内部的缓存不再在点位之间共享
+    DEVICE_EXECUTOR = 'serial'
+    # 线程池的线程数量, 可通过option.extra.worker.device_pool_size配置, 0代表与点位的数量相同
+    DEVICE_POOL_SIZE = 0
+
     # 算法进程默认的定时更新时间
     # [day, hour, minute, second]
     PROGRAM_CRONTAB_TIME = [1, 0, 0, 0]
@@ -309,11 +332,25 @@ class Configure(BaseConfigure):
     # 考虑到进程在k8s管理下拥有10s左右的存活探针
     # 所以应配置堵塞超时时间 < 10s
     RABBITMQ_GET_TIMEOUT = 3
+    # 单次获取数据的最大数量, <= 0则返回所有已经就绪的数据
+    # 在mq服务恢复等数据积压的情况下, 可以在一次循环中处理大量的积压数据
+    # 多个设备的数据将轮流抛出
+    RABBITMQ_GET_BATCH_SIZE = 1000
+    # 获取到第一笔数据后, 最多再等待的时间(s), 以便积累更多的数据进行批量计算
+    # 会增加等量的数据延迟, 0则不等待
+    RABBITMQ_GET_LINGER = 0.005
     # 订阅的route_key前缀规则
     # scene.x/scene.#/scene.*
     RABBITMQ_GET_ROUTING_KEY_PREFIX = 'scene'
     # 队列名称前缀, 主要是用来防止mq中队列名称冲突
     RABBITMQ_GET_QUEUE_NAME_PERFIX = 'dap.process.get'
+    # 特征数据二进制编码格式的content-type
+    # 数据的content-type与该配置一致时使用二进制格式解码, 否则默认使用json格式解码
+    # 二进制格式的结构见scdap.transfer.rabbitmq.get.binary
+    RABBITMQ_GET_BINARY_CONTENT_TYPE = 'application/x-scdap-feature'
+    # 是否在数据容器中保留每一笔json格式特征数据的原始字符串
+    # 发送控制器配置has_feature时将直接使用原始字符串作为结果数据中的特征数据, 无需重新编码
+    RABBITMQ_GET_KEEP_RAW = False
 
     # 队列因为一些机制原因, 在批量传数据的时候
     # 后端数据推送到rabbitmq中, mq中因为通道机制的存在(并发的通道)
@@ -322,10 +359,47 @@ class Configure(BaseConfigure):
     # 所以mq中会配置一个顺序队列来进行排序
     # 该参数用于配置顺序队列发现顺序错误的容忍时长
     MAX_ENDURANCE_LIMIT = 60
+    # 是否使用单独的网络线程进行mq数据的获取与发送
+    # kombu的连接不支持多线程, 数据获取与发送控制器共享同一个连接, 所以该配置对两者同时生效
+    # 开启后计算线程只负责计算, 网络线程将获取的数据放入输入队列, 并发送输出队列(发送缓存)中的结果数据
+    RABBITMQ_IO_THREAD = False
+    # 网络线程中获取数据的堵塞超时时间, 单位秒, 应尽可能的小以免堵塞结果数据的发送
+    RABBITMQ_IO_POLL_TIMEOUT = 0.1
+    # 网络线程与计算线程之间输入队列的容量
+    # 计算跟不上数据的速度导致输入队列满了的时候, 网络线程将暂停获取数据, 数据会保留在mq服务中
+    RABBITMQ_IO_INBOUND_SIZE = 10000
+    # 计算线程将结果数据放入输出队列时的最长等待时间, 单位秒
+    # 输出队列的容量与发送缓存的容量(cachelen)一致, mq服务无法发送数据导致输出队列满了的时候计算线程将等待
+    # 等待超时后该笔结果数据将被抛弃并输出错误日志
+    RABBITMQ_IO_OUTBOUND_TIMEOUT = 60
     # 算法结果发送的对应交换机
     RABBITMQ_SEND_EXCHANGE = ''
     # 算法计算结果后发送的队列名称
     RABBITMQ_SEND_QUEUE_NAME = 'py.compute.result'
+    # 发送数据时缓存队列存在的时长, 单位秒
+    # 在缓存时长内发送数据不再向mq服务确认队列是否存在, 发送失败时缓存将失效
+    # 需要注意的是向不存在的队列发送数据时mq服务并不会报错, 所以在缓存时长内队列被删除的话, 发送的数据将会丢失
+    # 默认为0, 即每一次发送数据前都向mq服务确认队列是否存在, 只在队列不会被删除的环境下配置
+    RABBITMQ_SEND_QUEUE_TTL = 0
+    # 是否批量发送结果数据
+    # 开启后每一次发送时只确认一次队列是否存在, 之后连续发送所有缓存的结果数据
+    RABBITMQ_SEND_BATCH = False
+    # 批量发送时是否使用发布确认(publisher confirms), 确认失败的数据将重新放回缓存等待重新发送
+    RABBITMQ_SEND_CONFIRM = False
+    # 发布确认的超时时间, 单位秒
+    RABBITMQ_SEND_CONFIRM_TIMEOUT = 5
+    # 结果数据的合并发送方式, 合并后的多笔结果数据将以json数组的形式作为一条mq数据发送
+    # 数据的headers中将包含{'x-result-format': 'json-array'}用于标识合并的格式
+    # none: 不合并, 每一笔结果数据单独发送
+    # device: 按照设备合并
+    # process: 合并进程中所有设备的结果数据
+    RABBITMQ_SEND_COALESCE = 'none'
+    # 合并发送时一条mq数据中最多包含的结果数据数量, <= 0则不限制
+    RABBITMQ_SEND_COALESCE_COUNT = 100
+    # 合并发送时一条mq数据最大的json字符串长度, <= 0则不限制
+    RABBITMQ_SEND_COALESCE_SIZE = 1024 * 1024
+    # 合并发送时最早一笔结果数据的最长等待时长, 单位秒
+    RABBITMQ_SEND_COALESCE_AGE = 10
 
     # -----------------------------------------------------------------------
     #                              REDIS CONFIG
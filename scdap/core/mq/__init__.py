@@ -5,3 +5,4 @@
 from .data_sender import DataSender
 from .data_getter import DataGetter
 from .data_broadcast import DataBroadcast
+from .network import NetworkThread
@@ -29,14 +29,16 @@ class DataBroadcast(object):
         """
         self._exchanges[exchange_name] = self._mqbase.get_exchange(exchange_name, exchange_type)
 
-    def broadcast(self, exchange_name: str, data: Union[list, dict], routing_key: str, seq: int = -1) -> bool:
+    def broadcast(self, exchange_name: str, data: Union[list, dict, bytes], routing_key: str, seq: int = -1,
+                  content_type: str = None) -> bool:
         """
         广播数据
 
         :param exchange_name: 交换机名称
-        :param data: 数据
+        :param data: 数据, 二进制数据将直接发送, 否则使用json序列化
         :param routing_key: 路由键
         :param seq: 序列号
+        :param content_type: 数据的content-type
         :return: 是否发送成功
         """
         exchange = self._exchanges[exchange_name]
@@ -44,7 +46,10 @@ class DataBroadcast(object):
             exchange.declare(passive=True)
         except:
             return False
-        message = Message(json.dumps(data, ensure_ascii=False), application_headers={'seq': seq})
+        if not isinstance(data, bytes):
+            data = json.dumps(data, ensure_ascii=False)
+        properties = {'content_type': content_type} if content_type else dict()
+        message = Message(data, application_headers={'seq': seq}, **properties)
         exchange.publish(message, routing_key)
         return True
 
@@ -4,8 +4,9 @@
 """
 import time
 from datetime import datetime
-from queue import PriorityQueue
-from typing import Dict, Optional, Tuple, Union, List
+from collections import deque
+from heapq import heappush, heappop
+from typing import Dict, Optional, Tuple, Union, List, Iterable
 
 from scdap.logger import LoggerInterface
 
@@ -13,6 +14,11 @@ from .base import MQBaseClass, Consumer, Queue, Message, Exchange
 
 
 DEFAULT_SEQ = 0
+# 批量获取数据时, 在已经有数据的情况下继续获取mq中已经到达的数据所使用的超时时间
+# 该超时时间只用于判断mq中是否还有已经到达的数据, 所以应尽可能的小
+DRAIN_TIMEOUT = 0.001
+# batch_size <= 0时单次get_data()最多从mq中获取的数据数量, 防止数据源源不断时无法返回
+MAX_DRAIN_SIZE = 10000
 
 
 class _DataQueue(object):
@@ -25,12 +31,14 @@ class _DataQueue(object):
 
 
 class MessageData(object):
-    __slots__ = ['data', 'routing_key', 'seq']
+    __slots__ = ['data', 'routing_key', 'seq', 'content_type']
 
-    def __init__(self, data: str = None, routing_key: str = None, seq: int = DEFAULT_SEQ):
+    def __init__(self, data: Union[str, bytes] = None, routing_key: str = None, seq: int = DEFAULT_SEQ,
+                 content_type: str = None):
         self.data = data
         self.routing_key = routing_key
         self.seq = seq
+        self.content_type = content_type
 
     def __repr__(self):
         return self.__str__()
@@ -58,7 +66,12 @@ class MessageData(object):
 
 
 class SequenceQueue(LoggerInterface):
+    """
+    按照seq排序的顺序队列
+    使用heapq实现, put的复杂度为O(log n), 查看最前面一个数据的复杂度为O(1)
+    DataGetter不支持多线程, 所以该队列也不需要加锁
 
+    """
     def interface_name(self):
         return f'SequenceQueue:{self._name}'
 
@@ -69,7 +82,9 @@ class SequenceQueue(LoggerInterface):
         self._name = name
         self._maxlen = maxlen
         # 获取一个顺序的和长度的队列，顺序为从低到高
-        self._queue = PriorityQueue(maxsize=maxlen)
+        # 队列中的数据为(seq, 写入顺序, data), 写入顺序用于保证seq相同的数据按照写入顺序抛出
+        self._queue: List[Tuple[int, int, MessageData]] = list()
+        self._put_count = 0
         # 当前的数据编号，默认起始为0
         self._current_seq = DEFAULT_SEQ
         # 当前的时间戳
@@ -87,12 +102,27 @@ class SequenceQueue(LoggerInterface):
         # 2.正常的准备被抛出的数据
         self._ready_queue = list()
 
+        # 统计信息
+        # 目前接收到的最大的seq, 用于判断数据是否乱序到达
+        self._max_seq = DEFAULT_SEQ
+        # 乱序到达的数据数量
+        self._reorders = 0
+        # 因为seq不连续而堵塞的次数, 连续的堵塞只记一次
+        self._gap_waits = 0
+        self._waiting = False
+        # 超过忍耐极限而无视顺序直接抛出的次数
+        self._forced_releases = 0
+        # 因为队列溢出而无视顺序直接抛出的数据数量
+        self._overflow_drops = 0
+        # seq <= current_seq而被遗弃的数据数量
+        self._stale_drops = 0
+
     def __str__(self):
         return f'name: {self._name}, ' \
                f'size: {self.size()}({self._maxlen}), ' \
                f'current_seq: {self._current_seq}, ' \
                f'el: {datetime.fromtimestamp(self._endurance_limit_timestamp)}(max_el={self._max_endurance_limit}), ' \
-               f'queue: {self._queue.queue}'
+               f'queue: {sorted(item[-1] for item in self._queue)}'
 
     def __repr__(self):
         return self.__str__()
@@ -116,36 +146,48 @@ class SequenceQueue(LoggerInterface):
 
         :return:
         """
-        return self._queue.queue[0].seq
+        return self._queue[0][0]
+
+    def _pop(self) -> MessageData:
+        return heappop(self._queue)[-1]
 
     def put(self, obj: MessageData):
         # 在 self._current_seq == DEFAULT_SEQ时代表队列刚开始接收数据
         # 此时直接配置_current_seq为第一个obj的seq
         if self._current_seq <= DEFAULT_SEQ or obj.seq <= DEFAULT_SEQ:
             self._current_seq = obj.seq - 1
+            self._max_seq = obj.seq
             # 发现队列序列号重置了
             # 则将队列中的所有数据直接抛出
-            while not self._queue.empty():
-                self._ready_queue.append(self._queue.get())
+            while self._queue:
+                self._ready_queue.append(self._pop())
 
         # 只允许存入seq > self._current_seq的数据
         # 小于的直接抛弃
         if obj.seq <= self._current_seq:
+            self._stale_drops += 1
             self.logger_warning(f'put() -> 新的一笔数据的seq={obj.seq} <= current_seq={self._current_seq}, 该段将被遗弃.')
             return
 
-        self._queue.put(obj)
+        if obj.seq < self._max_seq:
+            self._reorders += 1
+        else:
+            self._max_seq = obj.seq
+
+        heappush(self._queue, (obj.seq, self._put_count, obj))
+        self._put_count += 1
 
         # 如果当前的数量已经和最大队列数相同
         # 新增数据意味着最前面的数据将被抛弃
         # 导致first_seq发生了变化
         # 所以当发现队列满了的时候
         # 需要修改self._current_seq
-        if self._queue.qsize() >= self._maxlen:
+        if len(self._queue) >= self._maxlen:
             # 将因为溢出而抛弃的数据放到溢出队列中
             # 在下一次get的时候直接抛出
-            self._ready_queue.append(self._queue.get())
+            self._ready_queue.append(self._pop())
             self._current_seq = self._first_seq() - 1
+            self._overflow_drops += 1
             self.logger_warning(f'put() -> 队列溢出({self.size()}({self._maxlen})), '
                                 f'将在下一次get()时返回直接返回.')
 
@@ -165,26 +207,21 @@ class SequenceQueue(LoggerInterface):
 
     def _get_single(self) -> MessageData:
         self._update_endurance_limit()
-        obj = self._queue.get()
+        self._waiting = False
+        obj = self._pop()
         self._current_seq = obj.seq
         return obj
 
     def _get(self, force: bool = False) -> Optional[MessageData]:
 
-        if self._queue.empty():
+        if not self._queue:
             self._update_endurance_limit()
+            self._waiting = False
             return None
 
         if force:
             return self._get_single()
 
-        # if self._first_seq() <= self._current_seq:
-        #     self._queue.get()
-        #     self.logger_warning(f'get() -> 最前一个数据的seq序列为{self._first_seq()} <= {self._current_seq}将被抛弃.')
-        #     if self._queue.empty():
-        #         self._update_endurance_limit()
-        #         return None
-
         # 只允许根据seq的顺序抛出
         # 既最前面一个数据(index=0, 队列最左边准备被get的数据) 必须是按顺序的
         # 1. first_seq = current_seq + 1 -> 抛出 -> 最正常的状态, 每一笔数据都是按顺序的
@@ -194,29 +231,66 @@ class SequenceQueue(LoggerInterface):
             return self._get_single()
 
         if self._out_of_endurance_limit():
+            self._forced_releases += 1
             self.logger_warning(f'get() -> 超过seq序列顺序错误容忍极限, '
                                 f'最前一个数据(seq={self._first_seq()})将被无视顺序直接返回.')
             return self._get_single()
 
+        if not self._waiting:
+            self._waiting = True
+            self._gap_waits += 1
         self.logger_warning(f'get() -> '
                             f'first_seq={self._first_seq()} != {self._current_seq + 1}, '
-                            f'qsize={self._queue.qsize()}({self._maxlen}), '
+                            f'qsize={len(self._queue)}({self._maxlen}), '
                             f'堵塞数据直到序列顺序正确.')
         return None
 
     def empty(self):
-        return self._queue.empty() and not self._ready_queue
+        return not self._queue and not self._ready_queue
 
     def size(self):
-        return self._queue.qsize() + len(self._ready_queue)
+        return len(self._queue) + len(self._ready_queue)
 
     def clear(self):
-        self._queue = PriorityQueue(maxsize=self._maxlen)
+        self._queue.clear()
         self._ready_queue.clear()
+        self._waiting = False
 
     def reset(self):
         self.clear()
         self._current_seq = DEFAULT_SEQ
+        self._max_seq = DEFAULT_SEQ
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取统计信息
+
+        :return: 统计信息
+            reorders:           乱序到达的数据数量
+            gap_waits:          因为seq不连续而堵塞的次数, 连续的堵塞只记一次
+            forced_releases:    超过忍耐极限而无视顺序直接抛出的次数
+            overflow_drops:     因为队列溢出而无视顺序直接抛出的数据数量
+            stale_drops:        seq <= current_seq而被遗弃的数据数量
+            depth:              当前队列中的数据数量
+        """
+        return {
+            'reorders': self._reorders,
+            'gap_waits': self._gap_waits,
+            'forced_releases': self._forced_releases,
+            'overflow_drops': self._overflow_drops,
+            'stale_drops': self._stale_drops,
+            'depth': self.size()
+        }
+
+    def reset_stats(self):
+        """
+        清空统计信息
+        """
+        self._reorders = 0
+        self._gap_waits = 0
+        self._forced_releases = 0
+        self._overflow_drops = 0
+        self._stale_drops = 0
 
 
 class DataGetter(object):
@@ -227,8 +301,13 @@ class DataGetter(object):
 
     def __init__(self, host: str, port: int, user: str, password: str,
                  vhost: str = None, heartbeat: int = None, new_mqbase: bool = False,
-                 max_endurance_limit: int = 0, endurance_time_func=time.time):
+                 max_endurance_limit: int = 0, endurance_time_func=time.time,
+                 binary_content_types: Iterable[str] = (), batch_size: int = 1):
         args = (host, port, user, password, vhost, heartbeat)
+        # 单次get_data()最多返回的数据数量, <= 0则返回所有已经就绪的数据
+        self._batch_size = batch_size
+        # 这些content-type的数据将不进行解码, 直接保存原始的二进制数据
+        self._binary_content_types = frozenset(binary_content_types)
         # 与sequencequeue相关的参数
         self._max_endurance_limit = max_endurance_limit
         self._endurance_time_func = endurance_time_func
@@ -246,7 +325,15 @@ class DataGetter(object):
         # 所以mq中会配置一个顺序队列来进行排序
         self._data_queue_dict: Dict[str, SequenceQueue] = dict()
         self._data_queue_list: List[SequenceQueue] = list()
-        self._default_data_queue: list = list()
+        # 没有登记顺序队列的数据
+        self._default_data_queue: deque = deque()
+        # 已经可以抛出的数据, 与_data_queue_list一一对应, 最后一个为_default_data_queue
+        # get_data()时将轮询这些队列, 每一个队列每一轮只抛出一笔数据
+        self._ready_queue_list: List[deque] = [self._default_data_queue]
+        # 下一次轮询时最先抛出数据的队列
+        self._ready_index = 0
+        # 在get_data()中通过回调接收的数据数量
+        self._received = 0
 
         # 缓存注册的队列信息
         self._add_info: Dict[str, Tuple] = dict()
@@ -271,10 +358,13 @@ class DataGetter(object):
         # 那么就会通知调用到这个方法
         # 也就意味着可能数据会被冲刷掉
         # 所以要在这里以队列的形式保存数据
-        data = MessageData(message.decode(),
+        content_type = message.content_type
+        data = MessageData(message.body if content_type in self._binary_content_types else message.decode(),
                            message.delivery_info['routing_key'],
-                           message.headers.get('seq', DEFAULT_SEQ))
+                           message.headers.get('seq', DEFAULT_SEQ),
+                           content_type)
         message.ack()
+        self._received += 1
         queue = self._data_queue_dict.get(data.routing_key)
         if queue:
             queue.put(data)
@@ -309,12 +399,16 @@ class DataGetter(object):
             routing_key = [routing_key]
 
         for key in routing_key:
+            # 重连时会重新登记队列, 此时沿用原先的顺序队列
+            if key in self._data_queue_dict:
+                continue
             seq_queue = SequenceQueue(f'{self.__class__.__name__}:{key}',
                                       max(self._max_endurance_limit * 3, 1),
                                       self._max_endurance_limit,
                                       self._endurance_time_func)
             self._data_queue_dict[key] = seq_queue
             self._data_queue_list.append(seq_queue)
+            self._ready_queue_list.insert(-1, deque())
 
     def has_queue(self, queue: Union[str, int, Queue]) -> bool:
         """
@@ -327,45 +421,84 @@ class DataGetter(object):
             queue = self._queues[queue]
         return self._mqbase.has_queue(queue)
 
+    def get_sequence_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        获取各个顺序队列的统计信息, 详见SequenceQueue.stats()
+
+        :return: routing_key -> 统计信息
+        """
+        return {key: queue.stats() for key, queue in self._data_queue_dict.items()}
+
     def declare_queue(self, queue_name: str):
         self._queues[queue_name].queue.queue_declare()
 
-    def _get_data(self) -> List[MessageData]:
+    def _update_ready(self) -> int:
         """
-        轮询调用数据的机制
-        确保每一个点为的数据会被轮询的调用与发送
+        将顺序队列中可以抛出的数据放入对应的就绪队列
+
+        :return: 就绪的数据数量
         """
-        for queue in self._data_queue_list:
+        size = len(self._default_data_queue)
+        for queue, ready in zip(self._data_queue_list, self._ready_queue_list):
             val = queue.get()
             if val:
-                self._default_data_queue.extend(val)
-
-        # result = self._default_data_queue.copy()
-        # self._default_data_queue.clear()
-        # return result
+                ready.extend(val)
+            size += len(ready)
+        return size
 
-        if self._default_data_queue:
-            return [self._default_data_queue.pop(0)]
+    def _get_data(self) -> List[MessageData]:
+        """
+        轮询调用数据的机制
+        确保每一个点为的数据会被轮询的调用与发送
+        每一轮每一个队列只抛出一笔数据, 下一次调用时从上一次停下的队列继续轮询
+        """
+        self._update_ready()
+
+        count = len(self._ready_queue_list)
+        start = self._ready_index % count
+        active = deque()
+        for index in range(start, start + count):
+            index %= count
+            if self._ready_queue_list[index]:
+                active.append(index)
+
+        limit = self._batch_size if self._batch_size > 0 else None
+        result = list()
+        while active and (limit is None or len(result) < limit):
+            index = active.popleft()
+            ready = self._ready_queue_list[index]
+            result.append(ready.popleft())
+            if ready:
+                active.append(index)
+            self._ready_index = index + 1
 
-        return []
+        return result
 
-    def get_data(self, timeout: Union[int, float] = 3) -> List[MessageData]:
+    def get_data(self, timeout: Union[int, float] = 3, linger: float = 0) -> List[MessageData]:
         """
         获取数据
+        最多返回batch_size笔数据, 在数据积压的时候可以一次性获取大量的数据
 
         :param timeout: 超时时间
+        :param linger: 获取到第一笔数据后, 最多再等待linger秒以获取更多的数据, 以便批量计算
         :return: queue_name, 获取的数据
         """
-        val = self._get_data()
-        if val:
-            return val
+        limit = self._batch_size if self._batch_size > 0 else MAX_DRAIN_SIZE
+        size = self._update_ready()
+        if size >= limit:
+            return self._get_data()
 
         # 注意其他mq的类也会调用drain_events从而可能触发回调callback
-        self._mqbase.drain_events(timeout=timeout)
-        # 加一个计数器, 防止无限循环卡住
-        # count = 0
-        # while cou/nt < 60 and self._mqbase.drain_events(timeout=timeout or 0.1):
-        #     count += 1
+        # 没有任何就绪的数据时才需要堵塞等待
+        self._received = 0
+        if self._mqbase.drain_events(timeout=DRAIN_TIMEOUT if size else timeout):
+            # 继续获取mq中已经到达的数据, 直到获取的数据数量达到limit, 或者超过linger后mq中没有数据
+            # 加一个计数器, 防止无限循环卡住
+            count = 1
+            deadline = time.time() + linger
+            while count < limit and self._received + size < limit \
+                    and self._mqbase.drain_events(timeout=max(deadline - time.time(), DRAIN_TIMEOUT)):
+                count += 1
 
         return self._get_data()
 
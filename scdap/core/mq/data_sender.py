@@ -2,19 +2,87 @@
 
 @create on: 2020.10.21
 """
-from typing import Dict, Tuple, Union
+import time
+from typing import Dict, Tuple, Union, List, Set, Optional
 from .base import MQBaseClass, SimpleQueue, Exchange, Queue
 
 
+class PublishConfirmError(Exception):
+    """
+    发布确认失败, mq服务拒绝了数据或者在超时时间内没有确认
+    """
+    pass
+
+
+class _PublishConfirm(object):
+    """
+    发布确认(publisher confirms)
+    开启后mq服务会按照通道内的发布顺序(delivery_tag, 从1开始)确认每一笔数据
+    批量发布时只需要在发布完所有数据后等待一次确认
+    """
+    def __init__(self, channel):
+        channel.confirm_select()
+        channel.events['basic_ack'].add(self._on_ack)
+        channel.events['basic_nack'].add(self._on_nack)
+        self._published = 0
+        self._pending: Set[int] = set()
+        self._nacked = 0
+
+    def _confirm(self, delivery_tag: int, multiple: bool):
+        if multiple:
+            self._pending = {tag for tag in self._pending if tag > delivery_tag}
+        else:
+            self._pending.discard(delivery_tag)
+
+    def _on_ack(self, delivery_tag: int, multiple: bool):
+        self._confirm(delivery_tag, multiple)
+
+    def _on_nack(self, delivery_tag: int, multiple: bool):
+        size = len(self._pending)
+        self._confirm(delivery_tag, multiple)
+        self._nacked += size - len(self._pending)
+
+    def published(self):
+        """
+        记录一笔已经发布的数据
+        """
+        self._published += 1
+        self._pending.add(self._published)
+
+    def wait(self, mqbase: MQBaseClass, timeout: float):
+        """
+        等待所有已经发布的数据被确认
+
+        :param mqbase: 所使用的mq连接
+        :param timeout: 超时时间
+        """
+        deadline = time.time() + timeout
+        while self._pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                size = len(self._pending)
+                self._pending.clear()
+                raise PublishConfirmError(f'{size}笔数据在{timeout}s内没有被mq服务确认.')
+            mqbase.drain_events(timeout=remaining)
+
+        if self._nacked:
+            size = self._nacked
+            self._nacked = 0
+            raise PublishConfirmError(f'{size}笔数据被mq服务拒绝.')
+
+
 class _DataQueue(object):
     def __init__(self, exchange_name: str, queue_name: str, exchange: Exchange, queue: Queue,
-                 simple_queue: SimpleQueue):
+                 simple_queue: SimpleQueue, confirm: Optional[_PublishConfirm] = None):
         self.exchange = exchange
         self.queue = queue
         self.exchange_name = exchange_name
         self.queue_name = queue_name
         self.simple_queue = simple_queue
         self.routing_key = self.queue.routing_key
+        self.confirm = confirm
+        # 队列存在的缓存过期时间戳
+        self.expire = 0.
 
 
 class DataSender(object):
@@ -24,9 +92,19 @@ class DataSender(object):
     """
 
     def __init__(self, host: str, port: int, user: str, password: str,
-                 vhost: str = None, heartbeat: int = None, new_mqbase: bool = False):
+                 vhost: str = None, heartbeat: int = None, new_mqbase: bool = False,
+                 queue_ttl: float = 0, confirm: bool = False, confirm_timeout: float = 5,
+                 time_func=time.time):
         args = (host, port, user, password, vhost, heartbeat)
         self._mqbase = MQBaseClass(*args) if new_mqbase else MQBaseClass.get_instance(*args)
+        # 队列存在的缓存时长, 单位秒, <= 0则每一次发送数据前都向mq服务确认队列是否存在
+        # 发送数据失败时缓存将失效
+        # 但是向已经被删除的队列发送数据时不会失败, 缓存时长内的数据将会丢失, 所以默认不启用
+        self._queue_ttl = queue_ttl
+        self._time_func = time_func
+        # 是否在批量发送数据时使用发布确认
+        self._confirm = confirm
+        self._confirm_timeout = confirm_timeout
         # 添加的队列
         self._queues: Dict[str, _DataQueue] = dict()
         # 在重连时缓存已经注册的队列信息
@@ -56,7 +134,8 @@ class DataSender(object):
         exchange = self._mqbase.get_exchange(exchange_name, **exchange_opts)
         queue = self._mqbase.get_queue(queue_name, exchange, **queue_opts)
         simple_queue = self._mqbase.get_simplequeue(queue)
-        data_queue = _DataQueue(exchange_name, queue_name, exchange, queue, simple_queue)
+        confirm = _PublishConfirm(simple_queue.producer.channel) if self._confirm else None
+        data_queue = _DataQueue(exchange_name, queue_name, exchange, queue, simple_queue, confirm)
         self._queues[queue_name] = data_queue
         self._add_info[queue_name] = (exchange_name, queue_name, exchange_opts, queue_opts)
 
@@ -72,20 +151,86 @@ class DataSender(object):
             queue = self._queues[queue]
         return self._mqbase.has_queue(queue)
 
-    def send_data(self, queue_name: Union[str, int], data: Union[str, list, dict], routing_key: str = None) -> bool:
+    def _check_queue(self, queue: _DataQueue) -> bool:
+        """
+        确认队列是否存在, 在缓存时长内不再重复向mq服务确认
+
+        :param queue: 队列
+        :return: 是否存在队列
+        """
+        now = self._time_func()
+        if queue.expire > now:
+            return True
+        if self._mqbase.has_queue(queue.queue):
+            queue.expire = now + self._queue_ttl
+            return True
+        return False
+
+    def invalidate_queue(self, queue_name: Union[str, int] = None):
+        """
+        使队列存在的缓存失效
+
+        :param queue_name: 队列名称, 为None则使所有队列的缓存失效
+        """
+        queues = self._queues.values() if queue_name is None else [self._queues[queue_name]]
+        for queue in queues:
+            queue.expire = 0.
+
+    @staticmethod
+    def _put(queue: _DataQueue, data: Union[str, list, dict], routing_key: str = None, **properties):
+        queue.simple_queue.put(data, routing_key=routing_key, **properties)
+        if queue.confirm:
+            queue.confirm.published()
+
+    def send_data(self, queue_name: Union[str, int], data: Union[str, list, dict], routing_key: str = None,
+                  **properties) -> bool:
         """
         发送数据
 
         :param queue_name: 队列名称
         :param data: 待发送的数据
         :param routing_key: 路由键
+        :param properties: 数据的其他属性, 如headers/content_type等
         :return: 是否存在队列并且发送成功
         """
         queue = self._queues[queue_name]
-        if self.has_queue(queue.queue):
-            queue.simple_queue.put(data, routing_key=routing_key)
+        if not self._check_queue(queue):
+            return False
+        try:
+            self._put(queue, data, routing_key, **properties)
+        except Exception:
+            # 发送失败时队列可能已经不存在了
+            queue.expire = 0.
+            raise
+        return True
+
+    def send_batch(self, queue_name: Union[str, int], data: List[Union[str, list, dict]],
+                   routing_key: str = None, **properties) -> bool:
+        """
+        批量发送数据, 只确认一次队列是否存在, 之后连续发送所有数据
+        如果开启了发布确认, 则在发送完所有数据后等待mq服务确认所有数据
+        发布确认失败时将抛出PublishConfirmError, 此时部分数据可能已经被mq服务接收
+
+        :param queue_name: 队列名称
+        :param data: 待发送的数据列表
+        :param routing_key: 路由键
+        :param properties: 数据的其他属性, 如headers/content_type等, 所有数据使用相同的属性
+        :return: 是否存在队列并且发送成功
+        """
+        queue = self._queues[queue_name]
+        if not data:
             return True
-        return False
+        if not self._check_queue(queue):
+            return False
+        try:
+            for obj in data:
+                self._put(queue, obj, routing_key, **properties)
+            if queue.confirm:
+                queue.confirm.wait(self._mqbase, self._confirm_timeout)
+        except Exception:
+            queue.expire = 0.
+            raise
+        return True
 
     def clear_node(self):
         """
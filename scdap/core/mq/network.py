@@ -0,0 +1,132 @@
+"""
+
+@create on: 2026.10.18
+
+mq网络线程
+kombu的连接不支持多线程, 所以共享同一个连接的数据获取与数据发送必须在同一个线程中进行
+网络线程负责轮流调用登记的网络任务, 例如:
+    1. 获取mq中的数据并放入有容量限制的输入队列, 由计算线程取出
+    2. 发送计算线程放入输出队列的结果数据
+这样计算线程只需要进行计算, 网络的等待与计算可以同时进行, mq服务缓慢时也不会堵塞算法的计算
+"""
+from time import sleep
+from threading import Thread, RLock, Lock, current_thread
+from typing import Callable, List, Optional, TypeVar
+
+from scdap.logger import LoggerInterface
+
+T = TypeVar('T')
+# 网络任务, 返回是否进行了任何的网络操作
+NetworkTask = Callable[[], bool]
+
+
+class NetworkThread(LoggerInterface):
+    """
+    网络线程
+    所有登记的任务都在同一个线程中轮流执行
+    在所有任务都没有进行任何网络操作时将睡眠idle_time秒
+    """
+    __instance__: Optional['NetworkThread'] = None
+    __instance_lock__ = Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'NetworkThread':
+        """
+        单例模式, 进程中共享同一个mq连接的所有控制器需要使用同一个网络线程
+        """
+        if cls.__instance__:
+            return cls.__instance__
+        with cls.__instance_lock__:
+            if cls.__instance__ is None:
+                cls.__instance__ = cls()
+            return cls.__instance__
+
+    @classmethod
+    def clear_instance(cls):
+        with cls.__instance_lock__:
+            if cls.__instance__:
+                cls.__instance__.stop()
+            cls.__instance__ = None
+
+    def interface_name(self):
+        return 'mq:network'
+
+    def __init__(self, idle_time: float = 0.01, join_timeout: float = 10):
+        self._idle_time = idle_time
+        self._join_timeout = join_timeout
+        self._tasks: List[NetworkTask] = list()
+        # 执行任务时将持有该锁, 用于在其他线程中安全的登记/移除任务以及操作mq连接
+        self._lock = RLock()
+        self._running = False
+        self._thread: Optional[Thread] = None
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def register(self, task: NetworkTask):
+        """
+        登记网络任务, 并且启动网络线程
+
+        :param task: 网络任务
+        """
+        with self._lock:
+            self._tasks.append(task)
+        self.start()
+
+    def unregister(self, task: NetworkTask):
+        """
+        移除网络任务, 在没有任何任务时将停止网络线程
+        返回时可以确保该任务不在执行中
+
+        :param task: 网络任务
+        """
+        with self._lock:
+            if task in self._tasks:
+                self._tasks.remove(task)
+            empty = not self._tasks
+        if empty:
+            self.stop()
+
+    def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        在没有执行任何网络任务的时候调用方法, 用于在其他线程中安全的操作mq连接
+
+        :param func: 需要调用的方法
+        :return: 方法的返回值
+        """
+        with self._lock:
+            return func(*args, **kwargs)
+
+    def start(self):
+        if self.is_alive():
+            return
+        self._running = True
+        self._thread = Thread(target=self._serve, name='scdap-mq-network', daemon=True)
+        self._thread.start()
+        self.logger_info('网络线程启动.')
+
+    def stop(self):
+        self._running = False
+        # 在网络线程中停止时无需等待
+        if self.is_alive() and self._thread is not current_thread():
+            self._thread.join(self._join_timeout)
+        self._thread = None
+
+    def _run_tasks(self) -> bool:
+        busy = False
+        with self._lock:
+            for task in list(self._tasks):
+                try:
+                    busy = task() or busy
+                except Exception as e:
+                    # 各个任务内部应自行处理网络异常
+                    # 这里只是防止网络线程因为异常而退出
+                    self.logger_error(f'网络任务执行失败, 错误: {e}')
+                    self.logger_exception(e)
+        return busy
+
+    def _serve(self):
+        while self._running:
+            if not self._run_tasks():
+                sleep(self._idle_time)
+        self.logger_info('网络线程停止.')
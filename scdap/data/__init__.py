@@ -11,3 +11,4 @@ from .container import Container
 from .result import Result
 
 from .coder import TYPE_JSON
+from .storage import STORAGE_LIST, STORAGE_RING, STORAGE_MATRIX
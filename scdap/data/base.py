@@ -3,7 +3,9 @@
 @create on: 2020.12.29
 """
 from copy import deepcopy
-from typing import Generic, TypeVar, List, Generator, Type
+from typing import Generic, TypeVar, List, Generator, Type, Tuple, Sequence, Iterator
+
+from .storage import check_storage, create_column, extend_column, column_rows
 
 
 class RefItem(object):
@@ -81,22 +83,89 @@ class RefItem(object):
         return f'[<{type(self).__name__}: {hex(id(self))}> {self.__str__()}]'
 
 
+# 按(RefItem类, 字段)缓存的游标类, 详细见cursor_class()
+_CURSOR_CLASS = dict()
+
+
+def _cursor_property(index: int):
+    def fget(self):
+        return self._columns[index][self._position]
+
+    def fset(self, value):
+        self._columns[index][self._position] = value
+
+    return property(fget, fset)
+
+
+def cursor_class(obj_class: type, select_keys: Tuple[str, ...]) -> type:
+    """
+    创建可复用的游标类, 游标类为obj_class的子类
+    与RefItem通过__getattr__逐次查找字段列表不同, 游标在创建时保存所有字段列表的引用,
+    每一个字段都是直接读取对应字段列表的property, 移动游标只需要修改position
+
+    :param obj_class: RefItem类
+    :param select_keys: 字段
+    :return: 游标类
+    """
+    cache_key = (obj_class, select_keys)
+    cls = _CURSOR_CLASS.get(cache_key)
+    if cls is None:
+        namespace = {key: _cursor_property(index) for index, key in enumerate(select_keys)}
+        cls = _CURSOR_CLASS[cache_key] = type(f'{obj_class.__name__}Cursor', (RowCursor, obj_class), namespace)
+    return cls
+
+
+class RowCursor(RefItem):
+    """
+    可复用的行游标, 由ItemList.cursor()/iter_cursor()创建
+    游标与RefItem的使用方式一致, 但是同一个游标会在移动之后指向其他的数据,
+    所以不能保存游标作为某一笔数据的引用, 需要保存的时候请使用ItemList.get_ref()
+
+    for ref in itemlist.iter_cursor():
+        xxx = ref.xxxx
+        ...
+    """
+    def __init__(self, item_list, select_keys: tuple, position: int):
+        super().__init__(item_list, select_keys, position)
+        self._columns = tuple(getattr(item_list, key) for key in select_keys)
+
+    def move(self, position: int):
+        """
+        移动游标至指定的位置
+
+        :param position: 数据位置
+        :return: 游标自身
+        """
+        self._position = position
+        return self
+
+
 class ICollection(object):
-    def __init__(self, select_keys: list = None):
+    # 可使用ndarray储存的字段以及对应的dtype
+    # 由子类配置, 未配置的字段只能使用list储存
+    __dtype__ = dict()
+    # 每一笔数据都为定长数组的字段, 在matrix储存方式下使用二维矩阵储存
+    __matrix__ = tuple()
+
+    def __init__(self, select_keys: list = None, storage: str = None, maxlen: int = None):
         # 动态创建特征列表
         # 只创造需要的特征列表
+        # storage决定字段的储存方式, 详细见scdap.data.storage
+        storage = check_storage(storage)
         for key in (select_keys or self.__slots__):
-            setattr(self, key, list())
+            setattr(self, key, create_column(self.__dtype__.get(key), storage, maxlen, key in self.__matrix__))
 
 
 T = TypeVar('T', bound=RefItem)
 
 
 class ItemList(Generic[T]):
-    def __init__(self, obj_class: Type[T], item_list, maxlen: int = None, select_keys: List[str] = None):
+    def __init__(self, obj_class: Type[T], item_list, maxlen: int = None, select_keys: List[str] = None,
+                 storage: str = None):
         self._position: int = -1
         self._size: int = 0
         self._maxlen = maxlen
+        self._storage = check_storage(storage)
         self._select_keys = tuple(select_keys or list())
         self._item_list = item_list
         self._obj_class = obj_class
@@ -113,6 +182,14 @@ class ItemList(Generic[T]):
     def maxlen(self):
         return self._maxlen
 
+    def storage(self) -> str:
+        """
+        获取字段的储存方式
+
+        :return: 储存方式, 详细见scdap.data.storage
+        """
+        return self._storage
+
     def sub_itemlist(self, start: int = None, stop: int = None):
         pass
 
@@ -142,6 +219,48 @@ class ItemList(Generic[T]):
         for i in range(self._size):
             yield self.get_ref(i)
 
+    def cursor(self, index: int = None) -> T:
+        """
+        创建一个可复用的行游标, 通过cursor.move(index)移动至其他的数据
+        与get_ref()相比读取字段时无需通过__getattr__查找字段列表
+
+        :param index: 游标的初始位置, 默认为内置的position所处的位置
+        :return: 游标
+        """
+        index = self._position if index is None else index
+        return cursor_class(self._obj_class, self._select_keys)(self._item_list, self._select_keys, index)
+
+    def iter_cursor(self, start: int = None, stop: int = None) -> Generator[T, None, None]:
+        """
+        逐个返回[start, stop)范围内的数据, 每一次返回的都是同一个移动后的游标
+        适用于只需要逐笔读取数据的全量扫描, 不能保存返回的游标
+
+        :param start: 起始位置, 默认为最初位置
+        :param stop: 结束位置, 默认为最后位置
+        :return:
+        """
+        start, stop, _ = slice(start, stop).indices(self._size)
+        cursor = self.cursor(start)
+        for i in range(start, stop):
+            cursor._position = i
+            yield cursor
+
+    def iter_columns(self, keys: Sequence[str], start: int = None, stop: int = None) -> Iterator[tuple]:
+        """
+        逐笔返回[start, stop)范围内指定字段的数值组成的元组
+        每一个字段只读取一次范围内的数据, 无需为每一笔数据创建RefItem
+
+        for meanhf, time in itemlist.iter_columns(['meanhf', 'time']):
+            ...
+
+        :param keys: 字段
+        :param start: 起始位置, 默认为最初位置
+        :param stop: 结束位置, 默认为最后位置
+        :return: 数值元组的迭代器, 顺序与keys一致
+        """
+        start, stop, _ = slice(start, stop).indices(self._size)
+        return zip(*(column_rows(self.get_column(key), start, stop) for key in keys))
+
     def get_value(self, name: str, index: int = None):
         """
         获得某一个字段在index位置的数据
@@ -164,6 +283,18 @@ class ItemList(Generic[T]):
         except:
             raise
 
+    def get_column(self, name: str):
+        """
+        获得某一个字段的储存列表, 根据储存方式的不同可能是list或者是scdap.data.storage中的字段类型
+
+        :param name: 字段名称
+        :return: 字段的储存列表
+        """
+        try:
+            return getattr(self._item_list, name)
+        except AttributeError as e:
+            raise AttributeError(f'{type(self).__name__}只配置下列字段: {self.select_keys()}, 请勿使用未配置的字段: {e}.')
+
     def get_ref(self, index: int = None) -> T:
         index = self._position if index is None else index
         return self._obj_class(self._item_list, self._select_keys, index)
@@ -252,10 +383,20 @@ class ItemList(Generic[T]):
                 del getattr(self._item_list, slot)[:delete_size]
             self._size = self._maxlen
 
-    def extend_itemlist(self, item_list):
+    def extend_itemlist(self, item_list, start: int = None, stop: int = None):
+        """
+        添加另一个ItemList中范围为[start, stop)的数据
+
+        :param item_list: 数据来源
+        :param start: 起始位置, 默认为最初位置
+        :param stop: 结束位置, 默认为最后位置
+        """
+        start, stop, _ = slice(start, stop).indices(item_list.size())
+        if start >= stop:
+            return
         for key in self._select_keys:
-            getattr(self._item_list, key).extend(getattr(item_list.item_list(), key))
-        self._size += item_list.size()
+            extend_column(getattr(self._item_list, key), getattr(item_list.item_list(), key), start, stop)
+        self._size += stop - start
         self._drop_left()
 
     def extend_ldict(self, **kwargs):
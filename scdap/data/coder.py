@@ -3,7 +3,7 @@
 @create on: 2021.01.02
 """
 from datetime import datetime
-from typing import Union, Generic, TypeVar
+from typing import Union, Generic, TypeVar, List, Dict, Tuple, Callable, Sequence
 
 from .base import ItemList, RefItem
 
@@ -25,15 +25,75 @@ ITEM_LIST = TypeVar('ITEM_LIST', bound=ItemList)
 ITEM_LIST_KV = TypeVar('ITEM_LIST_KV', bound=BaseItemListKV)
 
 
+# 编译后的编解码方法缓存, (编解码类, kv类, 编译类型, 字段) -> 编解码方法
+_CODER_CACHE: Dict[Tuple[type, type, str, Tuple[str, ...]], Callable] = dict()
+
+# 编译类型
+# encode: def encode(self, obj): return {kv.key: cls.encode_key(self, obj), ...}
+# encode_str: 同encode, 字段名称使用str(kv.key)
+# decode: def decode(self, obj, to_obj): to_obj.key = cls.decode_key(self, obj); ...; return to_obj
+# decode_ref: def decode(self, obj, itemlist): itemlist.append_dict(key=cls.decode_key(self, obj), ...); return ...
+COMPILE_ENCODE = 'encode'
+COMPILE_ENCODE_STR = 'encode_str'
+COMPILE_DECODE = 'decode'
+COMPILE_DECODE_REF = 'decode_ref'
+
+
+def _generate_coder(cls: type, kv, kind: str, keys: Tuple[str, ...]) -> Callable:
+    namespace = dict()
+    lines = list()
+    for index, key in enumerate(keys):
+        if kind in (COMPILE_DECODE, COMPILE_DECODE_REF):
+            if not key.isidentifier():
+                raise ValueError(f'{cls.__name__}无法编译字段: {key}.')
+            namespace[f'f{index}'] = getattr(cls, f'decode_{key}')
+            lines.append(f'{key}=f{index}(self, obj)')
+            continue
+        name = getattr(kv, key)
+        namespace[f'n{index}'] = str(name) if kind == COMPILE_ENCODE_STR else name
+        namespace[f'f{index}'] = getattr(cls, f'encode_{key}')
+        lines.append(f'n{index}: f{index}(self, obj)')
+
+    if kind == COMPILE_DECODE:
+        source = 'def decode(self, obj, to_obj):\n' + \
+                 ''.join(f'    to_obj.{line}\n' for line in lines) + \
+                 '    return to_obj\n'
+    elif kind == COMPILE_DECODE_REF:
+        source = 'def decode(self, obj, itemlist):\n' \
+                 f'    itemlist.append_dict({", ".join(lines)})\n' \
+                 '    return itemlist.get_last_ref()\n'
+    else:
+        source = f'def encode(self, obj):\n    return {{{", ".join(lines)}}}\n'
+    exec(source, namespace)
+    return namespace['decode' if kind in (COMPILE_DECODE, COMPILE_DECODE_REF) else 'encode']
+
+
+def compile_coder(coder, kind: str, keys: Sequence[str]) -> Callable:
+    """
+    根据编解码类, kv类以及字段生成对应的编解码方法, 并按照(编解码类, kv类, 编译类型, 字段)缓存
+    生成的方法在编译时已经确定每一个字段的名称与编解码方法, 编解码时无需再通过字符串查找
+    需要注意的是编解码方法从类中获取, 在实例中替换encode_<key>/decode_<key>是无效的
+
+    :param coder: 编解码器
+    :param kind: 编译类型, 详细见COMPILE_*
+    :param keys: 字段
+    :return: 编译后的方法, 调用时第一个参数为编解码器
+    """
+    keys = tuple(keys)
+    cls = type(coder)
+    cache_key = (cls, type(coder.kv), kind, keys)
+    function = _CODER_CACHE.get(cache_key)
+    if function is None:
+        function = _CODER_CACHE[cache_key] = _generate_coder(cls, coder.kv, kind, keys)
+    return function
+
+
 class ItemEncoder(Generic[ITEM, ITEM_KV]):
     def __init__(self, kv: ITEM_KV):
         self.kv = kv
 
     def encode(self, obj: ITEM) -> TYPE_JSON:
-        result = dict()
-        for key in obj.__slots__:
-            result[getattr(self.kv, key)] = getattr(self, f'encode_{key}')(obj)
-        return result
+        return compile_coder(self, COMPILE_ENCODE, obj.__slots__)(self, obj)
 
     __call__ = encode
 
@@ -43,10 +103,42 @@ class RefItemEncoder(Generic[ITEM_LIST, REFITEM, REFITEM_KV]):
         self.kv = kv
 
     def encode(self, obj: REFITEM, itemlist: ITEM_LIST) -> TYPE_JSON:
-        result = dict()
-        for key in itemlist.select_keys():
-            result[str(getattr(self.kv, key))] = getattr(self, f'encode_{key}')(obj)
-        return result
+        return compile_coder(self, COMPILE_ENCODE_STR, itemlist.select_keys())(self, obj)
+
+    def encode_batch(self, itemlist: ITEM_LIST, start: int = None, stop: int = None,
+                     keys: Sequence[str] = None) -> List[TYPE_JSON]:
+        """
+        按字段批量编码[start, stop)范围内的数据, 每一个字段只查找一次编码方法
+        如果实现了encode_batch_<key>(itemlist, start, stop)则使用该方法整列编码, 否则逐笔调用encode_<key>(obj)
+
+        :param itemlist: 需要编码的数据列表
+        :param start: 起始位置, 默认为最初位置
+        :param stop: 结束位置, 默认为最后位置
+        :param keys: 需要编码的字段, 默认为itemlist.select_keys()
+        :return: 编码后的数据列表
+        """
+        start = 0 if start is None else start
+        stop = itemlist.size() if stop is None else stop
+        if start >= stop:
+            return []
+
+        names = list()
+        columns = list()
+        # 没有整列编码方法的字段, 通过同一个游标逐笔编码
+        encodes = list()
+        for key in (itemlist.select_keys() if keys is None else keys):
+            names.append(str(getattr(self.kv, key)))
+            batch = getattr(self, f'encode_batch_{key}', None)
+            if batch is not None:
+                columns.append(batch(itemlist, start, stop))
+                continue
+            encodes.append((len(columns), getattr(self, f'encode_{key}')))
+            columns.append(None)
+        if encodes:
+            rows = [[encode(ref) for _, encode in encodes] for ref in itemlist.iter_cursor(start, stop)]
+            for (index, _), column in zip(encodes, zip(*rows)):
+                columns[index] = column
+        return [dict(zip(names, row)) for row in zip(*columns)]
 
     __call__ = encode
 
@@ -57,17 +149,12 @@ class ItemListEncoder(Generic[ITEM_LIST, REFITEM, ITEM_LIST_KV]):
         self.item_encoder = item_encoder
 
     def encode(self, item_list: ITEM_LIST) -> TYPE_JSON:
-        result = dict()
-        for key in item_list.__slots__:
-            result[getattr(self.kv, key)] = getattr(self, f'encode_{key}')(item_list)
+        result = compile_coder(self, COMPILE_ENCODE, item_list.__slots__)(self, item_list)
         result[self.kv.data] = self.encode_data(item_list)
         return result
 
     def encode_data(self, item_list: ITEM_LIST) -> list:
-        data = list()
-        for item in item_list.generator():
-            data.append(self.item_encoder.encode(item, item_list))
-        return data
+        return self.item_encoder.encode_batch(item_list)
 
     __call__ = encode
 
@@ -77,9 +164,7 @@ class ItemDecoder(Generic[ITEM, ITEM_KV]):
         self.kv = kv
 
     def decode(self, obj: TYPE_JSON, to_obj: ITEM) -> ITEM:
-        for key in to_obj.__slots__:
-            setattr(to_obj, key, getattr(self, f'decode_{key}')(obj))
-        return to_obj
+        return compile_coder(self, COMPILE_DECODE, to_obj.__slots__)(self, obj, to_obj)
 
     __call__ = decode
 
@@ -89,11 +174,29 @@ class RefItemDecoder(Generic[ITEM_LIST, REFITEM, REFITEM_KV]):
         self.kv = kv
 
     def decode(self, obj: TYPE_JSON, itemlist: ITEM_LIST) -> REFITEM:
+        return compile_coder(self, COMPILE_DECODE_REF, itemlist.select_keys())(self, obj, itemlist)
+
+    def decode_batch(self, objs: list, itemlist: ITEM_LIST) -> int:
+        """
+        按字段批量解码多笔数据, 每一个字段只查找一次解码方法, 最终只调用一次extend_ldict
+        如果实现了decode_batch_<key>(objs, itemlist)则使用该方法整列解码, 否则逐笔调用decode_<key>(obj)
+
+        :param objs: 需要解码的数据列表
+        :param itemlist: 解码后写入的数据列表
+        :return: 解码的数据数量
+        """
+        if not objs:
+            return 0
         temp = dict()
         for key in itemlist.select_keys():
-            temp[key] = getattr(self, f'decode_{key}')(obj)
-        itemlist.append_dict(**temp)
-        return itemlist.get_last_ref()
+            batch = getattr(self, f'decode_batch_{key}', None)
+            if batch is None:
+                decode = getattr(self, f'decode_{key}')
+                temp[key] = [decode(obj) for obj in objs]
+            else:
+                temp[key] = batch(objs, itemlist)
+        itemlist.extend_ldict(**temp)
+        return len(objs)
 
     __call__ = decode
 
@@ -104,13 +207,11 @@ class ItemListDecoder(Generic[ITEM_LIST, REFITEM, ITEM_LIST_KV]):
         self.item_decoder = item_decoder
 
     def decode(self, obj: TYPE_JSON, itemlist: ITEM_LIST) -> ITEM_LIST:
-        for key in itemlist.__slots__:
-            setattr(itemlist, key, getattr(self, f'decode_{key}')(obj))
+        compile_coder(self, COMPILE_DECODE, itemlist.__slots__)(self, obj, itemlist)
         self.decode_data(obj, itemlist)
         return itemlist
 
     def decode_data(self, obj: TYPE_JSON, itemlist: ITEM_LIST):
-        for o in obj.get(self.kv.data):
-            self.item_decoder.decode(o, itemlist)
+        self.item_decoder.decode_batch(obj.get(self.kv.data), itemlist)
 
     __call__ = decode
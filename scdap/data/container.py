@@ -4,15 +4,17 @@
 """
 import warnings
 from functools import partial
+from collections import deque
 from datetime import timedelta, datetime
-from typing import Callable, Optional
+from typing import Callable, Optional, Any
 
 import numpy as np
 
 from scdap import config
 from scdap.logger import LoggerInterface
-from scdap.util.tc import lrtime_to_hrtime, DATETIME_MIN
+from scdap.util.tc import DATETIME_MIN_TIMESTAMP, datetime_to_ms, ms_to_datetime
 from scdap.data.feature_item import FeatureList, FeatureItem, DEFAULT_TEMPERATURE
+from scdap.data.derived import DerivedCache
 
 DEFAULT_ARRAY = partial(np.zeros, 0, dtype=np.float)
 
@@ -33,6 +35,7 @@ class Container(LoggerInterface):
                                     在debug模式下不启用
         maxlen: int                 容器数据缓存上限, 一般情况下运行时进程会自动清理数据
                                     但是在堵塞模式下则会根据是否有数据进入到result, 如果没有则会一直缓存
+        storage: str                字段的储存方式, list/ring/matrix, 详细见scdap.data.storage
     """
     def interface_name(self):
         return f'container:{self._algorithm_id}'
@@ -48,9 +51,9 @@ class Container(LoggerInterface):
         self._option = option
 
         # 根据decode记录数据时间, 用于方式数据重复或者顺序错误(时间戳ms)
-        self._previous_time = DATETIME_MIN
+        self._previous_time = DATETIME_MIN_TIMESTAMP
 
-        # 记录时间，用于计算高分时间(datetime)
+        # 记录时间，用于计算高分时间(时间戳ms)
         self._hr_curr_time = None
         # 高分分辨率, 即每一秒内拥有多少的高分数据
         self._hf_resolution = self._get_option('hf_resolution', config.HF_RESOLUTION)
@@ -59,6 +62,8 @@ class Container(LoggerInterface):
 
         # 容器中最多可存在的数据结构数量
         self._maxlen = self._get_option('maxlen', config.CONTAINER_MAXLEN)
+        # 字段的储存方式
+        self._storage = self._get_option('storage', config.CONTAINER_STORAGE)
 
         self._dump_error_data = self._get_option('dump_error_data', config.DUMP_ERROR_DATA)
 
@@ -75,13 +80,20 @@ class Container(LoggerInterface):
         # [systime_time - a, systime_time + b]
         # 如果配置为0代表不过滤
         # 在debug模式下不启用
-        self._early_delta = None if self._filter_time[0] <= 0 else timedelta(seconds=self._filter_time[0])
-        self._later_delta = None if self._filter_time[1] <= 0 else timedelta(seconds=self._filter_time[1])
+        # 单位为ms
+        self._early_delta = None if self._filter_time[0] <= 0 else int(self._filter_time[0] * 1000)
+        self._later_delta = None if self._filter_time[1] <= 0 else int(self._filter_time[1] * 1000)
 
         self._has_high_reso = False
 
         self.flist: Optional[FeatureList] = None
         self._prev_temperature = DEFAULT_TEMPERATURE
+        # 衍生特征缓存, 详细见scdap.data.derived
+        self.derived_cache = DerivedCache()
+        # 每一笔数据对应的原始数据, 比如mq中的json字符串, 用于在结果数据中原样返回特征数据
+        self._raw = deque(maxlen=self._maxlen or None)
+        # 容器被清空的次数, 用于确认容器中的数据是否为清空后重新添加的数据
+        self._generation = 0
 
     def __str__(self):
         return f'{self.flist.__str__()}'
@@ -108,14 +120,43 @@ class Container(LoggerInterface):
         worker: BaseWorker
         wcolumn = worker.get_column()[self.get_algorithm_id()]
         self._has_high_reso = column.has_hrtime(wcolumn)
-        self.flist = FeatureList(self._algorithm_id, self._node_id, wcolumn, maxlen=self._maxlen)
+        self.flist = FeatureList(self._algorithm_id, self._node_id, wcolumn,
+                                 maxlen=self._maxlen, storage=self._storage)
+        self.derived_cache.invalidate()
+        self._raw.clear()
 
     def next(self) -> bool:
+        self.derived_cache.invalidate()
         return self.flist.next()
 
     def reset_position(self):
+        self.derived_cache.invalidate()
         self.flist.reset_position()
 
+    def derived(self, name: str, fn: Callable[[Any], Any], col: str, window: int = 1):
+        """
+        获取当前数据的衍生特征, 在同一笔数据下相同(name, col, window)的衍生特征只会计算一次
+
+        :param name: 衍生特征名称, 相同的名称必须代表相同的计算方法
+        :param fn: 计算方法, 输入为特征数据
+        :param col: 特征名称
+        :param window: 窗口大小, 1代表只使用当前的数据, 大于1则使用截至当前数据的最近window笔数据
+        :return: 衍生特征
+        """
+        if window < 1:
+            raise ValueError(f'衍生特征: {name}的窗口大小window必须大于0.')
+        flist = self.flist
+        position = flist.get_position()
+        if position < 0:
+            raise IndexError('请在调用next()等移动position接口后再使用derived()')
+
+        def compute():
+            if window == 1:
+                return fn(flist.get_value(col))
+            return fn(flist.get_range(col, max(position - window + 1, 0), position + 1))
+
+        return self.derived_cache.get(position, name, (name, col, window), compute)
+
     def get_device_id(self) -> str:
         warnings.warn('device_id已弃用, 取代的是algorithm_id, 请使用get_algorithm_id()而不是get_device_id()',
                       DeprecationWarning)
@@ -143,46 +184,110 @@ class Container(LoggerInterface):
     def empty(self):
         return self.flist.empty()
 
+    def generation(self) -> int:
+        """
+        获取容器被清空的次数, 每一次调用clear()都会加1
+        用于需要跨计算周期记录容器中数据位置的场合, 次数变化则代表之前记录的位置失效
+
+        :return: 清空次数
+        """
+        return self._generation
+
     def clear(self):
+        self._generation += 1
+        self.derived_cache.invalidate()
+        self._raw.clear()
         self.flist.clear()
 
+    def remove(self, index: int):
+        """
+        移除指定位置的数据以及对应的原始数据
+
+        :param index: 数据位置
+        """
+        self.remove_range(index, index + 1)
+
+    def remove_range(self, start: int = None, stop: int = None):
+        """
+        移除范围为[start, stop)的数据以及对应的原始数据
+        需要移除数据时请使用该接口而不是container.flist.remove_range(), 以保证原始数据与数据一一对应
+
+        :param start: 起始位置, 默认为最初位置
+        :param stop: 结束位置, 默认为最后位置
+        """
+        self.derived_cache.invalidate()
+        size = self.flist.size()
+        self.flist.remove_range(start, stop)
+        # 原始数据已经无法与数据一一对应时无需处理
+        if len(self._raw) != size:
+            return
+        start, stop, _ = slice(start, stop).indices(size)
+        if start == 0:
+            for _ in range(stop):
+                self._raw.popleft()
+        else:
+            raws = list(self._raw)
+            del raws[start:stop]
+            self._raw.clear()
+            self._raw.extend(raws)
+
+    def extend_raw(self, raws: list):
+        """
+        记录新增数据对应的原始数据, 需要与新增的数据一一对应, 没有原始数据的使用None
+
+        :param raws: 原始数据列表
+        """
+        self._raw.extend(raws)
+
+    def get_raw(self) -> Optional[list]:
+        """
+        获取容器中每一笔数据对应的原始数据
+        数据被移除等情况下原始数据将无法与数据一一对应, 此时返回None
+
+        :return: 原始数据列表, 没有原始数据的为None
+        """
+        if len(self._raw) != self.flist.size():
+            return None
+        return list(self._raw)
+
     def reset(self):
         self.clear()
-        self._previous_time = DATETIME_MIN
+        self._previous_time = DATETIME_MIN_TIMESTAMP
 
     def append(self, feature: FeatureItem) -> int:
+        # 所有时间的比较都使用毫秒时间戳
+        time = feature.get_time_ms()
         # 时间戳重复/或者说是后来的时间戳时间早于前一次来的数据的时间戳
-        if self._dump_error_data and self._previous_time >= feature.time:
+        if self._dump_error_data and self._previous_time >= time:
             self.logger_warning(
                 f'设备: {self.get_algorithm_id()} 数据时间错误. '
                 f'数据时间为: {feature.time}, '
-                f'该数据时间比前一笔数据时间:{self._previous_time}还要早.'
+                f'该数据时间比前一笔数据时间:{ms_to_datetime(self._previous_time)}还要早.'
             )
             return 0
 
-        systime = self._systime_function()
-        # 数据时间戳超过当前系统时间过多
-        if self._later_delta and feature.time > systime + self._later_delta:
-            self.logger_warning(
-                f'设备: {self.get_algorithm_id()} 数据时间错误. '
-                f'数据时间为: {feature.time}, '
-                f'该数据时间超过当前系统时间过多, 将被筛选掉.'
-            )
-            return 0
-
-        # 数据时间落后当前系统时间过多
-        if self._early_delta and feature.time < systime - self._early_delta:
-            self.logger_warning(
-                f'设备: {self.get_algorithm_id()} 数据时间错误. '
-                f'数据时间为: {feature.time}, '
-                f'该数据时间落后当前系统时间过多, 将被筛选掉.'
-            )
-            return 0
-
-        if self._has_high_reso:
-            feature.hrtime = lrtime_to_hrtime(self._hr_curr_time, feature.time, self._hf_resolution)
-
-        self._hr_curr_time = self._previous_time = feature.time
+        if self._later_delta or self._early_delta:
+            systime = datetime_to_ms(self._systime_function())
+            # 数据时间戳超过当前系统时间过多
+            if self._later_delta and time > systime + self._later_delta:
+                self.logger_warning(
+                    f'设备: {self.get_algorithm_id()} 数据时间错误. '
+                    f'数据时间为: {feature.time}, '
+                    f'该数据时间超过当前系统时间过多, 将被筛选掉.'
+                )
+                return 0
+
+            # 数据时间落后当前系统时间过多
+            if self._early_delta and time < systime - self._early_delta:
+                self.logger_warning(
+                    f'设备: {self.get_algorithm_id()} 数据时间错误. '
+                    f'数据时间为: {feature.time}, '
+                    f'该数据时间落后当前系统时间过多, 将被筛选掉.'
+                )
+                return 0
+
+        previous = self._hr_curr_time
+        self._hr_curr_time = self._previous_time = time
 
         # 当温度<=DEFAULT_TEMPERATURE时一般代表数值不正确,
         # 可能是温度计不工作导致温度无法获取,
@@ -192,7 +297,82 @@ class Container(LoggerInterface):
         #     feature.temperature = self._prev_temperature
         # self._prev_temperature = feature.temperature
         self.flist.append_item(feature)
+
+        # 高分时间根据前后两笔数据的时间生成
+        # 在ring/matrix储存方式下只记录起止时间, 读取时才会生成
+        if self._has_high_reso:
+            self.flist.set_hrtime_span(previous, time, self._hf_resolution, self.flist.size() - 1)
         return 1
 
-    def extend(self, flist: FeatureList) -> int:
-        return sum(map(self.append, flist))
+    def extend(self, flist: FeatureList, raws: list = None) -> int:
+        """
+        批量添加数据, 过滤规则与append()一致
+        时间过滤与高分时间均对整个时间列一次性计算, 通过过滤的数据按连续区间批量添加
+        被过滤的数据按批次汇总输出一次警告
+
+        :param flist: 数据来源
+        :param raws: 每一笔数据对应的原始数据, 只记录通过过滤的数据的原始数据
+        :return: 实际添加的数据数量
+        """
+        size = flist.size()
+        if size == 0:
+            return 0
+        time = np.array(flist.get_all_time_ms(), dtype=np.int64)
+
+        accept = np.ones(size, dtype=np.bool)
+        later_count = early_count = error_count = 0
+        if self._later_delta or self._early_delta:
+            systime = datetime_to_ms(self._systime_function())
+            # 数据时间戳超过当前系统时间过多
+            if self._later_delta:
+                later = time > systime + self._later_delta
+                later_count = int(later.sum())
+                accept &= ~later
+            # 数据时间落后当前系统时间过多
+            if self._early_delta:
+                early = accept & (time < systime - self._early_delta)
+                early_count = int(early.sum())
+                accept &= ~early
+
+        # 时间戳重复/或者说是后来的时间戳时间早于之前通过的数据的时间戳
+        # 只有通过时间过滤的数据才会更新前一笔数据的时间, 所以只在通过时间过滤的数据中比较
+        if self._dump_error_data:
+            index = np.flatnonzero(accept)
+            passed = time[index]
+            previous = np.maximum.accumulate(np.concatenate(([self._previous_time], passed)))[:-1]
+            error = passed <= previous
+            error_count = int(error.sum())
+            accept[index[error]] = False
+
+        if error_count or later_count or early_count:
+            self.logger_warning(
+                f'设备: {self.get_algorithm_id()} 批量添加的{size}笔数据中, '
+                f'{error_count}笔数据时间比前一笔数据时间还要早, '
+                f'{later_count}笔数据时间超过当前系统时间过多, '
+                f'{early_count}笔数据时间落后当前系统时间过多, 将被筛选掉.'
+            )
+
+        index = np.flatnonzero(accept)
+        count = index.size
+        if count == 0:
+            return 0
+        current = time[index]
+
+        # 通过过滤的数据按连续区间批量添加
+        breaks = np.flatnonzero(np.diff(index) != 1) + 1
+        for run in np.split(index, breaks):
+            self.flist.extend_itemlist(flist, int(run[0]), int(run[-1]) + 1)
+        # 被过滤的数据的原始数据也需要丢弃, 否则原始数据将与数据错位
+        if raws is not None:
+            self.extend_raw([raws[i] for i in index])
+
+        previous = np.concatenate(([current[0] if self._hr_curr_time is None else self._hr_curr_time], current[:-1]))
+        self._hr_curr_time = self._previous_time = int(current[-1])
+
+        # 高分时间根据前后两笔数据的时间生成
+        # 超出容器上限而被移除的数据无需生成
+        if self._has_high_reso:
+            keep = min(count, self.flist.size())
+            self.flist.set_hrtime_spans(previous[-keep:], current[-keep:], self._hf_resolution,
+                                        self.flist.size() - keep)
+        return count
@@ -0,0 +1,75 @@
+"""
+
+@create on: 2026.10.18
+衍生特征缓存
+
+同一个算法工作组中的多个算法可能会对同一笔数据或者同一个窗口计算相同的衍生特征
+比如feature1~4的log/exp, bandspectrum的频带求和, 窗口统计量等
+通过container.derived(name, fn, column, window)获取衍生特征时,
+计算结果将以(name, column, window)为键缓存至数据容器中, 其他算法获取时直接使用缓存的结果
+
+缓存只在当前数据(指针位置)下有效, 在数据容器的指针移动或者被清空时失效
+另外记录每一个衍生特征的命中/未命中次数, 用于确认哪些衍生特征值得共享
+"""
+from collections import defaultdict
+from typing import Callable, Dict, Hashable, Tuple, Any
+
+
+class DerivedCache(object):
+    """
+    衍生特征缓存
+    """
+    __slots__ = ['_values', '_position', '_hit', '_miss']
+
+    def __init__(self):
+        self._values: Dict[Hashable, Any] = dict()
+        # 缓存对应的数据容器指针位置
+        self._position: int = -1
+        self._hit: Dict[str, int] = defaultdict(int)
+        self._miss: Dict[str, int] = defaultdict(int)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, position: int, name: str, key: Hashable, compute: Callable[[], Any]):
+        """
+        获取衍生特征, 不存在缓存时调用compute()计算并缓存
+
+        :param position: 当前数据容器的指针位置, 与缓存的位置不一致时缓存失效
+        :param name: 衍生特征名称, 用于统计命中次数
+        :param key: 缓存的键
+        :param compute: 计算方法
+        :return: 衍生特征
+        """
+        if position != self._position:
+            self._values.clear()
+            self._position = position
+
+        try:
+            value = self._values[key]
+        except KeyError:
+            self._miss[name] += 1
+            value = self._values[key] = compute()
+            return value
+
+        self._hit[name] += 1
+        return value
+
+    def invalidate(self):
+        """
+        使缓存失效, 在数据容器被清空或者指针被重置的时候调用
+        """
+        self._values.clear()
+        self._position = -1
+
+    def stats(self) -> Dict[str, Tuple[int, int]]:
+        """
+        获取各个衍生特征的命中次数
+
+        :return: {name: (hit, miss)}
+        """
+        return {name: (self._hit.get(name, 0), self._miss.get(name, 0)) for name in set(self._hit) | set(self._miss)}
+
+    def clear_stats(self):
+        self._hit.clear()
+        self._miss.clear()
@@ -10,6 +10,7 @@ from numpy import ndarray
 
 from scdap.util.tc import DATETIME_MIN
 from ..base import RefItem
+from ..storage import DTYPE_TIME, DTYPE_HRTIME, column_ms
 from functools import partial
 
 # 默认的温度数值, 为绝对零度 - 1
@@ -39,6 +40,28 @@ __feature_default__ = {
 
 __feature_key__ = tuple(__feature_default__.keys())
 
+# 可使用ndarray储存的字段
+__feature_dtype__ = {
+    'meanhf': np.float64,
+    'meanlf': np.float64,
+    'mean': np.float64,
+    'std': np.float64,
+    'status': np.int64,
+    'temperature': np.int64,
+    'time': DTYPE_TIME,
+    'hrtime': DTYPE_HRTIME,
+    'feature1': np.float64,
+    'feature2': np.float64,
+    'feature3': np.float64,
+    'feature4': np.float64,
+    'bandspectrum': np.float64,
+    'peakfreqs': np.float64,
+    'peakpowers': np.float64
+}
+
+# 定长数组字段, 可使用二维矩阵储存
+__feature_matrix__ = ('feature1', 'feature2', 'feature3', 'feature4', 'bandspectrum', 'peakfreqs', 'peakpowers')
+
 
 class FeatureItem(RefItem):
     __default__ = __feature_default__.copy()
@@ -72,3 +95,11 @@ class FeatureItem(RefItem):
     # 其他传感器数据
     # 需要算法自行解析内容
     extend: dict
+
+    def get_time_ms(self) -> int:
+        """
+        获取数据时间的毫秒时间戳, 在ring/matrix储存方式下无需生成datetime
+
+        :return: 毫秒时间戳
+        """
+        return column_ms(self._list.time, self._position)
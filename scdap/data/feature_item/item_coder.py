@@ -3,11 +3,15 @@
 @create on: 2021.05.20
 """
 from scdap.util.tc import DATETIME_MIN_TIMESTAMP
-from scdap.util.tc import datetime_to_long, long_to_datetime, string_to_array, array_to_string
+import numpy as np
+
+from scdap.util.tc import datetime_to_long, long_to_datetime
+from scdap.util.codec import string_to_array, strings_to_arrays, array_to_string, arrays_to_strings
 
 from .item_list import FeatureList
 from .item import FeatureItem, DEFAULT_TEMPERATURE
 from ..coder import RefItemEncoder, RefItemDecoder, TYPE_JSON
+from ..storage import TimeColumn
 
 
 class FeatureItemKV(object):
@@ -87,6 +91,35 @@ class FeatureItemEncoder(RefItemEncoder[FeatureList, FeatureItem, FeatureItemKV]
     def encode_extend(self, obj: FeatureItem):
         return obj.extend
 
+    # 下列为批量编码接口, 由encode_batch()调用, 每一次编码一整列数据
+    # 高分特征等数组对整个矩阵只进行一次对数与取整
+    def _encode_batch_array(self, itemlist: FeatureList, key: str, start: int, stop: int, ln: bool):
+        return arrays_to_strings(itemlist.get_range(key, start, stop), ln=ln)
+
+    def encode_batch_feature1(self, itemlist: FeatureList, start: int, stop: int):
+        return self._encode_batch_array(itemlist, 'feature1', start, stop, True)
+
+    def encode_batch_feature2(self, itemlist: FeatureList, start: int, stop: int):
+        return self._encode_batch_array(itemlist, 'feature2', start, stop, True)
+
+    def encode_batch_feature3(self, itemlist: FeatureList, start: int, stop: int):
+        return self._encode_batch_array(itemlist, 'feature3', start, stop, True)
+
+    def encode_batch_feature4(self, itemlist: FeatureList, start: int, stop: int):
+        return self._encode_batch_array(itemlist, 'feature4', start, stop, True)
+
+    def encode_batch_bandspectrum(self, itemlist: FeatureList, start: int, stop: int):
+        return self._encode_batch_array(itemlist, 'bandspectrum', start, stop, True)
+
+    def encode_batch_peakfreqs(self, itemlist: FeatureList, start: int, stop: int):
+        return self._encode_batch_array(itemlist, 'peakfreqs', start, stop, True)
+
+    def encode_batch_peakpowers(self, itemlist: FeatureList, start: int, stop: int):
+        return self._encode_batch_array(itemlist, 'peakpowers', start, stop, True)
+
+    def encode_batch_customfeature(self, itemlist: FeatureList, start: int, stop: int):
+        return self._encode_batch_array(itemlist, 'customfeature', start, stop, False)
+
 
 class FeatureItemDecoder(RefItemDecoder[FeatureList, FeatureItem, FeatureItemKV]):
     def decode_status(self, obj: TYPE_JSON):
@@ -144,3 +177,41 @@ class FeatureItemDecoder(RefItemDecoder[FeatureList, FeatureItem, FeatureItemKV]
 
     def decode_extend(self, obj: TYPE_JSON):
         return obj.get(self.kv.extend) or dict()
+
+    # 下列为批量解码接口, 由decode_batch()调用, 每一次解码一整列数据
+    # 高分特征等字符串数组将拼接后一次性解析, 并只进行一次自然指数转换
+    def _decode_batch_array(self, objs: list, key: str, exp: bool):
+        key = getattr(self.kv, key)
+        return strings_to_arrays([obj.get(key, '') for obj in objs], exp=exp)
+
+    def decode_batch_time(self, objs: list, itemlist: FeatureList):
+        key = self.kv.time
+        times = [int(obj.get(key, DATETIME_MIN_TIMESTAMP)) for obj in objs]
+        # 时间字段以毫秒时间戳储存时无需转换为datetime
+        if isinstance(itemlist.get_column('time'), TimeColumn):
+            return np.array(times, dtype=np.int64)
+        return [long_to_datetime(time) for time in times]
+
+    def decode_batch_feature1(self, objs: list, itemlist: FeatureList):
+        return self._decode_batch_array(objs, 'feature1', True)
+
+    def decode_batch_feature2(self, objs: list, itemlist: FeatureList):
+        return self._decode_batch_array(objs, 'feature2', True)
+
+    def decode_batch_feature3(self, objs: list, itemlist: FeatureList):
+        return self._decode_batch_array(objs, 'feature3', True)
+
+    def decode_batch_feature4(self, objs: list, itemlist: FeatureList):
+        return self._decode_batch_array(objs, 'feature4', True)
+
+    def decode_batch_bandspectrum(self, objs: list, itemlist: FeatureList):
+        return self._decode_batch_array(objs, 'bandspectrum', True)
+
+    def decode_batch_peakfreqs(self, objs: list, itemlist: FeatureList):
+        return self._decode_batch_array(objs, 'peakfreqs', True)
+
+    def decode_batch_peakpowers(self, objs: list, itemlist: FeatureList):
+        return self._decode_batch_array(objs, 'peakpowers', True)
+
+    def decode_batch_customfeature(self, objs: list, itemlist: FeatureList):
+        return self._decode_batch_array(objs, 'customfeature', False)
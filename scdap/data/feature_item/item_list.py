@@ -5,17 +5,22 @@
 import warnings
 import ast
 from datetime import datetime
-from typing import List, Tuple
+from typing import List, Tuple, Union, Optional
 
 from numpy import ndarray
 
+from scdap.util.tc import ms_to_datetime, lrtime_to_hrtime
+
 from ..base import ItemList, ICollection
-from .item import FeatureItem, __feature_key__
+from ..storage import column_ms, column_hrtime_ms, HRTimeColumn
+from .item import FeatureItem, __feature_key__, __feature_dtype__, __feature_matrix__
 from scdap.logger import logger
 
 
 class IFeature(ICollection):
     __slots__ = __feature_key__
+    __dtype__ = __feature_dtype__
+    __matrix__ = __feature_matrix__
     meanhf: List[float]
     meanlf: List[float]
     mean: List[float]
@@ -54,11 +59,12 @@ class FeatureList(ItemList[FeatureItem]):
     """
     __slots__ = ['algorithm_id', 'node_id']
 
-    def __init__(self, algorithm_id: str = '', node_id: int = 0, column: List[str] = None, maxlen: int = None):
+    def __init__(self, algorithm_id: str = '', node_id: int = 0, column: List[str] = None, maxlen: int = None,
+                 storage: str = None):
         self.algorithm_id = algorithm_id
         self.node_id = node_id
         column = column or IFeature.__slots__
-        ItemList.__init__(self, FeatureItem, IFeature(column), maxlen, column)
+        ItemList.__init__(self, FeatureItem, IFeature(column, storage, maxlen), maxlen, column, storage)
 
     def __str__(self) -> str:
         return f'{type(self).__name__}: ' \
@@ -70,7 +76,7 @@ class FeatureList(ItemList[FeatureItem]):
     def sub_itemlist(self, start: int = None, stop: int = None):
         start = start if start is not None else 0
         stop = stop if stop is not None else self.size() - 1
-        sub_itemlist = type(self)(self.algorithm_id, self.node_id, self._select_keys, self._maxlen)
+        sub_itemlist = type(self)(self.algorithm_id, self.node_id, self._select_keys, self._maxlen, self._storage)
         cache = dict()
         for key in self._select_keys:
             cache[key] = getattr(self._item_list, key)[start:stop]
@@ -117,6 +123,25 @@ class FeatureList(ItemList[FeatureItem]):
         """
         return self.get_range('time', start, stop)
 
+    def get_time_ms(self, index: int = None) -> int:
+        """
+        获得指定index的毫秒时间戳
+
+        :param index: 需要获取的index, 默认获取内置的index
+        :return: 毫秒时间戳
+        """
+        return column_ms(self.get_column('time'), self._position if index is None else index)
+
+    def get_all_time_ms(self, start: int = None, stop: int = None) -> ndarray:
+        """
+        获得所有毫秒时间戳, 在ring/matrix储存方式下返回的是视图
+
+        :param start: 选择起始时间, 默认为最初位置
+        :param stop: 选择结束时间，默认为最后位置
+        :return: int64的毫秒时间戳数组
+        """
+        return column_ms(self.get_column('time'), slice(start, stop))
+
     def get_lrdata(self, index: int = None) -> Tuple[float, float, float, float]:
         """
         获得指定index的低分数据
@@ -150,9 +175,11 @@ class FeatureList(ItemList[FeatureItem]):
         return self.get_feature1(index), self.get_feature2(index), self.get_feature3(index), self.get_feature4(index)
 
     def get_all_hrdata(self, start: int = None, stop: int = None) \
-            -> Tuple[List[ndarray], List[ndarray], List[ndarray], List[ndarray]]:
+            -> Tuple[Union[List[ndarray], ndarray], Union[List[ndarray], ndarray],
+                     Union[List[ndarray], ndarray], Union[List[ndarray], ndarray]]:
         """
         获得所有高分数据，形状为(4, x, y)，x为高分维度(24)，y为数据量
+        在matrix储存方式下返回的是4个(x, y)的二维视图
 
         :param start: 选择起始时间, 默认为最初位置
         :param stop: 选择结束时间，默认为最后位置
@@ -180,6 +207,59 @@ class FeatureList(ItemList[FeatureItem]):
         """
         return self.get_range('hrtime', start, stop)
 
+    def get_hrtime_ms(self, index: int = None) -> ndarray:
+        """
+        获得指定index的高分毫秒时间戳，为一个包含高分分辨率(24)的一维int64数组
+
+        :param index: 需要获取的index, 默认获取内置的index
+        :return: 高分毫秒时间戳
+        """
+        return column_hrtime_ms(self.get_column('hrtime'), self._position if index is None else index)
+
+    def get_all_hrtime_ms(self, start: int = None, stop: int = None) -> ndarray:
+        """
+        获得所有高分毫秒时间戳，形状为(x, y)，x为数据量，y为高分分辨率(24)
+
+        :param start: 选择起始时间, 默认为最初位置
+        :param stop: 选择结束时间，默认为最后位置
+        :return: 高分毫秒时间戳二维数组
+        """
+        return column_hrtime_ms(self.get_column('hrtime'), slice(start, stop))
+
+    def set_hrtime_span(self, previous: Optional[int], current: int, reso: int, index: int = None):
+        """
+        根据前后两笔数据的时间配置指定index的高分时间
+        在ring/matrix储存方式下只记录起止时间, 在读取的时候才会生成高分时间
+
+        :param previous: 前一笔数据的毫秒时间戳, None代表不存在前一笔数据
+        :param current: 当前数据的毫秒时间戳
+        :param reso: 高分分辨率
+        :param index: 需要配置的index, 默认配置内置的index
+        """
+        index = self._position if index is None else index
+        col = self.get_column('hrtime')
+        if isinstance(col, HRTimeColumn):
+            col.set_span(index, previous, current, reso)
+        else:
+            previous = None if previous is None else ms_to_datetime(previous)
+            col[index] = lrtime_to_hrtime(previous, ms_to_datetime(current), reso)
+
+    def set_hrtime_spans(self, previous: ndarray, current: ndarray, reso: int, start: int):
+        """
+        根据前后两笔数据的时间批量配置从start开始的连续多笔数据的高分时间
+
+        :param previous: 前一笔数据的毫秒时间戳数组, 大于等于当前数据时间的视为不存在前一笔数据
+        :param current: 当前数据的毫秒时间戳数组
+        :param reso: 高分分辨率
+        :param start: 起始的index
+        """
+        col = self.get_column('hrtime')
+        if isinstance(col, HRTimeColumn):
+            col.set_spans(start, previous, current, reso)
+            return
+        for index, (p, c) in enumerate(zip(previous.tolist(), current.tolist()), start):
+            col[index] = lrtime_to_hrtime(None if p >= c else ms_to_datetime(p), ms_to_datetime(c), reso)
+
     def get_meanhf(self, index: int = None) -> float:
         """
         获取指定index的摩擦特征数值
@@ -265,9 +345,10 @@ class FeatureList(ItemList[FeatureItem]):
         """
         return self.get_value('feature1', index)
 
-    def get_all_feature1(self, start: int = None, stop: int = None) -> List[ndarray]:
+    def get_all_feature1(self, start: int = None, stop: int = None) -> Union[List[ndarray], ndarray]:
         """
         获取所有高分摩擦特征数值，形状为(x, y) x为数据量，y为高分分辨率(24)
+        在matrix储存方式下返回的是二维视图, 否则为ndarray列表
 
         :param start: 选择起始时间, 默认为最初位置
         :param stop: 选择结束时间，默认为最后位置
@@ -284,7 +365,7 @@ class FeatureList(ItemList[FeatureItem]):
         """
         return self.get_value('feature2', index)
 
-    def get_all_feature2(self, start: int = None, stop: int = None) -> List[ndarray]:
+    def get_all_feature2(self, start: int = None, stop: int = None) -> Union[List[ndarray], ndarray]:
         """
         获取所有高分振动特征数值，形状为(x, y) x为数据量，y为高分分辨率(24)
 
@@ -303,7 +384,7 @@ class FeatureList(ItemList[FeatureItem]):
         """
         return self.get_value('feature3', index)
 
-    def get_all_feature3(self, start: int = None, stop: int = None) -> List[ndarray]:
+    def get_all_feature3(self, start: int = None, stop: int = None) -> Union[List[ndarray], ndarray]:
         """
         获取所有高分功率特征数值，形状为(x, y) x为数据量，y为高分分辨率(24)
 
@@ -322,7 +403,7 @@ class FeatureList(ItemList[FeatureItem]):
         """
         return self.get_value('feature4', index)
 
-    def get_all_feature4(self, start: int = None, stop: int = None) -> List[ndarray]:
+    def get_all_feature4(self, start: int = None, stop: int = None) -> Union[List[ndarray], ndarray]:
         """
         获取所有高分质量特征数值，形状为(x, y) x为数据量，y为高分分辨率(24)
 
@@ -342,7 +423,7 @@ class FeatureList(ItemList[FeatureItem]):
         """
         return self.get_value('bandspectrum', index)
 
-    def get_all_bandspectrum(self, start: int = None, stop: int = None) -> List[ndarray]:
+    def get_all_bandspectrum(self, start: int = None, stop: int = None) -> Union[List[ndarray], ndarray]:
         """
         获取所有分频特征数据列表
 
@@ -361,7 +442,7 @@ class FeatureList(ItemList[FeatureItem]):
         """
         return self.get_value('peakfreqs', index)
 
-    def get_all_peakfreqs(self, start: int = None, stop: int = None) -> List[ndarray]:
+    def get_all_peakfreqs(self, start: int = None, stop: int = None) -> Union[List[ndarray], ndarray]:
         """
         获取所有peakfreqs
 
@@ -380,7 +461,7 @@ class FeatureList(ItemList[FeatureItem]):
         """
         return self.get_value('peakpowers', index)
 
-    def get_all_peakpowers(self, start: int = None, stop: int = None) -> List[ndarray]:
+    def get_all_peakpowers(self, start: int = None, stop: int = None) -> Union[List[ndarray], ndarray]:
         """
         获取peakpowers
 
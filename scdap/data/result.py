@@ -13,7 +13,8 @@ from scdap import config
 from scdap.logger import LoggerInterface
 from scdap.flag import event_type, QualityInspectionItem
 
-from .result_item import ResultList, Event
+from .result_item import ResultList, Event, score_tolist, DTYPE_SCORE
+from .storage import STORAGE_MATRIX, check_storage
 
 DEFAULT_ARRAY: Callable[[List[int]], np.ndarray] = partial(np.zeros, 0, dtype=np.float)
 DEFAULT_SCORE_ARRAY: Callable[[List[int]], np.ndarray] = partial(np.array, dtype=np.int)
@@ -22,6 +23,8 @@ DEFAULT_SCORE_ARRAY: Callable[[List[int]], np.ndarray] = partial(np.array, dtype
 class Result(LoggerInterface):
     """
     maxlen: int         结果容器的最大容量
+    storage: str        字段的储存方式, list/ring/matrix, 详细见scdap.data.storage
+                        matrix储存方式下健康度以int16矩阵储存, 没有范围限制(limit = false)的健康度也必须处在int16的范围中
     """
 
     def interface_name(self):
@@ -46,14 +49,22 @@ class Result(LoggerInterface):
         if self._debug:
             self._maxlen = None
 
+        # 字段的储存方式
+        self._storage = check_storage(self._get_option('storage', config.RESULT_STORAGE))
+        # matrix储存方式下健康度储存于int16矩阵中, 写入时将被拷贝, 无需为每一笔数据创建列表
+        self._score_matrix = self._storage == STORAGE_MATRIX
+        self._score_info = np.iinfo(DTYPE_SCORE)
+
         # 容器中最多可存在的数据结构数量
         self._prev_score: List[int] = list()
         self._health_size: int = 0
         self._health_define: List[str] = list()
+        # 所有结果数据共享的健康度定义
+        self._shared_health_define: tuple = tuple()
 
         self._score_limit: List[bool] = list()
 
-        self.rlist = ResultList(self._algorithm_id, self._node_id, maxlen=self._maxlen)
+        self.rlist = ResultList(self._algorithm_id, self._node_id, maxlen=self._maxlen, storage=self._storage)
         self._flush_index = set()
 
     def _get_option(self, key: str, default):
@@ -110,12 +121,13 @@ class Result(LoggerInterface):
         收尾工作, 每一次调用完一轮数据后需要进行收尾工作
         更新与刷入最终的结果
         """
+        obj = self.rlist.cursor()
         for index in self._flush_index:
-            obj = self.rlist.get_ref(index)
+            obj.move(index)
             for o in obj.event:
                 # 在最终编码的时候配置最终的实现相关数值
                 o.status = obj.status
-                o.score = dict(zip(obj.health_define, obj.score))
+                o.score = dict(zip(obj.health_define, score_tolist(obj.score)))
         self._flush_index.clear()
 
     def bind_worker(self, worker):
@@ -127,6 +139,7 @@ class Result(LoggerInterface):
         from scdap.frame.worker import BaseWorker
         worker: BaseWorker
         self._health_define = worker.get_health_define()[self.get_algorithm_id()]
+        self._shared_health_define = tuple(self._health_define)
         self._prev_score = worker.get_default_score()[self.get_algorithm_id()]
         self._score_limit = worker.get_score_limit()[self.get_algorithm_id()]
         self._health_size: int = len(self._health_define)
@@ -144,6 +157,8 @@ class Result(LoggerInterface):
             elif score > 100 or score < 0:
                 raise ValueError(f'设置了错误的健康度得分: {score}, '
                                  f'请确保健康度得分处在范围[0, 100]中, 或者通过配置算法参数limit = false.')
+        else:
+            self._check_score_range(score)
 
         self.rlist.set_simple_score(score_index, score)
         self._prev_score[score_index] = score
@@ -154,10 +169,18 @@ class Result(LoggerInterface):
         """
         return self.rlist.get_simple_score(score_index)
 
+    def _check_score_range(self, score: int):
+        if self._score_matrix and not self._score_info.min <= score <= self._score_info.max:
+            raise ValueError(f'设置了错误的健康度得分: {score}, '
+                             f'matrix储存方式下健康度得分必须处在范围[{self._score_info.min}, {self._score_info.max}]中.')
+
     def add_result(self, status: int, time: datetime, *score):
-        score = list(score) if score else self._prev_score.copy()
+        if self._score_matrix:
+            score = score or self._prev_score
+        else:
+            score = list(score) if score else self._prev_score.copy()
         self.rlist.append_dict(status=status, time=time,
-                               health_define=self._health_define.copy(),
+                               health_define=self._shared_health_define,
                                score=score)
 
         self.rlist.next()
@@ -185,6 +208,7 @@ class Result(LoggerInterface):
         if self._score_limit[score_index] and (score > 100 or score < 0):
             raise ValueError(f'设置了错误的健康度得分: {score}, '
                              f'请确保健康度得分处在范围[0, 100]中, 或者通过配置算法参数limit = false.')
+        self._check_score_range(score)
 
         self.rlist.set_simple_score(score_index, score)
         self._prev_score[score_index] = score
@@ -222,7 +246,7 @@ class Result(LoggerInterface):
             self.rlist.get_status(),
             # 这里只是暂时缓存了数据
             # 实际在编码准备发送数据的时候会配置最终的的分数数值
-            dict(zip(self._health_define, self.rlist.get_score())),
+            dict(zip(self._health_define, score_tolist(self.rlist.get_score()))),
             name,
             self._systime_function(),
             start,
@@ -2,7 +2,7 @@
 
 @create on: 2021.05.20
 """
-from .item import ResultItem
+from .item import ResultItem, score_tolist, DTYPE_SCORE
 from .item_coder import ResultItemEncoder, ResultItemDecoder, ResultItemKV
 
 from .event import Event
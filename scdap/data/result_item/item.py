@@ -5,11 +5,14 @@
 from typing import List
 from datetime import datetime
 
+import numpy as np
+
 from .event import Event
 from .stat_item import StatItem
 
 from scdap.util.tc import DATETIME_MIN
 from ..base import RefItem
+from ..storage import DTYPE_TIME, column_ms
 
 __result_default__ = {
     'time': DATETIME_MIN,
@@ -22,6 +25,31 @@ __result_default__ = {
 
 __result_key__ = tuple(__result_default__.keys())
 
+# 健康度在matrix储存方式下使用的dtype
+DTYPE_SCORE = np.int16
+
+# 可使用ndarray储存的字段
+__result_dtype__ = {
+    'status': np.int64,
+    'time': DTYPE_TIME,
+    'score': DTYPE_SCORE
+}
+
+# 每一笔数据都为定长数组的字段, matrix储存方式下健康度储存于(size, 健康度数量)的int16矩阵中
+__result_matrix__ = ('score', )
+
+
+def score_tolist(score) -> List[int]:
+    """
+    将健康度转换为python列表, matrix储存方式下健康度为矩阵的一行视图, 编码或者需要保存的时候需要转换
+
+    :param score: 健康度
+    :return: 健康度列表
+    """
+    if isinstance(score, np.ndarray):
+        return score.tolist()
+    return score
+
 
 class ResultItem(RefItem):
     __default__ = __result_default__.copy()
@@ -37,3 +65,11 @@ class ResultItem(RefItem):
     event: List[Event]
     # 统计结果
     stat_item: StatItem
+
+    def get_time_ms(self) -> int:
+        """
+        获取数据时间的毫秒时间戳, 在ring/matrix储存方式下无需生成datetime
+
+        :return: 毫秒时间戳
+        """
+        return column_ms(self._list.time, self._position)
@@ -2,7 +2,7 @@
 
 @create on: 2021.05.20
 """
-from .item import ResultItem
+from .item import ResultItem, score_tolist
 from .item_list import ResultList
 
 from .event import Event
@@ -38,10 +38,10 @@ class ResultItemEncoder(RefItemEncoder[ResultList, ResultItem, ResultItemKV]):
         return datetime_to_long(obj.time)
 
     def encode_score(self, obj: ResultItem):
-        return obj.score
+        return score_tolist(obj.score)
 
     def encode_health_define(self, obj: ResultItem):
-        return obj.health_define
+        return list(obj.health_define)
 
     def encode_event(self, obj: ResultItem):
         return list(map(self.event_encoder.encode, obj.event))
@@ -51,6 +51,11 @@ class ResultItemEncoder(RefItemEncoder[ResultList, ResultItem, ResultItemKV]):
             return self.stat_item_encoder.encode(obj.stat_item)
         return None
 
+    # 下列为批量编码接口, 由encode_batch()调用
+    # matrix储存方式下健康度矩阵只需要进行一次tolist()
+    def encode_batch_score(self, itemlist: ResultList, start: int, stop: int):
+        return score_tolist(itemlist.get_range('score', start, stop))
+
 
 class ResultItemDecoder(RefItemDecoder[ResultList, ResultItem, ResultItemKV]):
     def __init__(self, kv, event_decoder: EventDecoder,
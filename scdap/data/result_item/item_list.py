@@ -6,23 +6,30 @@ import warnings
 from datetime import datetime
 from typing import List, Optional, Dict
 
+import numpy as np
+
 from scdap.flag import event_type
 
 from .event import Event
 from .stat_item import StatItem
-from .item import ResultItem, __result_key__
+from .item import ResultItem, __result_key__, __result_dtype__, __result_matrix__
 
 from ..base import ItemList, ICollection
+from ..storage import column_ms
 
 
 class IResult(ICollection):
     __slots__ = __result_key__
+    __dtype__ = __result_dtype__
+    __matrix__ = __result_matrix__
 
     status: List[int]
     # 时间戳
     time: List[datetime]
     # 健康度, 可以是多个健康度
+    # matrix储存方式下为(size, 健康度数量)的int16矩阵
     score: List[List[int]]
+    # 同一个结果容器中每一笔数据的健康度定义一般都是一样的, 由Result写入同一个tuple共享
     health_define: List[List[str]]
     # 事件
     # {
@@ -41,10 +48,11 @@ class ResultList(ItemList[ResultItem]):
     """
     __slots__ = ['algorithm_id', 'node_id']
 
-    def __init__(self, algorithm_id: str = '', node_id: int = 0, maxlen: int = None):
+    def __init__(self, algorithm_id: str = '', node_id: int = 0, maxlen: int = None, storage: str = None):
         self.algorithm_id = algorithm_id
         self.node_id = node_id
-        ItemList.__init__(self, ResultItem, IResult(IResult.__slots__), maxlen, IResult.__slots__)
+        ItemList.__init__(self, ResultItem, IResult(IResult.__slots__, storage, maxlen),
+                          maxlen, IResult.__slots__, storage)
 
     def __str__(self) -> str:
         return f'{type(self).__name__}: algorithm_id={self.algorithm_id}, node_id={self.node_id}, size={len(self)}'
@@ -52,7 +60,7 @@ class ResultList(ItemList[ResultItem]):
     def sub_itemlist(self, start: int = None, stop: int = None):
         start = start if start is not None else 0
         stop = stop if stop is not None else self.size() - 1
-        sub_itemlist = type(self)(self.algorithm_id, self.node_id, self._maxlen)
+        sub_itemlist = type(self)(self.algorithm_id, self.node_id, self._maxlen, self._storage)
         cache = dict()
         for key in self._select_keys:
             cache[key] = getattr(self._item_list, key)[start:stop]
@@ -102,6 +110,25 @@ class ResultList(ItemList[ResultItem]):
         """
         return self.get_range('time', start, stop)
 
+    def get_time_ms(self, index: int = None) -> int:
+        """
+        获取数据时间的毫秒时间戳
+
+        :param index:
+        :return:
+        """
+        return column_ms(self.get_column('time'), self._position if index is None else index)
+
+    def get_all_time_ms(self, start: int = None, stop: int = None) -> np.ndarray:
+        """
+        获取所有数据时间的毫秒时间戳, 在ring/matrix储存方式下返回的是视图
+
+        :param start:
+        :param stop:
+        :return:
+        """
+        return column_ms(self.get_column('time'), slice(start, stop))
+
     def get_simple_score(self, score_index: int, index: int = None) -> int:
         """
         获取指定位置的健康度数值
@@ -110,11 +137,13 @@ class ResultList(ItemList[ResultItem]):
         :param index:
         :return:
         """
-        return self.get_score(index)[score_index]
+        score = self.get_score(index)[score_index]
+        return score.item() if isinstance(score, np.generic) else score
 
     def get_score(self, index: int = None) -> List[int]:
         """
         获取健康度数据列表
+        matrix储存方式下返回的是矩阵中对应行的int16视图, 需要python列表时请使用score_tolist()转换
 
         :param index:
         :return:
@@ -144,7 +173,7 @@ class ResultList(ItemList[ResultItem]):
 
     def get_all_score(self, start: int = None, stop: int = None) -> List[List[int]]:
         """
-        获取所有健康度数据
+        获取所有健康度数据, matrix储存方式下返回(size, 健康度数量)的二维视图
 
         :param start:
         :param stop:
@@ -180,7 +209,10 @@ class ResultList(ItemList[ResultItem]):
         :param index:
         :return:
         """
-        self.get_health_define(index)[score_index] = val
+        # 健康度定义可能被多笔数据共享, 修改时需要拷贝
+        health_define = list(self.get_health_define(index))
+        health_define[score_index] = val
+        self.set_health_define(health_define, index)
 
     def get_all_health_define(self, start: int = None, stop: int = None) -> List[List[str]]:
         """
@@ -0,0 +1,630 @@
+"""
+
+@create on: 2026.10.18
+ItemList的字段储存后端
+
+默认情况下ItemList中的每一个字段都使用python的list储存
+在高频数据的场景下, list在超出maxlen后删除左侧数据(del list[:n])为O(n)的操作,
+且get_range获得的是一份拷贝
+所以提供了基于numpy的环形缓冲储存方式, 用于储存标量字段(meanhf/mean/status/time等):
+    1. 预先分配2 * (maxlen + 1)的缓冲区, 数据写入[head, tail)的区域
+    2. 删除左侧数据仅移动head指针, 为O(1)的操作
+    3. 当写入至缓冲区尾部时, 重新分配一个新的缓冲区并将有效数据拷贝至新缓冲区的起始位置, 均摊下append为O(1)
+    4. 有效数据总是连续储存的, 所以get_range可以直接返回ndarray的视图而非拷贝
+
+因为重新分配缓冲区时使用的是新的ndarray而非原地移动数据,
+并且clear()或者删除右侧数据之后, 不会再次写入缓冲区中曾经写入过数据的位置, 而是在下一次写入时分配新的缓冲区,
+所以已经获取的视图在之后的append/extend/clear以及删除数据时都不会被改写
+
+另外对于高分特征(feature1~4/bandspectrum/peakfreqs/peakpowers)这类每一笔数据都是定长数组的字段,
+提供了二维矩阵的储存方式, 整个字段储存于一个(capacity, width)的矩阵中,
+get_all_feature1()/get_all_hrdata()等接口将直接返回(size, width)的二维视图, 算法无需再进行np.vstack
+若写入的数据长度不一致(比如peakfreqs), 则该字段会自动回退为list储存
+
+在ring/matrix储存方式下, 时间字段(time)以int64的毫秒时间戳储存, 只有在读取的时候才会转换为datetime,
+高分时间(hrtime)只记录每一笔数据的(前一笔数据时间, 当前数据时间, 分辨率), 在读取的时候才会生成高分时间,
+所以在此储存方式下高分时间被视为等间隔的时间序列
+get_time_ms()/get_hrtime_ms()等接口则直接返回整型的毫秒时间戳, 无需生成datetime
+"""
+from typing import Optional, Union, Iterable
+
+import numpy as np
+
+from scdap.util.tc import datetime_to_ms, ms_to_datetime, lrtime_to_hrtime
+
+# 使用list储存所有字段
+STORAGE_LIST = 'list'
+# 标量字段使用numpy环形缓冲储存, 其余字段依旧使用list储存
+STORAGE_RING = 'ring'
+# 在ring的基础上, 定长的高分特征字段使用二维矩阵储存
+STORAGE_MATRIX = 'matrix'
+
+STORAGE_TYPES = (STORAGE_LIST, STORAGE_RING, STORAGE_MATRIX)
+
+# 未配置maxlen时环形缓冲的初始容量
+DEFAULT_CAPACITY = 64
+
+# 时间字段与高分时间字段的dtype标记
+DTYPE_TIME = 'time'
+DTYPE_HRTIME = 'hrtime'
+
+
+def check_storage(storage: Optional[str]) -> str:
+    """
+    检查并返回储存方式, None则默认为list
+
+    :param storage: 储存方式
+    :return: 储存方式
+    """
+    storage = storage or STORAGE_LIST
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f'不支持的储存方式: {storage}, 可选的储存方式为: {STORAGE_TYPES}.')
+    return storage
+
+
+def create_column(dtype, storage: Optional[str], maxlen: int = None, matrix: bool = False):
+    """
+    根据储存方式以及字段的dtype创建字段的储存列表
+
+    :param dtype: 字段的数据类型, None代表该字段无法使用ndarray储存
+    :param storage: 储存方式
+    :param maxlen: 数据上限, 用于确定环形缓冲的容量
+    :param matrix: 字段是否为定长数组字段, 只有在matrix储存方式下才会使用二维矩阵储存
+    :return: 字段的储存列表
+    """
+    if dtype is None or storage == STORAGE_LIST:
+        return list()
+    if isinstance(dtype, str):
+        if dtype == DTYPE_TIME:
+            return TimeColumn(maxlen)
+        if dtype == DTYPE_HRTIME:
+            return HRTimeColumn(maxlen)
+    if matrix:
+        if storage == STORAGE_MATRIX:
+            return MatrixColumn(dtype, maxlen)
+        return list()
+    return RingColumn(dtype, maxlen)
+
+
+class RingColumn(object):
+    """
+    基于numpy的环形缓冲字段
+    接口与list保持一致(append/extend/clear/del/索引/切片), 可直接替换ICollection中的list
+    切片返回的是ndarray视图, 整数索引返回的是python标量
+    """
+    __slots__ = ['_dtype', '_buffer', '_head', '_tail', '_top', '_numeric', '_shape']
+
+    def __init__(self, dtype, maxlen: int = None, shape: tuple = ()):
+        self._dtype = np.dtype(dtype)
+        self._numeric = self._dtype != np.dtype(object)
+        # 每一笔数据的形状, 标量为()
+        self._shape = shape
+        # ItemList在写入后才会删除溢出的数据, 所以有效数据最多会达到maxlen + 1
+        capacity = (maxlen + 1) * 2 if maxlen else DEFAULT_CAPACITY
+        self._buffer = np.empty((capacity, ) + self._shape, dtype=self._dtype)
+        self._head = 0
+        self._tail = 0
+        # 缓冲区中曾经写入过数据的最远位置, 该位置之前的数据可能已经以视图的方式被获取
+        self._top = 0
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    def __str__(self):
+        return str(self.view())
+
+    def __repr__(self):
+        return f'[<{type(self).__name__}: {hex(id(self))}> {self.__str__()}]'
+
+    def __iter__(self):
+        if self._shape:
+            return iter(self.view())
+        return iter(self.view().tolist())
+
+    def capacity(self) -> int:
+        return self._buffer.shape[0]
+
+    def view(self) -> np.ndarray:
+        """
+        获得所有有效数据的视图
+
+        :return: ndarray视图
+        """
+        return self._buffer[self._head:self._tail]
+
+    def tolist(self) -> list:
+        if self._shape:
+            return list(self.view())
+        return self.view().tolist()
+
+    def _index(self, index: int) -> int:
+        size = self._tail - self._head
+        if index < 0:
+            index += size
+        if index < 0 or index >= size:
+            raise IndexError(f'{type(self).__name__} index out of range.')
+        return self._head + index
+
+    def _reserve(self, size: int):
+        """
+        确保缓冲区尾部拥有size大小的空余空间
+        空间不足时重新分配缓冲区, 若写入后的有效数据不超过缓冲区的一半则容量不变, 否则扩容
+        这样每次重新分配后至少有一半的空余空间, 保证append均摊为O(1)
+        尾部位于曾经写入过数据的位置之前时(clear()或者删除右侧数据之后)同样重新分配, 避免改写已经获取的视图
+
+        :param size: 需要写入的数据量
+        """
+        if self._tail >= self._top and self._tail + size <= self._buffer.shape[0]:
+            return
+        length = self._tail - self._head
+        capacity = max(self._buffer.shape[0], (length + size) * 2)
+        buffer = np.empty((capacity, ) + self._shape, dtype=self._dtype)
+        buffer[:length] = self._buffer[self._head:self._tail]
+        self._buffer = buffer
+        self._head = 0
+        self._tail = self._top = length
+
+    def _rebuild(self, data: np.ndarray):
+        """
+        使用新的缓冲区储存data, 用于删除中间位置的数据
+
+        :param data: 有效数据
+        """
+        length = data.shape[0]
+        buffer = np.empty((max(self._buffer.shape[0], length), ) + self._shape, dtype=self._dtype)
+        buffer[:length] = data
+        self._buffer = buffer
+        self._head = 0
+        self._tail = self._top = length
+
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            return self.view()[key]
+        val = self._buffer[self._index(key)]
+        return val.item() if self._numeric and not self._shape else val
+
+    def __setitem__(self, key: Union[int, slice], value):
+        if isinstance(key, slice):
+            self.view()[key] = value
+        else:
+            self._buffer[self._index(key)] = value
+
+    def __delitem__(self, key: Union[int, slice]):
+        size = self._tail - self._head
+        if isinstance(key, slice):
+            start, stop, step = key.indices(size)
+            if step != 1:
+                self._rebuild(np.delete(self.view(), np.arange(start, stop, step), axis=0))
+                return
+            if start >= stop:
+                return
+            if start == 0:
+                # 删除左侧数据, 只需要移动head指针
+                self._head += stop
+            elif stop == size:
+                self._tail = self._head + start
+            else:
+                view = self.view()
+                self._rebuild(np.concatenate([view[:start], view[stop:]]))
+            return
+
+        index = self._index(key) - self._head
+        if index == 0:
+            self._head += 1
+        elif index == size - 1:
+            self._tail -= 1
+        else:
+            self._rebuild(np.delete(self.view(), index, axis=0))
+
+    def append(self, value):
+        self._reserve(1)
+        self._buffer[self._tail] = value
+        self._tail += 1
+        self._top = self._tail
+
+    def extend(self, values: Iterable):
+        if isinstance(values, RingColumn):
+            values = values.view()
+        elif not isinstance(values, np.ndarray):
+            values = list(values)
+        size = len(values)
+        if size == 0:
+            return
+        self._reserve(size)
+        self._buffer[self._tail:self._tail + size] = values
+        self._tail += size
+        self._top = self._tail
+
+    def clear(self):
+        # 缓冲区在下一次写入时才重新分配, 见_reserve()
+        self._head = self._tail = 0
+
+
+def column_ms(column, key: Union[int, slice]):
+    """
+    获取时间字段的毫秒时间戳, 兼容list储存方式
+
+    :param column: 时间字段
+    :param key: 整数索引或者切片
+    :return: 整数索引返回int, 切片返回int64数组
+    """
+    if isinstance(column, TimeColumn):
+        return column.get_ms(key)
+    if isinstance(key, slice):
+        return np.array([datetime_to_ms(t) for t in column[key]], dtype=np.int64)
+    return datetime_to_ms(column[key])
+
+
+def column_hrtime_ms(column, key: Union[int, slice]):
+    """
+    获取高分时间字段的毫秒时间戳, 兼容list储存方式
+
+    :param column: 高分时间字段
+    :param key: 整数索引或者切片
+    :return: 整数索引返回一维int64数组, 切片返回(size, reso)的二维int64数组
+    """
+    if isinstance(column, HRTimeColumn):
+        return column.get_ms(key)
+    if isinstance(key, slice):
+        return np.array([[datetime_to_ms(t) for t in row] for row in column[key]], dtype=np.int64)
+    return np.array([datetime_to_ms(t) for t in column[key]], dtype=np.int64)
+
+
+class TimeColumn(RingColumn):
+    """
+    以int64毫秒时间戳储存的时间字段
+    写入时接受datetime或者毫秒时间戳, 读取时转换为datetime, 切片返回datetime列表
+    get_ms()则直接返回毫秒时间戳
+    """
+    __slots__ = []
+
+    def __init__(self, maxlen: int = None):
+        super().__init__(np.int64, maxlen)
+
+    def __iter__(self):
+        return map(ms_to_datetime, self.view().tolist())
+
+    def tolist(self) -> list:
+        return list(self)
+
+    def get_ms(self, key: Union[int, slice]):
+        """
+        获取毫秒时间戳
+
+        :param key: 整数索引或者切片
+        :return: 整数索引返回int, 切片返回int64视图
+        """
+        return super().__getitem__(key)
+
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            return list(map(ms_to_datetime, self.view()[key].tolist()))
+        return ms_to_datetime(super().__getitem__(key))
+
+    def __setitem__(self, key: Union[int, slice], value):
+        if isinstance(key, slice):
+            value = [datetime_to_ms(v) for v in value]
+        else:
+            value = datetime_to_ms(value)
+        super().__setitem__(key, value)
+
+    def append(self, value):
+        super().append(datetime_to_ms(value))
+
+    def extend(self, values: Iterable):
+        if isinstance(values, TimeColumn):
+            values = values.view()
+        elif not isinstance(values, np.ndarray):
+            values = [datetime_to_ms(v) for v in values]
+        super().extend(values)
+
+
+class HRTimeColumn(RingColumn):
+    """
+    高分时间字段
+    每一笔数据只储存(前一笔数据时间, 当前数据时间, 分辨率)三个整数, 在读取的时候才会根据lrtime_to_hrtime生成高分时间
+    写入的高分时间数组将被视为等间隔的时间序列, 只保留起止时间与长度
+    """
+    __slots__ = []
+
+    def __init__(self, maxlen: int = None):
+        super().__init__(np.int64, maxlen, (3, ))
+
+    @staticmethod
+    def to_span(value) -> tuple:
+        """
+        将高分时间数组转换为(前一笔数据时间, 当前数据时间, 分辨率)
+
+        :param value: 高分时间数组
+        :return: (previous, current, reso)
+        """
+        reso = 0 if value is None else len(value)
+        if reso == 0:
+            return 0, 0, 0
+        previous = datetime_to_ms(value[0])
+        if reso == 1:
+            return previous, previous + 1000, 1
+        last = datetime_to_ms(value[-1])
+        return previous, int(round(last + (last - previous) / (reso - 1))), reso
+
+    @staticmethod
+    def to_hrtime(span) -> list:
+        previous, current, reso = span.tolist()
+        if reso == 0:
+            return []
+        return lrtime_to_hrtime(ms_to_datetime(previous), ms_to_datetime(current), reso)
+
+    def __iter__(self):
+        return map(self.to_hrtime, self.view())
+
+    def tolist(self) -> list:
+        return list(self)
+
+    def set_span(self, key: int, previous: Optional[int], current: int, reso: int):
+        """
+        配置高分时间的起止时间
+
+        :param key: 整数索引
+        :param previous: 前一笔数据的毫秒时间戳, None代表不存在前一笔数据
+        :param current: 当前数据的毫秒时间戳
+        :param reso: 高分分辨率
+        """
+        if previous is None or previous >= current:
+            previous = current - 1000
+        super().__setitem__(key, (previous, current, reso))
+
+    def set_spans(self, start: int, previous: np.ndarray, current: np.ndarray, reso: int):
+        """
+        批量配置从start开始的连续多笔数据的高分时间起止时间
+
+        :param start: 起始的整数索引
+        :param previous: 前一笔数据的毫秒时间戳数组, 大于等于当前数据时间的视为不存在前一笔数据
+        :param current: 当前数据的毫秒时间戳数组
+        :param reso: 高分分辨率
+        """
+        spans = self.view()[start:start + len(current)]
+        spans[:, 0] = np.where(previous >= current, current - 1000, previous)
+        spans[:, 1] = current
+        spans[:, 2] = reso
+
+    def get_ms(self, key: Union[int, slice]) -> np.ndarray:
+        """
+        获取高分时间的毫秒时间戳
+
+        :param key: 整数索引或者切片
+        :return: 整数索引返回一维int64数组, 切片返回(size, reso)的二维int64数组
+        """
+        if isinstance(key, slice):
+            spans = self.view()[key]
+        else:
+            spans = self._buffer[self._index(key)][np.newaxis]
+        if spans.shape[0] == 0:
+            return np.zeros((0, 0), dtype=np.int64)
+        previous, current, reso = spans[:, 0], spans[:, 1], spans[:, 2]
+        size = reso.max()
+        if reso.min() != size:
+            raise ValueError(f'{type(self).__name__}中的高分分辨率不一致, 无法转换为二维数组.')
+        previous = np.where(previous >= current, current - 1000, previous)
+        hrtime = previous[:, np.newaxis] + (current - previous)[:, np.newaxis] * np.arange(size) // size
+        return hrtime if isinstance(key, slice) else hrtime[0]
+
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            return list(map(self.to_hrtime, self.view()[key]))
+        return self.to_hrtime(self._buffer[self._index(key)])
+
+    def __setitem__(self, key: Union[int, slice], value):
+        if isinstance(key, slice):
+            value = [self.to_span(v) for v in value]
+        else:
+            value = self.to_span(value)
+        super().__setitem__(key, value)
+
+    def append(self, value):
+        super().append(self.to_span(value))
+
+    def extend(self, values: Iterable):
+        if isinstance(values, HRTimeColumn):
+            values = values.view()
+        elif not isinstance(values, np.ndarray):
+            values = [self.to_span(v) for v in values]
+            if not values:
+                return
+        super().extend(values)
+
+
+class MatrixColumn(object):
+    """
+    定长数组字段的二维矩阵储存
+    每一笔数据的长度(width)由第一笔写入的数据决定, 数据储存于RingColumn的(capacity, width)矩阵中
+    切片返回(size, width)的二维视图, 整数索引返回对应行的一维视图
+
+    若之后写入的数据长度与width不一致, 则回退为list储存,
+    回退后切片返回的是list, 与list储存方式保持一致, clear()之后将重新尝试使用矩阵储存
+    """
+    __slots__ = ['_dtype', '_maxlen', '_matrix', '_rows']
+
+    def __init__(self, dtype, maxlen: int = None):
+        self._dtype = np.dtype(dtype)
+        self._maxlen = maxlen
+        # 矩阵储存, 在第一笔数据写入时才能够确定width
+        self._matrix: Optional[RingColumn] = None
+        # 回退后的list储存
+        self._rows: Optional[list] = None
+
+    def __len__(self) -> int:
+        if self._rows is not None:
+            return len(self._rows)
+        if self._matrix is None:
+            return 0
+        return len(self._matrix)
+
+    def __str__(self):
+        return str(self._rows if self._rows is not None else self.view())
+
+    def __repr__(self):
+        return f'[<{type(self).__name__}: {hex(id(self))}> {self.__str__()}]'
+
+    def __iter__(self):
+        if self._rows is not None:
+            return iter(self._rows)
+        if self._matrix is None:
+            return iter(())
+        return iter(self._matrix)
+
+    def is_ragged(self) -> bool:
+        """
+        是否已经回退为list储存
+
+        :return: 是否回退
+        """
+        return self._rows is not None
+
+    def width(self) -> Optional[int]:
+        """
+        获取每一笔数据的长度, 尚未写入数据或者已经回退时返回None
+
+        :return: 数据长度
+        """
+        if self._rows is not None or self._matrix is None:
+            return None
+        return self._matrix._shape[0]
+
+    def view(self) -> Optional[np.ndarray]:
+        """
+        获得所有有效数据的二维视图, 回退后返回None
+
+        :return: ndarray视图
+        """
+        if self._rows is not None:
+            return None
+        if self._matrix is None:
+            return np.zeros((0, 0), dtype=self._dtype)
+        return self._matrix.view()
+
+    def tolist(self) -> list:
+        if self._rows is not None:
+            return list(self._rows)
+        return list(self)
+
+    def _fallback(self):
+        """
+        回退为list储存, 每一行拷贝为独立的ndarray
+        """
+        self._rows = [row.copy() for row in self] if self._matrix is not None else list()
+        self._matrix = None
+
+    def _fit(self, rows: np.ndarray) -> bool:
+        """
+        确认rows能否写入矩阵, 必要时根据rows创建矩阵
+
+        :param rows: (size, width)的二维数组
+        :return: 能否写入
+        """
+        if rows.ndim != 2:
+            return False
+        if self._matrix is None:
+            self._matrix = RingColumn(self._dtype, self._maxlen, (rows.shape[1], ))
+            return True
+        return self._matrix._shape[0] == rows.shape[1]
+
+    def __getitem__(self, key: Union[int, slice]):
+        if self._rows is not None:
+            return self._rows[key]
+        if self._matrix is None:
+            if isinstance(key, slice):
+                return self.view()
+            raise IndexError(f'{type(self).__name__} index out of range.')
+        return self._matrix[key]
+
+    def __setitem__(self, key: Union[int, slice], value):
+        if self._rows is None and self._matrix is not None:
+            rows = np.asarray(value)
+            if isinstance(key, int):
+                rows = rows[np.newaxis]
+            if self._fit(rows):
+                self._matrix[key] = value
+                return
+            self._fallback()
+        if self._rows is None:
+            raise IndexError(f'{type(self).__name__} index out of range.')
+        self._rows[key] = value
+
+    def __delitem__(self, key: Union[int, slice]):
+        if self._rows is not None:
+            del self._rows[key]
+        elif self._matrix is not None:
+            del self._matrix[key]
+        elif not isinstance(key, slice):
+            raise IndexError(f'{type(self).__name__} index out of range.')
+
+    def append(self, value):
+        if self._rows is None:
+            row = np.asarray(value)
+            if self._fit(row[np.newaxis]):
+                self._matrix.append(row)
+                return
+            self._fallback()
+        self._rows.append(value)
+
+    def extend(self, values: Iterable):
+        if isinstance(values, MatrixColumn):
+            values = values.view() if not values.is_ragged() else values.tolist()
+        elif isinstance(values, RingColumn):
+            values = values.view()
+        elif not isinstance(values, np.ndarray):
+            values = list(values)
+        if len(values) == 0:
+            return
+
+        if self._rows is None:
+            if isinstance(values, np.ndarray):
+                rows = values
+            elif len(set(np.shape(v) for v in values)) == 1:
+                rows = np.asarray(values)
+            else:
+                rows = None
+
+            if rows is not None and self._fit(rows):
+                self._matrix.extend(rows)
+                return
+            self._fallback()
+        self._rows.extend(values)
+
+    def clear(self):
+        # 重新根据之后写入的数据确定width
+        self._matrix = None
+        self._rows = None
+
+
+def extend_column(column, source, start: int = None, stop: int = None):
+    """
+    将source字段中[start, stop)范围内的数据添加至column字段
+    同类型的ring/matrix字段之间直接拷贝原始数据, 无需转换datetime等python对象
+
+    :param column: 需要添加数据的字段
+    :param source: 数据来源字段
+    :param start: 起始位置
+    :param stop: 结束位置
+    """
+    key = slice(start, stop)
+    if isinstance(source, RingColumn) and type(column) is type(source):
+        column.extend(source.view()[key])
+    else:
+        column.extend(source[key])
+
+
+def column_rows(column, start: int = None, stop: int = None):
+    """
+    获取字段中[start, stop)范围内逐笔数据的数值, 与整数索引读取的数值一致
+    ring储存方式下的数值字段一次性转换为python标量, 无需逐笔索引
+
+    :param column: 字段
+    :param start: 起始位置
+    :param stop: 结束位置
+    :return: 逐笔数据的数值
+    """
+    key = slice(start, stop)
+    if type(column) is RingColumn and column._numeric and not column._shape:
+        return column.view()[key].tolist()
+    return column[key]
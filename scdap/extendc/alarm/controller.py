@@ -16,6 +16,7 @@ from scdap.api import java_alarm_p
 from scdap.api import device_history
 from scdap.logger import LoggerInterface
 from scdap.core.controller import BaseController
+from scdap.data import score_tolist
 
 
 class AlarmPackage(object):
@@ -414,7 +415,7 @@ class AlarmController(BaseController):
                 # 实时报警
                 if realtime_alarm:
                     alarm_packages.extend(
-                        realtime_alarm.run_realtime_alarm(r.time, dict(zip(r.health_define, r.score)))
+                        realtime_alarm.run_realtime_alarm(r.time, dict(zip(r.health_define, score_tolist(r.score))))
                     )
 
                 # 均值报警
@@ -11,9 +11,9 @@ from datetime import datetime, timedelta
 import numpy as np
 
 from scdap import config
-from scdap.util.tc import get_next_time
+from scdap.util.tc import get_next_time, datetime_to_ms
 from scdap.core.controller import BaseController
-from scdap.data import ResultItem, Result, StatItem
+from scdap.data import ResultItem, ResultList, Result, StatItem
 
 
 class DeviceSocreStack(object):
@@ -27,26 +27,30 @@ class DeviceSocreStack(object):
 
         self.log = log
         compute_kv = {
-            'mean': [self.stat_mean, self.compute_mean],
-            'min': [self.stat_min, self.compute_min],
-            'max': [self.stat_max, self.compute_max],
+            'mean': [self.stat_mean, self.compute_mean, self.stat_block_mean],
+            'min': [self.stat_min, self.compute_min, self.stat_block_min],
+            'max': [self.stat_max, self.compute_max, self.stat_block_max],
         }
 
         if self.stat_type not in compute_kv:
             raise ValueError('DeviceSocreStack配置了错误的统计计算模式.')
 
-        self.stat_method, self.compute_method = compute_kv[self.stat_type]
+        self.stat_method, self.compute_method, self.stat_block_method = compute_kv[self.stat_type]
 
         self.status_temp: List[int] = list()
         self.score_temp: np.ndarray = np.zeros(self._score_size, dtype=np.int)
         self.stack_size: np.ndarray = np.zeros(self._score_size, dtype=np.int)
         self.next_stat_time: Optional[datetime] = None
+        # next_stat_time的毫秒时间戳, 用于逐笔数据的时间比较
+        self.next_stat_ms: Optional[int] = None
 
     def reset(self):
         self.status_temp: List[int] = list()
         self.score_temp: np.ndarray = np.zeros(self._score_size, dtype=np.int)
         self.stack_size: np.ndarray = np.zeros(self._score_size, dtype=np.int)
         self.next_stat_time: Optional[datetime] = None
+        # next_stat_time的毫秒时间戳, 用于逐笔数据的时间比较
+        self.next_stat_ms: Optional[int] = None
 
     def _get_post_need_stat(self, score):
         # 再某些情况下某些健康度需要统计
@@ -86,23 +90,87 @@ class DeviceSocreStack(object):
         scores[pos] = np.ceil((self.score_temp[pos] / self.stack_size[pos])).astype(np.int)
         return scores
 
+    # 下列为批量统计接口, score为(size, 健康度数量)的矩阵, 统计结果与逐笔调用stat_xxx()一致
+    def stat_block_min(self, score: np.ndarray):
+        pos = self._get_post_need_stat(score)
+        has = pos.any(axis=0)
+        block = np.where(pos, score, np.iinfo(score.dtype).max).min(axis=0)
+        self.score_temp[has] = np.minimum(block[has], self.score_temp[has])
+
+    def stat_block_max(self, score: np.ndarray):
+        pos = self._get_post_need_stat(score)
+        has = pos.any(axis=0)
+        block = np.where(pos, score, np.iinfo(score.dtype).min).max(axis=0)
+        self.score_temp[has] = np.maximum(block[has], self.score_temp[has])
+
+    def stat_block_mean(self, score: np.ndarray):
+        pos = self._get_post_need_stat(score)
+        self.score_temp += np.where(pos, score, 0).sum(axis=0)
+        self.stack_size += pos.sum(axis=0)
+
+    def _update_next_stat_time(self, result_item: ResultItem):
+        self.next_stat_time = get_next_time(result_item.time, self.stat_delta)
+        self.next_stat_ms = datetime_to_ms(self.next_stat_time)
+
     def run(self, result_item: ResultItem):
         self.status_temp.append(result_item.status)
 
+        # 逐笔数据只进行毫秒时间戳的比较, 只有在跨越统计间隔的时候才需要生成datetime
         if self.next_stat_time is None:
-            self.next_stat_time = get_next_time(result_item.time, self.stat_delta)
+            self._update_next_stat_time(result_item)
 
-        if result_item.time >= self.next_stat_time:
+        if result_item.get_time_ms() >= self.next_stat_ms:
             self.compute_stat(result_item)
             # 重置缓存
             self.status_temp.clear()
             self.score_temp = np.zeros(self._score_size, dtype=np.int)
             self.stack_size: np.ndarray = np.zeros(self._score_size, dtype=np.int)
-            self.next_stat_time = get_next_time(result_item.time, self.stat_delta)
+            self._update_next_stat_time(result_item)
 
         score = np.array(result_item.score, np.int)
         self.stat_method(score)
 
+    def run_batch(self, rlist: ResultList):
+        """
+        批量统计结果容器中的所有数据, 与逐笔调用run()的结果一致
+        健康度只进行一次矩阵转换, 统计间隔内的数据使用矩阵整体计算
+
+        :param rlist: 结果容器
+        """
+        size = rlist.size()
+        if size == 0:
+            return
+        times = np.asarray(rlist.get_all_time_ms())
+        status = rlist.get_all_status()
+        status = status.tolist() if isinstance(status, np.ndarray) else status
+        # matrix储存方式下为int16矩阵视图, 转换为int64防止求和溢出
+        scores = np.asarray(rlist.get_all_score(), dtype=np.int64).reshape(size, self._score_size)
+
+        start = 0
+        while start < size:
+            if self.next_stat_time is None:
+                self._update_next_stat_time(rlist.get_ref(start))
+            # 下一个需要进行统计的位置
+            cross = np.flatnonzero(times[start:] >= self.next_stat_ms)
+            stop = size if cross.size == 0 else start + int(cross[0])
+
+            if stop > start:
+                self.status_temp.extend(status[start:stop])
+                self.stat_block_method(scores[start:stop])
+            if stop == size:
+                break
+
+            # 与run()一致, 跨越统计间隔的数据的状态统计至上一个间隔中, 健康度统计至下一个间隔中
+            result_item = rlist.get_ref(stop)
+            self.status_temp.append(status[stop])
+            self.compute_stat(result_item)
+            self.status_temp.clear()
+            self.score_temp = np.zeros(self._score_size, dtype=np.int)
+            self.stack_size: np.ndarray = np.zeros(self._score_size, dtype=np.int)
+            self._update_next_stat_time(result_item)
+            self.stat_block_method(scores[stop:stop + 1])
+            start = stop + 1
+
     def compute_stat(self, result_item: ResultItem):
         if self.next_stat_time is None:
             if config.SHOW_STAT_CONTROLLER_LOG:
@@ -151,8 +219,7 @@ class StatController(BaseController):
 
     def run(self):
         for stat in self._score_stats:
-            for result in stat.result.rlist.generator():
-                stat.run(result)
+            stat.run_batch(stat.result.rlist)
 
     def finish(self, last_item: dict, *args, **kwargs):
         """
@@ -4,7 +4,7 @@
 """
 import warnings
 from datetime import datetime
-from typing import Tuple, List
+from typing import Tuple, List, Callable, Any
 from functools import partial
 
 import numpy as np
@@ -13,6 +13,13 @@ from scdap.flag import column
 from scdap.data import Container
 
 
+def _derived(container: Container, columns: frozenset, name: str, fn: Callable[[Any], Any], col: str,
+             window: int = 1):
+    if col not in columns:
+        raise NotImplementedError(f'get_{col}()是没有登记的接口,请确保算法类已经配置好需要使用的column.')
+    return container.derived(name, fn, col, window)
+
+
 class ContainerAPIEntity(object):
     def __init__(self, container: Container, function, *, allow_feature: bool = True):
         from scdap.frame.function import BaseFunction
@@ -44,6 +51,8 @@ class ContainerAPIEntity(object):
         if column.has_all_hrdata(function.get_column()):
             self.get_hrdata = partial(container.flist.get_hrdata, index=None)
 
+        self.derived = partial(_derived, container, frozenset(function.get_column()))
+
     def __getattr__(self, item):
         raise NotImplementedError(f'{item}()是没有登记的接口,请确保算法类已经配置好需要使用的column.')
 
@@ -279,3 +288,17 @@ class ContainerAPI(object):
         :return: 传感器数据
         """
         pass
+
+    def derived(self, name: str, fn: Callable[[Any], Any], col: str, window: int = 1) -> Any:
+        """
+        获取当前数据的衍生特征, 同一个算法工作组内的所有算法共享计算结果
+        在同一笔数据下相同(name, col, window)的衍生特征只会计算一次, 数据指针移动后失效
+        col必须为算法类get_column()中配置的特征
+
+        :param name: 衍生特征名称, 相同的名称必须代表相同的计算方法
+        :param fn: 计算方法, 输入为特征数据
+        :param col: 特征名称
+        :param window: 窗口大小, 1代表只使用当前的数据, 大于1则使用截至当前数据的最近window笔数据
+        :return: 衍生特征
+        """
+        pass
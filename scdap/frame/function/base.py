@@ -5,7 +5,9 @@
 import warnings
 from functools import update_wrapper
 from abc import ABCMeta, abstractmethod
-from typing import List, Iterable, Optional, Tuple, Callable, NoReturn, Dict
+from typing import List, Iterable, Optional, Tuple, Callable, NoReturn, Dict, Any
+
+import numpy as np
 
 from scdap.util.parser import parser_id
 from scdap.logger import LoggerInterface
@@ -510,6 +512,29 @@ class BaseFunction(LoggerInterface, metaclass=ABCMeta):
         """
         pass
 
+    def compute_batch(self, data: Dict[str, Any], status: np.ndarray) -> np.ndarray:
+        """
+        批量计算的实现, 可选实现
+        一次性计算容器中所有新到达的数据, 而不是每一笔数据都调用一次compute()
+        只有算法工作组中所有的识别算法与评价算法都实现了该方法时worker才会使用批量计算, 否则依然逐笔调用compute()
+        批量计算的时候self.container与self.result不可用, 请勿在该方法中使用
+        另外批量计算无法使用事件等需要result接口的功能, 需要的话请不要实现该方法
+
+        :param data: 新到达的数据, {特征名称: 数组或者列表}, 特征为get_column()中配置的特征
+                     其中time为int64的毫秒时间戳数组
+        :param status: 当前的识别结果(状态)数组, shape=(size, )
+        :return: 识别算法返回新的识别结果数组, shape=(size, )
+                 评价算法返回健康度数组, shape=(size, get_health_size()), 0代表延续之前的健康度
+        """
+        raise NotImplementedError()
+
+    def has_compute_batch(self) -> bool:
+        """
+
+        :return: 是否实现了批量计算compute_batch()
+        """
+        return type(self).compute_batch is not BaseFunction.compute_batch
+
     @abstractmethod
     def set_parameter(self, parameter: dict):
         """
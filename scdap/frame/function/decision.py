@@ -11,6 +11,7 @@ from .base import BaseFunction
 class BaseDecision(BaseFunction, metaclass=ABCMeta):
     """
     识别算法
+    可选实现compute_batch(), 批量计算时返回识别结果数组, shape=(size, )
     """
 
     @staticmethod
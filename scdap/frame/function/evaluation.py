@@ -17,6 +17,7 @@ class BaseEvaluation(BaseFunction, metaclass=ABCMeta):
     拥有默认参数:
     score_threshold: List[int] 健康度阈值
     score_recommendation: List[int] 健康度阈值区间
+    可选实现compute_batch(), 批量计算时返回健康度数组, shape=(size, get_health_size())
     """
 
     def is_realtime_function(self) -> bool:
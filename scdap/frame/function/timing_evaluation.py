@@ -4,12 +4,15 @@
 """
 __all__ = ['TimingEvaluation']
 
-from typing import List, Union
+from typing import List, Union, Dict, Optional
 from abc import ABCMeta, abstractmethod
 from datetime import datetime
 
+import numpy as np
+
 from scdap.flag import column
-from scdap.data import IFeature
+from scdap.data import IFeature, STORAGE_LIST
+from scdap.data.storage import check_storage, create_column, DTYPE_TIME
 from scdap.util.tc import get_next_time
 
 from .base import _function_wrapper
@@ -17,10 +20,69 @@ from .evaluation import BaseEvaluation
 
 
 class ResultStack(object):
-    def __init__(self):
+    def __init__(self, storage: str = None, maxlen: int = None):
         self.size: int = 0
-        self.status: List[int] = list()
-        self.time: List[datetime] = list()
+        self.status: List[int] = create_column(np.int64, storage, maxlen)
+        self.time: List[datetime] = create_column(DTYPE_TIME, storage, maxlen)
+
+
+class RunningAggregate(object):
+    """
+    增量维护的统计量, 每一笔数据更新一次, 读取时为O(1)
+    """
+    __slots__ = ['count', 'sum', 'sum2', 'min', 'max']
+
+    def __init__(self):
+        self.count: int = 0
+        self.sum: float = 0.
+        # 平方和
+        self.sum2: float = 0.
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def __repr__(self):
+        return f'[<{type(self).__name__}: {hex(id(self))}> ' \
+               f'count={self.count}, sum={self.sum}, sum2={self.sum2}, min={self.min}, max={self.max}]'
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.sum2 += value * value
+        if self.count == 1:
+            self.min = self.max = value
+        elif value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+
+    def merge(self, other: 'RunningAggregate'):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.min, self.max = other.min, other.max
+        else:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.count += other.count
+        self.sum += other.sum
+        self.sum2 += other.sum2
+
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def var(self) -> Optional[float]:
+        """
+
+        :return: 总体方差
+        """
+        if self.count == 0:
+            return None
+        mean = self.sum / self.count
+        return max(self.sum2 / self.count - mean * mean, 0.)
+
+    def std(self) -> Optional[float]:
+        var = self.var()
+        return None if var is None else var ** 0.5
 
 
 class TimingEvaluation(BaseEvaluation, metaclass=ABCMeta):
@@ -46,6 +108,11 @@ class TimingEvaluation(BaseEvaluation, metaclass=ABCMeta):
     analysis_second: 600
     则代表每10分钟计算一次健康度
     计算的时间为 0m/10m/20m/30m/40m/50m/
+
+    通过get_stack_storage()可配置累积数据的储存方式, 详细见scdap.data.storage
+    配置为ring/matrix时标量特征与状态将累积于预先分配的ndarray中, 可通过self.get_stack(...)直接获得ndarray视图
+    通过get_aggregate_column()可配置需要增量统计的标量特征, 将按照状态分别统计count/sum/sum2/min/max
+    在analysis()中可通过self.get_aggregate(...)以O(1)的方式读取
     """
 
     def get_analysis_second(self) -> int:
@@ -56,6 +123,24 @@ class TimingEvaluation(BaseEvaluation, metaclass=ABCMeta):
         """
         return 600
 
+    def get_stack_storage(self) -> str:
+        """
+        累积数据的储存方式, 默认为list
+        ring: 标量特征/状态/时间使用预先分配的ndarray储存, 时间以毫秒时间戳储存
+        matrix: 在ring的基础上, 定长的高分特征使用二维矩阵储存
+
+        :return: 储存方式
+        """
+        return STORAGE_LIST
+
+    def get_aggregate_column(self) -> List[str]:
+        """
+        需要按照状态增量统计的特征, 只允许配置get_column()中的标量特征
+
+        :return: 特征列表
+        """
+        return []
+
     def multi_dev(self) -> bool:
         return False
 
@@ -77,6 +162,9 @@ class TimingEvaluation(BaseEvaluation, metaclass=ABCMeta):
         self.result_stack = ResultStack()
         # 缓存的数据数量
         self.stack_size = 0
+        # 增量统计量
+        # {column: {status: RunningAggregate}}
+        self.__aggregate__: Dict[str, Dict[int, RunningAggregate]] = dict()
 
     def initial(self):
         super().initial()
@@ -90,6 +178,13 @@ class TimingEvaluation(BaseEvaluation, metaclass=ABCMeta):
         if column.time not in col:
             col.append(column.time)
 
+        # 根据储存方式重新创建累积容器, 按照analysis_second预先分配容量
+        storage = self.get_stack_storage()
+        maxlen = self.get_analysis_second()
+        self.container_stack = IFeature(col, storage, maxlen)
+        self.result_stack = ResultStack(storage, maxlen)
+        self.__aggregate__ = {c: dict() for c in self.get_aggregate_column()}
+
         # 状态缓存
         self.__need_stack__.append((self.result_stack.status, 1, 'get_status'))
         # 时间缓存
@@ -105,6 +200,8 @@ class TimingEvaluation(BaseEvaluation, metaclass=ABCMeta):
     def _set_global_parameter(self, global_parameter: dict = None):
         super()._set_global_parameter(global_parameter)
         _function_wrapper(global_parameter, self, 'analysis_second', 'get_analysis_second')
+        _function_wrapper(global_parameter, self, 'stack_storage', 'get_stack_storage')
+        _function_wrapper(global_parameter, self, 'aggregate_column', 'get_aggregate_column')
 
     def _check_self(self):
         super()._check_self()
@@ -119,6 +216,20 @@ class TimingEvaluation(BaseEvaluation, metaclass=ABCMeta):
                 ValueError, f'算法: [{self.get_function_name()}]配置的analysis_second必须为大于0.'
             )
 
+        try:
+            check_storage(self.get_stack_storage())
+        except ValueError as e:
+            raise self.wrap_exception(ValueError, f'算法: [{self.get_function_name()}]配置的stack_storage错误: {e}')
+
+        for c in self.get_aggregate_column():
+            dtype = IFeature.__dtype__.get(c)
+            if c not in self.get_column() or c in IFeature.__matrix__ or \
+                    not isinstance(dtype, type) or not issubclass(dtype, np.number):
+                raise self.wrap_exception(
+                    ValueError, f'算法: [{self.get_function_name()}]配置的aggregate_column: [{c}]'
+                                f'必须为get_column()中配置的标量特征.'
+                )
+
     def compute(self):
         """
         计算基础方法，worker将调用该方法进行计算
@@ -163,12 +274,56 @@ class TimingEvaluation(BaseEvaluation, metaclass=ABCMeta):
             stack_list.append(getattr(self.__cr__[cr_index], api_name)())
         self.stack_size += 1
 
+        if self.__aggregate__:
+            status = self.result_stack.status[-1]
+            for c, aggregates in self.__aggregate__.items():
+                aggregate = aggregates.get(status)
+                if aggregate is None:
+                    aggregate = aggregates[status] = RunningAggregate()
+                aggregate.add(getattr(self.container_stack, c)[-1])
+
+    def get_stack(self, name: str, result: bool = False) -> np.ndarray:
+        """
+        获取累积的数据
+        在ring/matrix储存方式下直接返回ndarray视图, 无需拷贝, 时间为毫秒时间戳
+        在list储存方式下将转换为ndarray
+
+        :param name: 字段名称
+        :param result: True获取result_stack中的字段(status/time), False获取container_stack中的特征
+        :return: 累积的数据
+        """
+        stack = getattr(self.result_stack if result else self.container_stack, name)
+        if hasattr(stack, 'view'):
+            view = stack.view()
+            if view is not None:
+                return view
+            stack = stack.tolist()
+        return np.asarray(stack)
+
+    def get_aggregate(self, name: str, status: int = None) -> RunningAggregate:
+        """
+        获取增量统计量, 必须在get_aggregate_column()中配置
+
+        :param name: 特征名称
+        :param status: 状态, None代表统计所有的状态
+        :return: 统计量
+        """
+        aggregates = self.__aggregate__[name]
+        if status is not None:
+            return aggregates.get(status) or RunningAggregate()
+        aggregate = RunningAggregate()
+        for sub in aggregates.values():
+            aggregate.merge(sub)
+        return aggregate
+
     def auto_reset(self):
         self.clear_data()
 
     def clear_data(self):
         for stack_list, *_ in self.__need_stack__:
             stack_list.clear()
+        for aggregates in self.__aggregate__.values():
+            aggregates.clear()
         self.stack_size = 0
 
     def on_compute(self):
@@ -6,15 +6,19 @@
 """
 import warnings
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor, wait
 from abc import ABCMeta, abstractmethod
-from typing import List, Dict, Union, Type, Tuple, Generator, Callable
+from typing import List, Dict, Union, Type, Tuple, Generator, Callable, Optional
 
-from scdap.flag import option_key
+import numpy as np
+
+from scdap import config
+from scdap.flag import option_key, column
 from scdap.data import Container, Result
 from scdap.logger import LoggerInterface
 from scdap.transfer.base import CRImplementer
 
-from ..api import APICreater
+from ..api import APICreater, ContainerAPI, ResultAPI
 from ..function import BaseFunction, fset
 
 TYPE_CR = Tuple[Container, Result]
@@ -23,6 +27,14 @@ GENERATOR_CR = Generator[TYPE_CR, None, None]
 TYPE_DCR = Tuple[str, Container, Result]
 GENERATOR_DCR = Generator[TYPE_DCR, None, None]
 
+# 执行计划, [(function, function.compute, capi, rapi), ...]
+TYPE_PLAN = List[Tuple[BaseFunction, Callable[[], None], ContainerAPI, ResultAPI]]
+
+# 多设备算法工作组中各个点位的执行方式
+DEVICE_EXECUTOR_SERIAL = 'serial'
+DEVICE_EXECUTOR_THREAD = 'thread'
+DEVICE_EXECUTORS = (DEVICE_EXECUTOR_SERIAL, DEVICE_EXECUTOR_THREAD)
+
 
 class BaseWorker(LoggerInterface, metaclass=ABCMeta):
     # 下列参数用于配置算法内调用的容器允许使用的接口
@@ -92,6 +104,15 @@ class BaseWorker(LoggerInterface, metaclass=ABCMeta):
         # worker参数
         # option.extra.worker
         self._option = option or dict()
+        # 是否允许使用批量计算, 只有所有识别算法与评价算法都实现了compute_batch()才会生效
+        self._compute_batch: bool = self._get_option(self._option, 'compute_batch', True)
+        # 各个点位的执行方式, 详细见config.DEVICE_EXECUTOR
+        self._device_executor: str = self._get_option(self._option, 'device_executor', config.DEVICE_EXECUTOR)
+        if self._device_executor not in DEVICE_EXECUTORS:
+            raise self.wrap_exception(ValueError, f'device_executor: {self._device_executor}配置错误, '
+                                                  f'可选的执行方式为: {DEVICE_EXECUTORS}.')
+        self._device_pool_size: int = self._get_option(self._option, 'device_pool_size', config.DEVICE_POOL_SIZE)
+        self._device_pool: Optional[ThreadPoolExecutor] = None
 
         # 识别算法集
         self._decision: List[BaseFunction] = list()
@@ -105,6 +126,10 @@ class BaseWorker(LoggerInterface, metaclass=ABCMeta):
         # 算法总和
         self._functions: List[BaseFunction] = list()
 
+        # 并行计算时各个点位独立的算法实例
+        # {algorithm_id: {function_type: [function, ...]}}
+        self._replicas: Dict[str, Dict[str, List[BaseFunction]]] = dict()
+
         # 算法标签对算法的映射字典
         self._fid_to_func: Dict[int, BaseFunction] = dict()
 
@@ -131,6 +156,14 @@ class BaseWorker(LoggerInterface, metaclass=ABCMeta):
         # 数据容器
         self._crimp: CRImplementer = crimp
         self._api_creater: APICreater = APICreater()
+        # 算法实例副本的数据接口
+        self._replica_api_creater: APICreater = APICreater()
+        # 预先编译的执行计划, 在bind_crimp()中生成
+        # {function_type: {algorithm_id: [(function, function.compute, capi, rapi), ...]}}
+        # 详细可查看self._compile_plan()
+        self._plan: Dict[str, Dict[str, TYPE_PLAN]] = dict()
+        # 各类型算法当前通过set_cr绑定的点位, None代表未绑定或者绑定已经失效
+        self._plan_device: Dict[str, Optional[str]] = dict()
 
         # 数据驱动方法
         # 是一个generator
@@ -190,6 +223,22 @@ class BaseWorker(LoggerInterface, metaclass=ABCMeta):
         """
         return True
 
+    @property
+    def can_compute_parallel(self) -> bool:
+        """
+        是否支持各个点位并行计算, 需要子类的compute()中通过self._compute_parallel(...)实现
+
+        :return: 是否支持各个点位并行计算
+        """
+        return False
+
+    def is_parallel(self) -> bool:
+        """
+
+        :return: 是否使用各个点位并行计算
+        """
+        return bool(self._replicas)
+
     @staticmethod
     @abstractmethod
     def get_worker_name() -> str:
@@ -394,6 +443,151 @@ class BaseWorker(LoggerInterface, metaclass=ABCMeta):
         """
         function(self._api_creater.get_capi(function, container), self._api_creater.get_rapi(function, result))
 
+    def _compile_plan(self):
+        """
+        编译执行计划
+        按照点位以及算法类型预先生成(function, function.compute, capi, rapi)的列表
+        这样子在逐笔计算的时候无需再查询数据接口, 也无需每一笔都调用function.set_cr()
+        """
+        functions = {'decision': self._decision, 'evaluation': self._evaluation, 'other': self._other}
+        self._plan = {function_type: dict() for function_type in functions}
+        for aid, cont, res in self._crimp.generator_dcr():
+            # 并行计算时使用各个点位独立的算法实例
+            api_creater = self._replica_api_creater if aid in self._replicas else self._api_creater
+            for function_type, funs in self._replicas.get(aid, functions).items():
+                self._plan[function_type][aid] = [
+                    (fun, fun.compute, api_creater.get_capi(fun, cont), api_creater.get_rapi(fun, res))
+                    for fun in funs
+                ]
+        self._unbind_plan()
+
+    def _unbind_plan(self):
+        """
+        使算法当前绑定的数据接口失效, 在算法的set_cr()被其他地方调用后必须调用
+        下一次执行计划时将重新绑定
+        """
+        self._plan_device = dict.fromkeys(self._plan)
+
+    def _run_plan(self, function_type: str, algorithm_id: str):
+        """
+        根据执行计划运行某一类型的所有算法
+        算法实例是所有点位共享的, 所以只有在点位发生变化的时候才需要重新调用set_cr()绑定数据接口
+
+        :param function_type: 算法类型, decision/evaluation/other
+        :param algorithm_id: 点位编号
+        """
+        plan = self._plan[function_type][algorithm_id]
+        if self._plan_device[function_type] != algorithm_id:
+            for fun, _, capi, rapi in plan:
+                fun.set_cr(capi, rapi)
+            self._plan_device[function_type] = algorithm_id
+
+        for _, compute, _, _ in plan:
+            compute()
+
+    def _compute_device(self, algorithm_id: str, function_types: Tuple[str, ...]):
+        """
+        按照顺序计算某一个点位的所有数据, 用于并行计算
+        每一个点位拥有独立的算法实例, 所以只需要在开始的时候绑定一次数据接口
+
+        :param algorithm_id: 点位编号
+        :param function_types: 需要按顺序运行的算法类型
+        """
+        container, result = self._crimp.get_cr(algorithm_id)
+        plans = [self._plan[function_type][algorithm_id] for function_type in function_types]
+        for plan in plans:
+            for fun, _, capi, rapi in plan:
+                fun.set_cr(capi, rapi)
+
+        while container.next():
+            result.add_result(0, container.flist.get_time())
+            for plan in plans:
+                for _, compute, _, _ in plan:
+                    compute()
+            self._print_result(result)
+
+    def _compute_parallel(self, *function_types: str):
+        """
+        各个点位在线程池中并行计算, 同一个点位的数据依旧按照顺序计算
+        所有点位计算完毕后按照点位的顺序抛出异常, 保证抛出的异常与执行顺序无关
+
+        :param function_types: 需要按顺序运行的算法类型
+        """
+        if self._device_pool is None:
+            self._device_pool = ThreadPoolExecutor(self._device_pool_size or self.dsize,
+                                                   thread_name_prefix='scdap-device')
+        futures = [self._device_pool.submit(self._compute_device, aid, function_types) for aid in self._replicas]
+        wait(futures)
+        for future in futures:
+            future.result()
+
+    def _shutdown_device_pool(self):
+        """
+        等待线程池中的任务结束后关闭线程池, 下一次并行计算时重新创建
+        """
+        if self._device_pool is None:
+            return
+        self._device_pool.shutdown(wait=True)
+        self._device_pool = None
+
+    def can_compute_batch(self) -> bool:
+        """
+        是否可以使用批量计算
+        所有识别算法与评价算法都实现了compute_batch()时才可以使用
+        批量计算不会运行其他算法, 也不使用各个点位并行计算, 所以配置了其他算法或者并行计算时不可以使用
+
+        :return: 是否可以使用批量计算
+        """
+        if not self._compute_batch or self._other or self.is_parallel():
+            return False
+        functions = self._decision + self._evaluation
+        return len(functions) > 0 and all(fun.has_compute_batch() for fun in functions)
+
+    def _run_batch(self, algorithm_id: str, container: Container, result: Result):
+        """
+        批量运行识别算法与评价算法
+        一次性计算容器中所有新到达的数据, 计算完成后逐笔添加结果
+        """
+        flist = container.flist
+        start = flist.get_position() + 1
+        stop = flist.size()
+        if start >= stop:
+            return
+        size = stop - start
+        times_ms = flist.get_all_time_ms(start, stop)
+
+        status = np.zeros(size, dtype=np.int64)
+        for fun in self._decision:
+            data = {col: flist.get_range(col, start, stop) for col in fun.get_column()}
+            data[column.time] = times_ms
+            status = np.asarray(fun.compute_batch(data, status.copy()))
+            if status.shape != (size, ):
+                raise self.wrap_exception(
+                    ValueError, f'[function: {fun.get_function_name()}] '
+                                f'compute_batch()返回的识别结果数组shape必须为({size}, ), 当前为{status.shape}.')
+
+        scores = list()
+        for fun in self._evaluation:
+            data = {col: flist.get_range(col, start, stop) for col in fun.get_column()}
+            data[column.time] = times_ms
+            score = np.asarray(fun.compute_batch(data, status.copy()))
+            if score.shape != (size, fun.get_health_size()):
+                raise self.wrap_exception(
+                    ValueError, f'[function: {fun.get_function_name()}] '
+                                f'compute_batch()返回的健康度数组shape必须为({size}, {fun.get_health_size()}), '
+                                f'当前为{score.shape}.')
+            scores.append((fun.__score_index__, score.tolist()))
+
+        # 逐笔添加结果, 通过result.set_score保持健康度的0值延续与数值范围检查
+        status = status.tolist()
+        for i, time in enumerate(flist.get_all_time(start, stop)):
+            result.add_result(status[i], time)
+            for score_index, score in scores:
+                for j, s in zip(score_index, score[i]):
+                    result.set_score(j, int(s))
+            self._print_result(result)
+        flist.position_to_end()
+
     def bind_crimp(self):
         """
         该方法将在初始化的时候调用
@@ -415,6 +609,15 @@ class BaseWorker(LoggerInterface, metaclass=ABCMeta):
                 self._api_creater.register_capi(fun, cont, self.container_api_kwargs['other'])
                 self._api_creater.register_rapi(fun, res, self.result_api_kwargs['other'])
 
+        # 算法实例副本只注册所在点位的数据接口
+        for aid, cont, res in self._crimp.generator_dcr():
+            for function_type, funs in self._replicas.get(aid, dict()).items():
+                for fun in funs:
+                    self._replica_api_creater.register_capi(fun, cont, self.container_api_kwargs[function_type])
+                    self._replica_api_creater.register_rapi(fun, res, self.result_api_kwargs[function_type])
+
+        self._compile_plan()
+
     def initial(self):
         """
         初始化
@@ -422,6 +625,43 @@ class BaseWorker(LoggerInterface, metaclass=ABCMeta):
         """
         self._initial_function()
         self._bind_function_to_device()
+        self._initial_replica()
+
+    def _initial_replica(self):
+        """
+        并行计算时为每一个点位创建独立的算法实例
+        算法实例使用与原算法相同的初始化参数, 所以拥有相同的健康度位置等配置
+
+        """
+        if self._device_executor == DEVICE_EXECUTOR_SERIAL or not self.multi_dev or not self.can_compute_parallel:
+            return
+
+        functions = {'decision': self._decision, 'evaluation': self._evaluation, 'other': self._other}
+        for aid in self.devices:
+            self._replicas[aid] = dict()
+            for function_type, funs in functions.items():
+                replicas = list()
+                for fun in funs:
+                    replica = type(fun)(
+                        self.tag, self.devices, fun.__findex__, fun.__sindex__,
+                        self.debug, self._net_load_mode, fun.__global_parameter__
+                    )
+                    replica.initial()
+                    replicas.append(replica)
+                self._replicas[aid][function_type] = replicas
+
+    def _generator_function(self, function: BaseFunction) -> Generator[BaseFunction, None, None]:
+        """
+        获取算法以及该算法在各个点位的算法实例副本
+
+        :param function: 算法
+        """
+        yield function
+        for functions in self._replicas.values():
+            for funs in functions.values():
+                for fun in funs:
+                    if fun.__findex__ == function.__findex__:
+                        yield fun
 
     def _initial_function(self):
         """
@@ -472,18 +712,20 @@ class BaseWorker(LoggerInterface, metaclass=ABCMeta):
         [result.flush() for result in self._crimp.generator_result()]
 
     def clear(self):
-        pass
+        self._shutdown_device_pool()
 
     def reset(self):
         """
         重置算法
         清空容器数据的同时调用所有算法的function.reset()进行重置
         """
-        for fun in self._functions:
-            # reset不需要设置容器
-            fun.set_cr(None, None)
-            fun.reset()
-            fun.auto_reset()
+        for function in self._functions:
+            for fun in self._generator_function(function):
+                # reset不需要设置容器
+                fun.set_cr(None, None)
+                fun.reset()
+                fun.auto_reset()
+        self._unbind_plan()
 
     def set_parameter(self, parameter: dict):
         """
@@ -502,12 +744,18 @@ class BaseWorker(LoggerInterface, metaclass=ABCMeta):
             fun = self._fid_to_func[fid]
             try:
                 fun.set_parameter(param or dict())
+                # 各个点位的算法实例副本使用独立的参数拷贝
+                for replica in list(self._generator_function(fun))[1:]:
+                    replica.set_parameter(deepcopy(param or dict()))
             except KeyError as e:
                 raise self.wrap_exception(KeyError, f'[function: {fun.get_function_name()}] '
                                                     f'算法参数设置失败, 算法参数中无法找到参数名称: {e}.')
             except Exception as e:
                 raise self.wrap_exception(Exception, f'[function: {fun.get_function_name()}] '
                                                      f'算法参数设置失败, 错误: {e}')
+        # 算法可能在设置参数的时候修改了自身的实现, 需要重新编译执行计划
+        if self._plan:
+            self._compile_plan()
 
     def disconnect(self, nodes: List[int]):
         """
@@ -515,9 +763,20 @@ class BaseWorker(LoggerInterface, metaclass=ABCMeta):
         """
         for node in nodes:
             self.logger_info(f'{node} 调用断线接口计算.')
-            for fun in self._functions:
-                fun.set_cr(None, self._api_creater.get_rapi(fun, self._crimp.get_result_by_node(node)))
+            result = self._crimp.get_result_by_node(node)
+            replicas = self._replicas.get(result.get_algorithm_id())
+            if replicas:
+                # 并行计算时使用所在点位的算法实例
+                functions = [fun for funs in replicas.values() for fun in funs]
+                api_creater = self._replica_api_creater
+            else:
+                functions = self._functions
+                api_creater = self._api_creater
+            for fun in functions:
+                fun.set_cr(None, api_creater.get_rapi(fun, result))
                 fun.disconnect()
+        self._unbind_plan()
+        self._shutdown_device_pool()
 
     def _drive_data_simple(self, add_result: bool = True) -> GENERATOR_DCR:
         """
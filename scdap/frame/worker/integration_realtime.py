@@ -33,10 +33,17 @@ class IntegrationRealTimeWorker(BaseWorker):
     def process_type() -> str:
         return 'program'
 
+    @property
+    def can_compute_parallel(self) -> bool:
+        return True
+
     def compute(self):
+        if self.is_parallel():
+            self._compute_parallel('other')
+            return
+
         for device, container, result in self._drive_data(True):
-            for function in self._other:
-                self._run_function(function, device, container, result)
+            self._run_plan('other', device)
 
             self._print_result(result)
 
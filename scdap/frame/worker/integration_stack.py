@@ -34,8 +34,7 @@ class IntegrationStackWorker(BaseWorker):
 
     def compute(self):
         for device, container, result in self._drive_data(False):
-            for function in self._other:
-                self._run_function(function, device, container, result)
+            self._run_plan('other', device)
         self._print_result()
 
     def _print_result(self, result: Result = None, position: int = None):
@@ -4,24 +4,160 @@
 多设备联动工作组基类
 """
 from abc import ABCMeta
-from itertools import chain, compress
-from datetime import datetime, timedelta
-from typing import Tuple, List, Generator, Dict, Callable
+from itertools import compress
+from typing import Tuple, List, Generator, Callable
 
-from scdap.util.tc import DATETIME_MIN
+import numpy as np
+
+from scdap.util.tc import DATETIME_MIN_TIMESTAMP
 
 from .base import BaseWorker, Container, Result
 
 from ..function import BaseFunction
 
 
-# 因为该方法在align中被频繁调用
-# 故将其设置为一全局方法加快调用效率
-# 该方法功能与np.hstack()相同, 但在align中效率更高
-chain_iterable = chain.from_iterable
-
 GENERATOR_DCR = Generator[Tuple[List[str], List[Container], List[Result]], None, None]
 
+_EMPTY_TIME = np.empty(0, dtype=np.int64)
+
+
+class _AlignState(object):
+    """
+    单个设备的时间对齐状态
+    prev: 前一个数据的时间戳(ms)
+    first: 是否是第一次出现的时间戳，即没有发现重复时间戳
+        在发现拥有重复时间戳1次数据后将重复数据的时间 + data_delta
+        在发现拥有重复时间戳2次的数据后将抛弃第2次数据
+    index: 前一次转换到的数据位置, 避免重复转换数据
+    times: 容器中[0, index)的数据经过转换后的时间戳
+    generation: index与times对应的容器清空次数, 详细见Container.generation()
+    """
+    __slots__ = ['prev', 'first', 'index', 'times', 'generation']
+
+    def __init__(self):
+        self.prev = DATETIME_MIN_TIMESTAMP
+        self.first = True
+        self.index = 0
+        self.times = _EMPTY_TIME
+        self.generation = None
+
+
+class TimeAligner(object):
+    """
+    多设备数据时间对齐
+    所有时间都使用int64的毫秒时间戳并以秒为最低单位, 每一次只转换容器中新到达的数据
+    """
+    def __init__(self, size: int, data_delta: int):
+        """
+
+        :param size: 设备数量
+        :param data_delta: 橙盒数据间隔(ms), 重复的时间戳将被修改为前一个时间戳 + data_delta
+        """
+        self._size = size
+        self._data_delta = data_delta
+        self._states = [_AlignState() for _ in range(size)]
+
+    def reset(self):
+        self._states = [_AlignState() for _ in range(self._size)]
+
+    def _convert_tail(self, state: _AlignState, tail: np.ndarray) -> Tuple[np.ndarray, List[int]]:
+        """
+        转换新到达的数据时间, 时间正常递增的部分使用向量化计算, 从第一个重复或者顺序错误的数据开始逐个计算
+
+        :return: 转换后的时间戳, 需要移除的数据位置(相对于tail)
+        """
+        # 设置时间戳中的毫秒为0, 最小单位为second
+        tail = tail - tail % 1000
+        if tail[0] <= state.prev:
+            start = 0
+        else:
+            bad = np.flatnonzero(tail[1:] <= tail[:-1])
+            start = int(bad[0]) + 1 if bad.size else tail.size
+            state.prev = int(tail[start - 1])
+            state.first = True
+            if start == tail.size:
+                return tail, []
+
+        data_delta = self._data_delta
+        prev, first = state.prev, state.first
+        kept = list()
+        drop = list()
+        for i, time in enumerate(tail[start:].tolist(), start):
+            # 数据正常
+            if time > prev:
+                first = True
+            # 数据重复但是只重复一次
+            elif first and time == prev:
+                time = prev + data_delta
+                first = False
+            # 数据时间小于前一个数据时间
+            # 1.意味着这段数据可能是被抛弃了
+            # 2.发现第二次重复数据
+            # 故需要移除数据
+            else:
+                drop.append(i)
+                continue
+            prev = time
+            kept.append(time)
+
+        state.prev, state.first = prev, first
+        return np.concatenate((tail[:start], np.array(kept, dtype=np.int64))), drop
+
+    def reconvert(self, containers: List[Container]) -> List[np.ndarray]:
+        """
+        将数据时间重置成以秒为最低单位
+        因为在container.decode()阶段已经将重复数据或顺序错误的数据剔除，故不可能出现顺序错误与重复的数据
+        当 prev == time 时则 time 设置成 time + data_delta
+
+        :param containers: 与设备一一对应的数据容器
+        :return: 与设备一一对应的转换后的时间戳数组
+        """
+        result = list()
+        for state, cont in zip(self._states, containers):
+            size = cont.size()
+            generation = cont.generation()
+            # 容器在计算结束后将被清空, 此时需要从头开始转换
+            # 清空后新到达的数据可能比之前还要多, 所以不能只根据数据数量判断
+            if generation != state.generation or size < state.index:
+                state.index = 0
+                state.times = _EMPTY_TIME
+                state.generation = generation
+
+            if state.index < size:
+                tail, drop = self._convert_tail(state, cont.flist.get_all_time_ms(state.index, size))
+                for i in reversed(drop):
+                    cont.remove(state.index + i)
+                state.times = np.concatenate((state.times, tail)) if state.times.size else tail
+                state.index = cont.size()
+            result.append(state.times)
+        return result
+
+    @staticmethod
+    def align(times: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        合并所有设备的时间戳, 并返回设备是否拥有对应时间戳的数据的布尔数组
+
+        :param times: 与设备一一对应的严格递增的时间戳数组
+        :return: timeline: 所有设备的时间戳, presence[t, d]: 设备d是否拥有时间戳timeline[t]的数据
+        """
+        timeline = np.unique(np.concatenate(times))
+        presence = np.zeros((timeline.size, len(times)), dtype=bool)
+        for i, dev_times in enumerate(times):
+            presence[np.searchsorted(timeline, dev_times), i] = True
+        return timeline, presence
+
+    def release(self, time: int):
+        """
+        超过max_delay而直接抛出数据时, 更新所有设备的prev_time
+        部分数据在数据被遗弃后仍可能在之后的某段时间内被接收到
+        故需要更新prev_time，确保在reconvert()中将已经被遗弃的数据真正遗弃掉
+
+        :param time: 最后抛出的数据的时间戳
+        """
+        for state in self._states:
+            if state.prev < time:
+                state.prev = time
+
 
 class MDBaseWorker(BaseWorker, metaclass=ABCMeta):
     """
@@ -46,20 +182,11 @@ class MDBaseWorker(BaseWorker, metaclass=ABCMeta):
 
         # 数据同步最长延迟时间
         self._max_delay = self._option.get('max_delay', self.default_max_delay)
-        # 橙盒数据间隔(单位秒)
+        # 橙盒数据间隔(单位秒), 转换为毫秒
         self._data_delta: int = self._option.get('data_delta', self.default_data_delta)
-        self._data_delta = timedelta(seconds=self._data_delta)
-
-        # [dev, prev_time, convert_index, first]
-        # prev_time: 前一个数据的时间戳
-        # convert_index: 前一次转换到的数据位置, 避免重复转换数据
-        # first: 是否是第一次出现的时间戳，即没有发现重复时间戳
-        #   在发现拥有重复时间戳1次数据后将重复数据的时间 + data_delta
-        #   在发现拥有重复时间戳2次的数据后将抛弃第2次数据
-        self._sync_data = [[dev, DATETIME_MIN, 0, True] for dev in self.devices]
+        self._data_delta = int(self._data_delta * 1000)
 
-        # 数据对齐时的最后一笔数据
-        self._curr_time = DATETIME_MIN
+        self._aligner = TimeAligner(self.dsize, self._data_delta)
 
         self._drive_data: Callable[[bool, bool], GENERATOR_DCR] = self._dcr_loop_generator_sync
 
@@ -67,92 +194,31 @@ class MDBaseWorker(BaseWorker, metaclass=ABCMeta):
     def _check_function_type(cls, function):
         return issubclass(function, BaseFunction) and function.is_mdfunction()
 
-    def reconvert(self) -> List[List[datetime]]:
+    def reconvert(self) -> List[np.ndarray]:
         """
         将数据时间重置成以秒为最低单位
+        为了减少datetime的创建与比较, 时间统一使用毫秒时间戳
         todo: 未来可能会有更低间隔的数据，比如0.5s的数据等
         """
-        data_delta = self._data_delta
-        #
-        # 因为在container.decode()阶段已经将重复数据或顺序错误的数据剔除，故不可能出现顺序错误与重复的数据
-        # 当 prev == time 时则 time 设置成 time + timedelta(seconds=1)
-        align_time = list()
-        for sync_data in self._sync_data:
-            dev, prev, index, first = sync_data
-            cont = self._crimp.get_container(dev)
-            size = cont.size()
-            times = list(cont.flist.get_all_time())
-            align_time.append(times)
-
-            # 如果container没有新的数据或者数据都已经经过时间重置则不再重置时间
-            if index == size:
-                continue
+        return self._aligner.reconvert([self._crimp.get_container(dev) for dev in self.devices])
 
-            while index < size:
-                # 设置时间戳中的microsecond=0, 最小单位为second
-                time = times[index].replace(microsecond=0)
-                # 数据正常
-                if time > prev:
-                    first = True
-                # 数据重复但是只重复一次
-                elif first and time == prev:
-                    time = prev + data_delta
-                    first = False
-                    # print('same', cont.algorithm_id, times[index], '|', time, '|', prev, first)
-                    # print(cont.algorithm_id, times[j], time, prev)
-                # 数据时间小于前一个数据时间
-                # 1.意味着这段数据可能是被抛弃了
-                # 2.发现第二次重复数据
-                # 故需要移除数据
-                else:
-                    cont.flist.pop(index)
-                    size -= 1
-                    continue
-                prev = times[index] = time
-                index += 1
-                sync_data[:] = prev, size, first
-        return align_time
-
-    def align(self, times: List[List[datetime]]) -> Tuple[List[datetime], List[List[int]]]:
+    def align(self, times: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
         """
         输入的数据格式：
         [[t1, t2, t3, ...], [t2, t3, t5, ...], [t1, t2, ...], ...]
                dev1               dev2             dev3
-        对齐时间戳并返回设备是否拥有对应的时间戳的数组
-        dev\time | t1 | t2 | t3 | t4 | ...
+        对齐时间戳并返回设备是否拥有对应的时间戳的布尔数组
+        time\dev | dev1 | dev2 | dev3 | ...
         -----------------------------------
-          dev1   | 1  | 0  | 1  | 1  | ...
-          dev2   | 1  | 0  | 1  | 1  | ...
-          dev3   | 1  | 1  | 1  | 0  | ...
-          dev4   | 1  | 0  | 1  | 1  | ...
+          t1     |  1   |  1   |  1   | ...
+          t2     |  0   |  0   |  1   | ...
+          t3     |  1   |  1   |  1   | ...
+          t4     |  1   |  1   |  0   | ...
           ...
         1 代表 dev 在时间戳t拥有数据
         0 代表 dev 在时间戳t不存在数据
-        最终返回的结果是以上述数组保存的二维数组，不包含datetime与dev编号
-        result = [[1, 1, ...], [1, 1, ...], [1, 0, ...], [1, 1, ...]]
-                      t1           t2           t3           t4
-        result内数组长度为设备数量
-        """
-        tsize = len(times)
-        # 将所有设备数据时间整合成一段拥有所有设备数据时间戳的总时间戳
-        # dev1: [t1, t2, t3, t5]
-        # dev2: [t1, t2, t4]
-        # dev3: [t0, t4, t6]
-        # timeline: [t0, t1, t2, t3, t4, t5, t6]
-        timeline = sorted(set(chain_iterable(times)))
-        # 根据时间戳创建字典映射
-        # t1: [0, 0, 0, ...]
-        # t2: [0, 0, 0, ...]
-        # t3: [0, 0, 0, ...]
-        # t4: [0, 0, 0, ...]
-        # t : ...
-        result = [[0] * tsize for _ in range(len(timeline))]
-        rdict: Dict[datetime, List[int]] = dict(zip(timeline, result))
-        # 将设备拥有数据的时间戳位置填1
-        for i in range(tsize):
-            for j in range(len(times[i])):
-                rdict[times[i][j]][i] = 1
-        return timeline, result
+        """
+        return self._aligner.align(times)
 
     def _dcr_loop_generator_sync(self, add_result: bool = False) -> GENERATOR_DCR:
         """
@@ -170,39 +236,47 @@ class MDBaseWorker(BaseWorker, metaclass=ABCMeta):
         t3 -> {dev1: data(t3)}
         t4 -> {dev1: data(t4), dev2: data(t4), dev3: data(t4)}
         """
-        timeline, align_val = self.align(self.reconvert())
-        size = self.dsize
+        timeline, presence = self.align(self.reconvert())
+        if not timeline.size:
+            return
         max_delay = self._max_delay
         ldcr = self._crimp.copy_ldcr()
+        # 所有设备都拥有数据的时间戳位置
+        full = np.flatnonzero(presence.all(axis=1)).tolist()
+        presence = presence.tolist()
+        tsize = len(presence)
         index = 0
+        f = 0
         # 根据数据总体时间戳历遍所有数据
         # 在对齐时间戳算法下，只有两种情况会将数据输入至算法：
         # 1.当所有设备都在某一时间戳内拥有数据，即align返回的接口在某一刻时间戳下所有设备结果皆为1
         # 2.在连续一段时间戳长度(max_delay)中总有至少一个设备不存在数据，即align中一个至多个设备在连续的时间戳下结果为0
-        for i in range(len(align_val)):
-            delay = index + max_delay <= i
-            if delay or sum(align_val[i]) == size:
-                for index in range(index, i + 1):
-                    # 挑出所有在当前时刻拥有数据的容器
-                    # compress用于根据align_val[index] 获取数值为1也就是拥有数据的数据容器
-                    # 与np.compress或切片效果相似
-                    select = tuple(compress(ldcr, align_val[index]))
-                    # 循环历遍调用数据
-                    for dev, cont, res in select:
-                        cont.next()
-                        if add_result:
-                            res.add_result(0, cont.flist.get_time())
-
-                    yield zip(*select)
-
-                index += 1
-            # 更新sync_data中的prev_time，部分数据在数据被遗弃后仍可能在之后的某段时间内被接收到
-            # 故需要更新prev_time，确保在reconvert()中将已经被遗弃的数据真正遗弃掉
+        while index < tsize:
+            while f < len(full) and full[f] < index:
+                f += 1
+            # 下一个需要抛出数据的位置
+            stop = index + max_delay
+            if f < len(full) and full[f] < stop:
+                stop = full[f]
+            delay = stop == index + max_delay
+            if stop >= tsize:
+                break
+
+            for i in range(index, stop + 1):
+                # 挑出所有在当前时刻拥有数据的容器
+                # compress用于根据presence[i] 获取数值为1也就是拥有数据的数据容器
+                select = tuple(compress(ldcr, presence[i]))
+                # 循环历遍调用数据
+                for dev, cont, res in select:
+                    cont.next()
+                    if add_result:
+                        res.add_result(0, cont.flist.get_time())
+
+                yield zip(*select)
+            index = stop + 1
+
             if delay:
-                now = timeline[index - 1]
-                for sync_data in self._sync_data:
-                    if sync_data[0] < now:
-                        sync_data[:] = now, index, True
+                self._aligner.release(int(timeline[stop]))
 
     def _run_function(self, function: BaseFunction, device: List[str],
                       container: List[Container], result: List[Result]):
@@ -229,8 +303,7 @@ class MDBaseWorker(BaseWorker, metaclass=ABCMeta):
     def reset(self):
         super().reset()
         # 重置数据同步用变量
-        self._sync_data = [[dev, DATETIME_MIN, 0, True] for dev in self.devices]
-        self._curr_time = DATETIME_MIN
+        self._aligner.reset()
 
     def _print_result(self, result: List[Result] = None, position: int = None):
         if not self._show_compute_result:
@@ -32,13 +32,23 @@ class NormalRealTimeWorker(BaseWorker):
     def process_type() -> str:
         return 'program'
 
+    @property
+    def can_compute_parallel(self) -> bool:
+        return True
+
     def compute(self):
-        for device, container, result in self._drive_data(True):
-            for fun in self._decision:
-                self._run_function(fun, device, container, result)
+        if self.can_compute_batch():
+            for device, container, result in self._crimp.generator_dcr():
+                self._run_batch(device, container, result)
+            return
 
-            for fun in self._evaluation:
-                self._run_function(fun, device, container, result)
+        if self.is_parallel():
+            self._compute_parallel('decision', 'evaluation')
+            return
+
+        for device, container, result in self._drive_data(True):
+            self._run_plan('decision', device)
+            self._run_plan('evaluation', device)
 
             self._print_result(result)
 
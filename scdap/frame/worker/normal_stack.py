@@ -17,29 +17,42 @@ class ResultCache(object):
     数据缓存中间层
     """
 
-    def __init__(self, algorithm_id: str, columns: list, maxlen: int = None):
+    def __init__(self, algorithm_id: str, columns: list, maxlen: int = None, storage: str = None):
         self.algorithm_id = algorithm_id
         self.time = deque(maxlen=maxlen)
         self.status = deque(maxlen=maxlen)
-        self.flist = FeatureList(algorithm_id, column=columns, maxlen=maxlen)
+        # 与缓存特征一一对应的原始数据
+        self.raw = deque(maxlen=maxlen)
+        self.flist = FeatureList(algorithm_id, column=columns, maxlen=maxlen, storage=storage)
 
     def size(self):
         return len(self.status)
 
-    def generator_cache(self) -> Generator[Tuple[FeatureItem, int, datetime], None, None]:
-        while self.size() > 0:
-            yield self.flist.get_ref(0), self.status.popleft(), self.time.popleft()
-            self.flist.pop()
-
-    def cache_flist(self, flist: FeatureList):
-        self.flist.extend_itemlist(flist)
-
-    def cache_feature(self, feature: FeatureItem):
+    def generator_cache(self) -> Generator[Tuple[FeatureItem, int, datetime, object], None, None]:
+        """
+        按顺序抛出特征与对应的结果数据以及原始数据
+        使用游标历遍特征, 在结束后一次性移除已经抛出的特征, 避免每一次都删除最左侧的数据
+        """
+        index = 0
+        try:
+            while self.size() > 0:
+                index += 1
+                yield self.flist.get_ref(index - 1), self.status.popleft(), self.time.popleft(), self.raw.popleft()
+        finally:
+            self.flist.remove_range(0, index)
+
+    def cache_flist(self, flist: FeatureList, start: int = None, stop: int = None, raws: list = None):
+        self.flist.extend_itemlist(flist, start, stop)
+        self.raw.extend(raws or [None] * len(range(flist.size())[start:stop]))
+
+    def cache_feature(self, feature: FeatureItem, raw=None):
         self.flist.append_item(feature)
+        self.raw.append(raw)
 
     def clear(self):
         self.time.clear()
         self.status.clear()
+        self.raw.clear()
         self.flist.clear()
 
     def add_result(self, status: int, time: datetime):
@@ -77,7 +90,9 @@ class NormalStackWorker(BaseWorker):
     首先decision-result-api中的接口将被替换为ResultCache的接口
     decision中调用result/set_status/get_status/get_time/set_time实际上是调用ResultCache的接口
     1. 所有数据在decision中运行一次
-    2. 将container中的特征缓存至各自设备的ResultCache, 并清空container
+       识别算法计算时container中保留了本次计算的所有数据, 即可以获取到本次计算中之前的数据,
+       但是无法获取到之前计算中的数据, 因为这些数据已经被移动至ResultCache
+    2. 将container中的特征一次性缓存至各自设备的ResultCache, 并清空container
     3. 检测ResultCache中是否有保存过状态, 即decision中调用过add_result
     4. 如果调用过add_result, 则feautre/status/time按照一一对应的顺序逐个添加至实现的container/result中,
        即在worker中调用feature.flist.append(feature)/result.add_result(status, time)
@@ -134,7 +149,7 @@ class NormalStackWorker(BaseWorker):
         # 必须确保cache的数据容量与container._maxlen相同以防止特征溢出
         for dev, cont, res in self._crimp.generator_dcr():
             columns = list(map(str, self.get_column()[dev]))
-            cache = ResultCache(dev, columns, cont._maxlen)
+            cache = ResultCache(dev, columns, cont._maxlen, cont.flist.storage())
             for fun in self._decision:
                 api = self._api_creater.get_rapi(fun, res)
                 wrapper(api, cache, 'add_result')
@@ -148,24 +163,20 @@ class NormalStackWorker(BaseWorker):
 
     def compute(self):
         # 先运行一遍识别算法
+        # 为了避免逐笔从container的最左侧移除数据, 在所有数据计算完毕后才将数据移动至cache
+        # 所以识别算法计算时container中保留了本次计算中之前的数据
         for device, container, result in self._drive_data(False):
 
             # 识别算法
-            self._run_function(self._function, device, container, result)
-
-            # 拦截特征数据
-            # 缓存至cache中, 等待识别算法抛出结果数据的时候再度放到container容器中
-            cache = self._cache[device]
-            cache.cache_feature(container.flist.get_ref(0))
-            container.flist.pop()
+            self._run_plan('decision', device)
 
         # 第二遍在根据识别算法是否输出结果来决定是否运行评价算法
         for dev, cache in self._cache.items():
             # 拦截特征数据
             # 缓存至cache中, 等待识别算法抛出结果数据的时候再度放到container容器中
             container, result = self._crimp.get_cr(dev)
-            # cache.cache_flist(container.flist)
-            # container.clear()
+            cache.cache_flist(container.flist, raws=container.get_raw())
+            container.clear()
             if cache.size() == 0:
                 continue
 
@@ -182,13 +193,13 @@ class NormalStackWorker(BaseWorker):
             # if self._inspect and self.container_size != self.result_size:
             #     raise Exception(f'特征数据数量({self.container_size})与结果数据数据不一致({self.result_size}).')
 
-            for feature, status, time in cache.generator_cache():
+            for feature, status, time, raw in cache.generator_cache():
                 container.flist.append_item(feature)
+                container.extend_raw([raw])
                 container.next()
                 result.add_result(status, time)
 
-                for fun in self._evaluation:
-                    self._run_function(fun, dev, container, result)
+                self._run_plan('evaluation', dev)
 
                 self._print_result(result)
 
@@ -2,8 +2,10 @@
 
 @create on: 2021.05.10
 """
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
 
+from scdap import config
 from scdap.flag import option_key
 
 from ..function import BaseFunction
@@ -11,6 +13,11 @@ from ..function import BaseFunction
 from .base import BaseWorker, GENERATOR_DCR
 from . import get_worker_class, get_worker_names
 
+# 子算法工作组的执行方式
+SUB_EXECUTOR_SERIAL = 'serial'
+SUB_EXECUTOR_THREAD = 'thread'
+SUB_EXECUTORS = (SUB_EXECUTOR_SERIAL, SUB_EXECUTOR_THREAD)
+
 
 class _TempFunction(BaseFunction):
 
@@ -93,6 +100,16 @@ class SummaryWorker(BaseWorker):
 
         self._aid2worker: Dict[str, BaseWorker] = dict()
 
+        # 子算法工作组的执行方式, 详细见config.SUMMARY_SUB_EXECUTOR
+        self._sub_executor: str = self._get_option(self._option, 'sub_executor', config.SUMMARY_SUB_EXECUTOR)
+        if self._sub_executor not in SUB_EXECUTORS:
+            raise self.wrap_exception(ValueError, f'sub_executor: {self._sub_executor}配置错误, '
+                                                  f'可选的执行方式为: {SUB_EXECUTORS}.')
+        self._sub_pool_size: int = self._get_option(self._option, 'sub_pool_size', config.SUMMARY_SUB_POOL_SIZE)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # 是否存在多个子算法工作组共享同一个点位的情况, 共享点位时数据容器不独立, 只能按顺序计算
+        self._sub_shared: bool = False
+
     def _initial_function(self):
         self._register_function(self._opt_other, self._other, 'summary')
 
@@ -132,6 +149,8 @@ class SummaryWorker(BaseWorker):
             sub_worker.initial()
 
             for d in devices:
+                if d in self._aid2worker:
+                    self._sub_shared = True
                 self._aid2worker[d] = sub_worker
             self._sub_worker[sub_tag] = sub_worker
 
@@ -175,9 +194,23 @@ class SummaryWorker(BaseWorker):
 
     def clear(self):
         super().clear()
+        self._shutdown_pool()
         for sub_worker in self._sub_worker.values():
             sub_worker.clear()
 
+    def disconnect(self, nodes: List[int]):
+        super().disconnect(nodes)
+        self._shutdown_pool()
+
+    def _shutdown_pool(self):
+        """
+        等待子算法工作组的计算结束后关闭线程池, 下一次并行计算时重新创建
+        """
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=True)
+        self._pool = None
+
     def reset(self):
         super().reset()
         for sub_worker in self._sub_worker.values():
@@ -254,10 +287,28 @@ class SummaryWorker(BaseWorker):
             container.next()
             yield algorithm_id, container, result
 
+    def _compute_sub_worker(self):
+        """
+        运行所有的子算法工作组
+        各个子算法工作组拥有独立的数据容器与算法, 所以并行计算的结果与执行顺序无关
+        """
+        if self._sub_executor == SUB_EXECUTOR_SERIAL or self._sub_shared or len(self._sub_worker) <= 1:
+            for worker in self._sub_worker.values():
+                worker()
+            return
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self._sub_pool_size or len(self._sub_worker),
+                                            thread_name_prefix='scdap-summary')
+        futures = [self._pool.submit(worker) for worker in self._sub_worker.values()]
+        # 等待所有的子算法工作组计算完毕后再按照配置的顺序抛出异常, 保证抛出的异常与执行顺序无关
+        wait(futures)
+        for future in futures:
+            future.result()
+
     def compute(self):
         # 各个子worker先行运算
-        for worker in self._sub_worker.values():
-            worker()
+        self._compute_sub_worker()
 
         # 重置指针重新循环一遍数据
         self._crimp.reset_position()
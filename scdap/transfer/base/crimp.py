@@ -161,7 +161,7 @@ class CRImplementer(metaclass=ABCMeta):
         """
         for c, r in self._lcr:
             if r.size():
-                c.flist.remove_range(0, r.size())
+                c.remove_range(0, r.size())
             r.clear()
 
     def clear_container(self):
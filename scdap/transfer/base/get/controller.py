@@ -17,15 +17,29 @@ class BaseGetController(BaseController, metaclass=ABCMeta):
         fi_decoder = data.FeatureItemDecoder(data.FeatureItemKV())
         return data.FeatureListDecoder(data.FeatureListKV(), fi_decoder)
 
-    def _decode(self, container: data.Container, obj: data.TYPE_JSON) -> int:
+    def _decode(self, container: data.Container, obj: data.TYPE_JSON,
+                decoder: data.FeatureListDecoder = None, raws: list = None) -> int:
         if not obj:
             return 0
 
         self.logger_debug(f'decode -> {obj}')
         size = container.size()
-        self._decoder.decode(obj, container.flist)
+        (decoder or self._decoder).decode(obj, container.flist)
+        # 解码器会写入所有的数据, 所以原始数据与解码后的数据一一对应
+        if raws is not None:
+            container.extend_raw(raws)
         return container.size() - size
 
+    def wait(self, timeout: float) -> bool:
+        """
+        堵塞等待数据到达, 进程在计算的间隙调用该方法, 数据到达时立即唤醒进程进行计算
+        默认不进行等待, 能够感知数据到达的传输方式需要实现该方法
+
+        :param timeout: 最长的等待时间, 单位秒
+        :return: 是否有数据到达
+        """
+        return True
+
     def interface_name(self):
         return f'controller:{self.get_controller_name()}.{self.transfer_mode()}'
 
@@ -3,4 +3,6 @@
 @create on: 2020.12.11
 """
 from .controller import RabbitMQGetController
-from .coder import RabbitMQFeatureItemKV, RabbitMQFeatureListKV, get_feature_list_decoder, get_feature_list_encoder
+from .coder import RabbitMQFeatureItemKV, RabbitMQFeatureListKV, get_feature_list_decoder, get_feature_list_encoder, \
+    get_feature_list_binary_decoder, get_feature_list_binary_encoder
+from .binary import pack_feature, unpack_feature
@@ -0,0 +1,244 @@
+"""
+
+@create on: 2026.10.18
+
+rabbitmq特征数据的二进制编码格式
+json格式中高分特征以取对数后的字符串传输, 生产者与消费者都需要花费大量的时间在文本转换上
+二进制格式直接传输小端序的float32数组与int64时间戳, 字段名称与RabbitMQFeatureItemKV的配置一致
+
+一笔特征数据为一个数据帧, 结构如下(均为小端序):
+    header: magic(4s) + version(B) + 字段数量(H)
+    field:  名称长度(B) + 名称(utf-8) + 字段类型(B) + 数量(I) + 数据
+字段类型:
+    TYPE_INT:     int64标量, 数量为1
+    TYPE_FLOAT:   float64标量, 数量为1
+    TYPE_INTS:    int64数组, 数量为数组长度, 用于hrtime
+    TYPE_FLOATS:  float32数组, 数量为数组长度, 用于高分特征, 数值不再取对数
+    TYPE_JSON:    json字符串(utf-8), 数量为字节长度, 用于extend等无法确定类型的字段
+"""
+import json
+import struct
+from typing import Dict, Any, List, Sequence
+
+import numpy as np
+
+from scdap.util.tc import datetime_to_long
+from scdap.data import FeatureItem, FeatureList, FeatureItemEncoder, FeatureItemDecoder, TYPE_JSON
+
+MAGIC = b'SCFB'
+VERSION = 1
+
+TYPE_INT = 1
+TYPE_FLOAT = 2
+TYPE_INTS = 3
+TYPE_FLOATS = 4
+TYPE_JSON_STRING = 5
+
+_HEADER = struct.Struct('<4sBH')
+_FIELD = struct.Struct('<BI')
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+
+_INTS_DTYPE = np.dtype('<i8')
+_FLOATS_DTYPE = np.dtype('<f4')
+
+
+def _pack_value(value: Any):
+    """
+    根据数值类型返回字段类型, 数量以及编码后的数据
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return TYPE_INT, 1, _INT.pack(int(value))
+    if isinstance(value, (int, np.integer)):
+        return TYPE_INT, 1, _INT.pack(int(value))
+    if isinstance(value, (float, np.floating)):
+        return TYPE_FLOAT, 1, _FLOAT.pack(float(value))
+    if isinstance(value, np.ndarray) and value.ndim == 1:
+        if value.dtype.kind in 'iu':
+            return TYPE_INTS, value.shape[0], value.astype(_INTS_DTYPE, copy=False).tobytes()
+        if value.dtype.kind == 'f':
+            return TYPE_FLOATS, value.shape[0], value.astype(_FLOATS_DTYPE, copy=False).tobytes()
+    value = json.dumps(value, ensure_ascii=False).encode('utf-8')
+    return TYPE_JSON_STRING, len(value), value
+
+
+def pack_feature(obj: Dict[str, Any]) -> bytes:
+    """
+    将一笔特征数据编码为二进制数据帧
+
+    :param obj: 字段名称 -> 数值, 数值可以为int/float/ndarray或者可以json序列化的对象
+    :return: 二进制数据帧
+    """
+    buffer = [_HEADER.pack(MAGIC, VERSION, len(obj))]
+    for key, value in obj.items():
+        name = key.encode('utf-8')
+        dtype, count, data = _pack_value(value)
+        buffer.append(bytes((len(name),)))
+        buffer.append(name)
+        buffer.append(_FIELD.pack(dtype, count))
+        buffer.append(data)
+    return b''.join(buffer)
+
+
+def unpack_feature(buffer: bytes) -> Dict[str, Any]:
+    """
+    解码二进制数据帧
+
+    :param buffer: 二进制数据帧
+    :return: 字段名称 -> 数值, 数组类型的字段将返回ndarray
+    """
+    buffer = memoryview(buffer)
+    magic, version, size = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError(f'无法识别的二进制特征数据: magic={bytes(magic)}.')
+    if version != VERSION:
+        raise ValueError(f'不支持的二进制特征数据版本: {version}.')
+
+    offset = _HEADER.size
+    result = dict()
+    for _ in range(size):
+        length = buffer[offset]
+        offset += 1
+        name = bytes(buffer[offset:offset + length]).decode('utf-8')
+        offset += length
+        dtype, count = _FIELD.unpack_from(buffer, offset)
+        offset += _FIELD.size
+
+        if dtype == TYPE_INT:
+            value = _INT.unpack_from(buffer, offset)[0]
+            offset += _INT.size
+        elif dtype == TYPE_FLOAT:
+            value = _FLOAT.unpack_from(buffer, offset)[0]
+            offset += _FLOAT.size
+        elif dtype == TYPE_INTS:
+            value = np.frombuffer(buffer, _INTS_DTYPE, count, offset)
+            offset += count * _INTS_DTYPE.itemsize
+        elif dtype == TYPE_FLOATS:
+            value = np.frombuffer(buffer, _FLOATS_DTYPE, count, offset)
+            offset += count * _FLOATS_DTYPE.itemsize
+        elif dtype == TYPE_JSON_STRING:
+            value = json.loads(bytes(buffer[offset:offset + count]).decode('utf-8'))
+            offset += count
+        else:
+            raise ValueError(f'无法识别的二进制特征字段类型: {name}={dtype}.')
+        result[name] = value
+
+    if offset != len(buffer):
+        raise ValueError(f'二进制特征数据长度错误: {offset} != {len(buffer)}.')
+    return result
+
+
+def _empty_array() -> np.ndarray:
+    return np.array([], dtype=np.float64)
+
+
+class BinaryFeatureItemEncoder(FeatureItemEncoder):
+    """
+    二进制格式的特征数据编码器
+    encode()/encode_batch()返回二进制数据帧
+    """
+    def _encode_array(self, array) -> np.ndarray:
+        return np.asarray(array, dtype=_FLOATS_DTYPE)
+
+    def encode(self, obj: FeatureItem, itemlist: FeatureList) -> bytes:
+        return pack_feature(super().encode(obj, itemlist))
+
+    def encode_batch(self, itemlist: FeatureList, start: int = None, stop: int = None,
+                     keys: Sequence[str] = None) -> List[bytes]:
+        return [pack_feature(obj) for obj in super().encode_batch(itemlist, start, stop, keys)]
+
+    def encode_meanhf(self, obj: FeatureItem):
+        return float(obj.meanhf)
+
+    def encode_meanlf(self, obj: FeatureItem):
+        return float(obj.meanlf)
+
+    def encode_mean(self, obj: FeatureItem):
+        return float(obj.mean)
+
+    def encode_std(self, obj: FeatureItem):
+        return float(obj.std)
+
+    def encode_time(self, obj: FeatureItem):
+        return obj.get_time_ms()
+
+    def encode_hrtime(self, obj: FeatureItem):
+        return np.array([datetime_to_long(time) for time in obj.hrtime], dtype=_INTS_DTYPE)
+
+    def encode_feature1(self, obj: FeatureItem):
+        return self._encode_array(obj.feature1)
+
+    def encode_feature2(self, obj: FeatureItem):
+        return self._encode_array(obj.feature2)
+
+    def encode_feature3(self, obj: FeatureItem):
+        return self._encode_array(obj.feature3)
+
+    def encode_feature4(self, obj: FeatureItem):
+        return self._encode_array(obj.feature4)
+
+    def encode_bandspectrum(self, obj: FeatureItem):
+        return self._encode_array(obj.bandspectrum)
+
+    def encode_peakfreqs(self, obj: FeatureItem):
+        return self._encode_array(obj.peakfreqs)
+
+    def encode_peakpowers(self, obj: FeatureItem):
+        return self._encode_array(obj.peakpowers)
+
+    def encode_customfeature(self, obj: FeatureItem):
+        return self._encode_array(obj.customfeature)
+
+    # 二进制格式中数组无需转换为字符串, 直接切片得到矩阵
+    def _encode_batch_array(self, itemlist: FeatureList, key: str, start: int, stop: int, ln: bool):
+        return [self._encode_array(array) for array in itemlist.get_range(key, start, stop)]
+
+
+class BinaryFeatureItemDecoder(FeatureItemDecoder):
+    """
+    二进制格式的特征数据解码器
+    需要解码的数据为unpack_feature()的解码结果
+    """
+    def _decode_array(self, obj: TYPE_JSON, key: str) -> np.ndarray:
+        value = obj.get(getattr(self.kv, key))
+        if value is None:
+            return _empty_array()
+        return value.astype(np.float64)
+
+    def decode_feature1(self, obj: TYPE_JSON):
+        return self._decode_array(obj, 'feature1')
+
+    def decode_feature2(self, obj: TYPE_JSON):
+        return self._decode_array(obj, 'feature2')
+
+    def decode_feature3(self, obj: TYPE_JSON):
+        return self._decode_array(obj, 'feature3')
+
+    def decode_feature4(self, obj: TYPE_JSON):
+        return self._decode_array(obj, 'feature4')
+
+    def decode_bandspectrum(self, obj: TYPE_JSON):
+        return self._decode_array(obj, 'bandspectrum')
+
+    def decode_hrtime(self, obj: TYPE_JSON):
+        hrtime = obj.get(self.kv.hrtime)
+        if hrtime is None:
+            return list()
+        return super().decode_hrtime({self.kv.hrtime: hrtime.tolist()})
+
+    def decode_peakfreqs(self, obj: TYPE_JSON):
+        return self._decode_array(obj, 'peakfreqs')
+
+    def decode_peakpowers(self, obj: TYPE_JSON):
+        return self._decode_array(obj, 'peakpowers')
+
+    def decode_customfeature(self, obj: TYPE_JSON):
+        return self._decode_array(obj, 'customfeature')
+
+    # 长度一致的数组直接堆叠为(size, width)的矩阵, 否则返回ndarray列表
+    def _decode_batch_array(self, objs: list, key: str, exp: bool):
+        arrays = [self._decode_array(obj, key) for obj in objs]
+        widths = set(array.shape[0] for array in arrays)
+        if len(widths) == 1 and arrays[0].shape[0]:
+            return np.stack(arrays)
+        return arrays
@@ -6,6 +6,8 @@
 from scdap.data import FeatureListKV, FeatureItemKV
 from scdap.data import FeatureListDecoder, FeatureItemDecoder, FeatureItemEncoder, FeatureListEncoder
 
+from .binary import BinaryFeatureItemDecoder, BinaryFeatureItemEncoder
+
 
 class RabbitMQFeatureListKV(FeatureListKV):
     algorithm_id = 'algorithmId'
@@ -51,3 +53,12 @@ def get_feature_list_encoder():
     fi_encoder = FeatureItemEncoder(RabbitMQFeatureItemKV())
     return FeatureListEncoder(RabbitMQFeatureListKV(), fi_encoder)
 
+
+def get_feature_list_binary_decoder():
+    fi_decoder = BinaryFeatureItemDecoder(RabbitMQFeatureItemKV())
+    return FeatureListDecoder(RabbitMQFeatureListKV(), fi_decoder)
+
+
+def get_feature_list_binary_encoder():
+    fi_encoder = BinaryFeatureItemEncoder(RabbitMQFeatureItemKV())
+    return FeatureListEncoder(RabbitMQFeatureListKV(), fi_encoder)
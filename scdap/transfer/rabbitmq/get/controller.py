@@ -2,15 +2,21 @@
 
 @create on: 2020.12.11
 """
+from time import time, sleep
 from uuid import uuid4
 from json import loads
 from random import randint
+from queue import Queue, Empty, Full
+from collections import deque
+from typing import List, Optional
 
 from scdap import config
-from scdap.core.mq import DataGetter
+from scdap.core.mq import DataGetter, NetworkThread
+from scdap.core.mq.data_getter import MessageData, MAX_DRAIN_SIZE, DRAIN_TIMEOUT
 from scdap.data import FeatureListDecoder
 
-from .coder import get_feature_list_decoder
+from .binary import unpack_feature
+from .coder import get_feature_list_decoder, get_feature_list_binary_decoder
 
 from ...base import BaseGetController
 
@@ -26,10 +32,17 @@ class RabbitMQGetController(BaseGetController):
     vhost: str
     heartbeat: int/null
     get_timeout: int            获取数据堵塞的超时时间
+    batch_size: int             单次获取数据的最大数量, <= 0则返回所有已经就绪的数据
+    linger: float               获取到第一笔数据后, 最多再等待linger秒以获取更多的数据进行批量计算
     exchange_name: str          队列数据网关交换机名称
     routing_key_prefix: str     routing_key前缀规则
     queue_name_prefix: str      队列名称前缀
+    binary_content_type: str    二进制格式特征数据的content-type, 其他content-type的数据使用json格式解码
+    keep_raw: bool              是否在数据容器中保留每一笔json格式特征数据的原始字符串, 用于发送控制器的has_feature
+    poll_timeout: float         使用网络线程时, 网络线程中获取数据的堵塞超时时间
+    inbound_size: int           使用网络线程时, 输入队列的容量
 
+    是否使用网络线程由config.RABBITMQ_IO_THREAD统一配置, 见scdap.core.mq.network
     """
     def transfer_mode(self) -> str:
         return 'rabbitmq'
@@ -43,6 +56,11 @@ class RabbitMQGetController(BaseGetController):
         self._max_endurance_limit = self._get_option('max_endurance_limit', config.MAX_ENDURANCE_LIMIT)
 
         self._get_timeout = self._get_option('get_timeout', config.RABBITMQ_GET_TIMEOUT)
+        self._batch_size = self._get_option('batch_size', config.RABBITMQ_GET_BATCH_SIZE)
+        self._linger = self._get_option('linger', config.RABBITMQ_GET_LINGER)
+        self._binary_content_type = self._get_option('binary_content_type', config.RABBITMQ_GET_BINARY_CONTENT_TYPE)
+        self._binary_decoder = get_feature_list_binary_decoder()
+        self._keep_raw = self._get_option('keep_raw', config.RABBITMQ_GET_KEEP_RAW)
 
         host = self._get_option('host', config.RABBITMQ_HOST)
         port = self._get_option('port', config.RABBITMQ_PORT)
@@ -53,7 +71,9 @@ class RabbitMQGetController(BaseGetController):
 
         self._getter = DataGetter(host, port, user, password, vhost, heartbeat,
                                   max_endurance_limit=self._max_endurance_limit,
-                                  endurance_time_func=self._context.systimestamp_s)
+                                  endurance_time_func=self._context.systimestamp_s,
+                                  binary_content_types=(self._binary_content_type, ),
+                                  batch_size=self._batch_size)
 
         # queue_name到算法点位编号的映射
         self._routing_key_to_cont = dict()
@@ -72,10 +92,106 @@ class RabbitMQGetController(BaseGetController):
         self.logger_info(f'queue name: {queue_name}, binding: {routing_keys}')
         self._getter.add_node(self._data_exchange, queue_name, routing_keys)
 
+        # 网络线程模式下, 网络线程获取的数据将放入输入队列中
+        self._io_thread = config.RABBITMQ_IO_THREAD
+        self._network: Optional[NetworkThread] = None
+        self._poll_timeout = self._get_option('poll_timeout', config.RABBITMQ_IO_POLL_TIMEOUT)
+        self._inbound: Queue = Queue(maxsize=self._get_option('inbound_size', config.RABBITMQ_IO_INBOUND_SIZE))
+        # 输入队列满了而无法放入的数据, 在网络线程的下一次任务中重新放入
+        self._backlog = deque()
+
+        # wait()中等待到的数据, 将在下一次run()中解码
+        self._pending: Optional[List[MessageData]] = None
+
+    def initial(self):
+        if self._io_thread:
+            self._network = NetworkThread.get_instance()
+            self._network.register(self._network_task)
+
     def _create_decoder(self) -> FeatureListDecoder:
         return get_feature_list_decoder()
 
-    def run(self):
+    def need_run(self) -> bool:
+        # 网络线程模式下延迟器只用于网络线程中的重连
+        if self._io_thread:
+            return True
+        return super().need_run()
+
+    def _offer(self) -> bool:
+        """
+        将积压的数据放入输入队列, 不会堵塞
+
+        :return: 积压的数据是否全部放入了输入队列
+        """
+        while self._backlog:
+            try:
+                self._inbound.put_nowait(self._backlog[0])
+            except Full:
+                return False
+            self._backlog.popleft()
+        return True
+
+    def _network_task(self) -> bool:
+        """
+        网络线程中执行的任务, 获取数据并放入输入队列
+        网络任务执行时持有网络线程的锁, 所以不能堵塞等待输入队列
+        输入队列满了的时候无法放入的数据将积压至下一次任务, 并且在积压的数据全部放入之前不再获取数据,
+        此时mq中的数据将保留在mq服务中, 发送控制器的网络任务以及close()也不会被堵塞
+
+        :return: 是否获取到了数据
+        """
+        if not self._offer():
+            return False
+        if self._delayer.need_delay():
+            return False
+        messages = self._fetch(self._poll_timeout)
+        if not messages:
+            return False
+        self._backlog.extend(messages)
+        self._offer()
+        return True
+
+    def _receive(self, timeout: float) -> List[MessageData]:
+        """
+        从输入队列中获取数据, 在没有数据时最多堵塞timeout秒
+        获取到第一笔数据后最多再等待linger秒
+        """
+        try:
+            messages = [self._inbound.get(timeout=timeout)]
+        except Empty:
+            return []
+        limit = self._batch_size if self._batch_size > 0 else MAX_DRAIN_SIZE
+        deadline = time() + self._linger
+        while len(messages) < limit:
+            try:
+                remaining = deadline - time()
+                messages.append(self._inbound.get(timeout=remaining) if remaining > 0 else self._inbound.get_nowait())
+            except Empty:
+                break
+        return messages
+
+    def wait(self, timeout: float) -> bool:
+        """
+        堵塞等待数据到达, 获取到的数据将在下一次run()中解码
+        """
+        if self._io_thread:
+            self._pending = self._receive(timeout)
+        elif self._delayer.need_delay():
+            # 重连的延迟期间无法获取数据
+            sleep(timeout)
+            return False
+        else:
+            # drain_events()不支持timeout=0
+            self._pending = self._fetch(max(timeout, DRAIN_TIMEOUT)) or []
+        return bool(self._pending)
+
+    def _fetch(self, timeout: float) -> Optional[List[MessageData]]:
+        """
+        从mq中获取数据
+
+        :param timeout: 超时时间
+        :return: 获取的数据, 获取失败时返回None
+        """
         # 因为send与get共享一个rabbitmq链接
         # 所以当某controller触发重连机制的时候
         # 另一个controller是不知道的
@@ -87,7 +203,7 @@ class RabbitMQGetController(BaseGetController):
             self._reconnect(False)
 
         try:
-            messages = self._getter.get_data(self._get_timeout)
+            return self._getter.get_data(timeout, 0 if self._io_thread else self._linger)
         except Exception as exce:
             # 在某些情况下
             # 如果进程接收到sigterm的同时, rabbitmq正在调用drain_event
@@ -102,43 +218,65 @@ class RabbitMQGetController(BaseGetController):
             # 所以在这里必须增加一个判断是否关机的变量
             # 防止在触发关闭的时候接住了错误导致重连
             if self._is_closed:
-                return
+                return None
 
             self.logger_error(f"mq服务连接失败, 无法获取数据, 将重新建立与mq服务的链接, 错误: {exce}")
             self.logger_exception(exce)
             self._reconnect(True)
-            return
+            return None
+
+    def run(self):
+        if self._pending is not None:
+            messages, self._pending = self._pending, None
+        elif self._io_thread:
+            messages = self._receive(self._get_timeout)
+        else:
+            messages = self._fetch(self._get_timeout)
 
         if not messages:
             self.logger_debug(f'没有获取任何数据.')
             return
 
-        aids = set()
-        nids = set()
-        size = 0
+        # 按照容器汇总所有数据, 同一个容器中连续的相同格式的数据只进行一次批量解码
+        # 格式变化时开始新的一批, 以保证同一个容器的数据按照到达的顺序解码
+        batches = list()
+        last = dict()
         for message in messages:
-            # 解析json数据
+            binary = message.content_type == self._binary_content_type
+            # 根据content-type解析二进制或者json数据
             try:
-                data = loads(message.data)
+                data = unpack_feature(message.data) if binary else loads(message.data)
             except Exception as exce:
                 self.logger_warning(f"数据解码失败, 错误: {exce}.")
-                return
+                continue
 
             container = self._routing_key_to_cont.get(message.routing_key)
             if container is None:
-                return
+                continue
+
+            batch = last.get(container.index)
+            if batch is None or batch[1] != binary:
+                last[container.index] = batch = (container, binary, list(), list())
+                batches.append(batch)
+            batch[2].append(data)
+            # 二进制格式的数据无法直接作为json使用
+            batch[3].append(message.data if not binary and isinstance(message.data, str) else None)
 
+        aids = set()
+        nids = set()
+        size = 0
+        for container, binary, batch, raws in batches:
             # 将数据转换成可以解码的结构
             aid = container.get_algorithm_id()
             nid = container.get_node_id()
             data = {
                 'algorithmId': aid,
                 'nodeId': nid,
-                'data': [data]
+                'data': batch
             }
-            # 进入解码接口进行解码
-            self._decode(container, data)
-            size += 1
+            # 进入解码接口进行批量解码
+            self._decode(container, data, self._binary_decoder if binary else None, raws if self._keep_raw else None)
+            size += len(batch)
             nids.add(nid)
             aids.add(aid)
 
@@ -158,6 +296,10 @@ class RabbitMQGetController(BaseGetController):
             return False
 
     def close(self):
-        self._getter.close_connect()
+        if self._network:
+            self._network.unregister(self._network_task)
+            self._network.call(self._getter.close_connect)
+        else:
+            self._getter.close_connect()
         self._is_closed = True
         super().close()
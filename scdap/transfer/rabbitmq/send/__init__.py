@@ -4,4 +4,6 @@
 """
 from .controller import RabbitMQSendController
 from .coder import RabbitMQResultItemEncoder, RabbitMQResultListEncoder, get_result_list_encoder
+from .coder import RawJSON, dumps_result, get_feature_item_encoder
 from .coder import RabbitMQResultItemKV, RabbitMQEventKV, RabbitMQResultListKV, RabbitMQStatItemKV
+from .coalesce import ResultCoalescer, RESULT_FORMAT_HEADER, RESULT_FORMAT_ARRAY
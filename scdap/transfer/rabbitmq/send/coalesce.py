@@ -0,0 +1,156 @@
+"""
+
+@create on: 2026.10.18
+
+结果数据的合并发送
+每一笔结果数据单独作为一条mq数据发送时, 在设备数量较多的情况下mq服务需要处理大量的数据
+合并发送将多笔结果数据合并为一个json数组作为一条mq数据发送, 并在数据的headers中标识合并的格式:
+    headers: {RESULT_FORMAT_HEADER: RESULT_FORMAT_ARRAY}
+    body: [result1, result2, ...]
+合并的数据在满足以下任意一个条件时发送:
+    1. 数据数量达到max_count
+    2. 数据大小(json字符串长度)达到max_size
+    3. 最早一笔数据的等待时长达到max_age
+"""
+from typing import Dict, List, Optional, Set, Union
+
+from .coder import dumps_result
+
+# 不合并, 每一笔结果数据单独发送
+COALESCE_NONE = 'none'
+# 按照设备合并, 每一条mq数据中只包含一个设备的结果数据
+COALESCE_DEVICE = 'device'
+# 合并进程中所有设备的结果数据
+COALESCE_PROCESS = 'process'
+COALESCE_MODES = (COALESCE_NONE, COALESCE_DEVICE, COALESCE_PROCESS)
+
+# 用于标识合并格式的header
+RESULT_FORMAT_HEADER = 'x-result-format'
+RESULT_FORMAT_ARRAY = 'json-array'
+
+# 发送已经序列化为json字符串的数据时需要配置content_type与content_encoding防止kombu再次序列化
+JSON_PROPERTIES = {
+    'content_type': 'application/json',
+    'content_encoding': 'utf-8'
+}
+
+# 发送合并的数据时需要配置的mq数据属性
+MESSAGE_PROPERTIES = {
+    'headers': {RESULT_FORMAT_HEADER: RESULT_FORMAT_ARRAY},
+    **JSON_PROPERTIES
+}
+
+
+class CoalescedMessage(object):
+    """
+    合并后的一条mq数据
+    """
+    __slots__ = ['body', 'size', 'nids', 'aids']
+
+    def __init__(self, body: str, size: int, nids: Set[int], aids: Set[str]):
+        self.body = body
+        self.size = size
+        self.nids = nids
+        self.aids = aids
+
+
+class _Buffer(object):
+    __slots__ = ['parts', 'length', 'start', 'nids', 'aids']
+
+    def __init__(self, start: float):
+        self.parts: List[str] = list()
+        self.length = 0
+        self.start = start
+        self.nids: Set[int] = set()
+        self.aids: Set[str] = set()
+
+    def add(self, nid: int, aid: str, part: str):
+        self.parts.append(part)
+        # 逗号分隔符
+        self.length += len(part) + 1
+        self.nids.add(nid)
+        self.aids.add(aid)
+
+    def to_message(self) -> CoalescedMessage:
+        return CoalescedMessage(f'[{",".join(self.parts)}]', len(self.parts), self.nids, self.aids)
+
+
+class ResultCoalescer(object):
+    """
+    结果数据合并器
+    """
+    def __init__(self, mode: str, max_count: int, max_size: int, max_age: float, time_func):
+        """
+
+        :param mode: 合并方式, 见COALESCE_MODES
+        :param max_count: 一条mq数据中最多包含的结果数据数量, <= 0则不限制
+        :param max_size: 一条mq数据最大的json字符串长度, <= 0则不限制
+        :param max_age: 最早一笔数据的最长等待时长, 单位秒
+        :param time_func: 获取当前时间戳的方法
+        """
+        if mode not in COALESCE_MODES:
+            raise ValueError(f'合并方式必须为{COALESCE_MODES}中的一个, 而不是: {mode}.')
+        self._mode = mode
+        self._max_count = max_count
+        self._max_size = max_size
+        self._max_age = max_age
+        self._time_func = time_func
+        self._buffers: Dict[Optional[str], _Buffer] = dict()
+        self._ready: List[CoalescedMessage] = list()
+
+    def _key(self, aid: str) -> Optional[str]:
+        return aid if self._mode == COALESCE_DEVICE else None
+
+    def _flush(self, key: Optional[str]):
+        buffer = self._buffers.pop(key, None)
+        if buffer and buffer.parts:
+            self._ready.append(buffer.to_message())
+
+    def add(self, nid: int, aid: str, result: Union[dict, list]):
+        """
+        添加一笔结果数据
+
+        :param nid: 设备编号
+        :param aid: 算法点位编号
+        :param result: 编码后的结果数据
+        """
+        part = dumps_result(result)
+        key = self._key(aid)
+        buffer = self._buffers.get(key)
+        # 加入新的数据后超过大小限制, 则先发送之前的数据
+        if buffer and 0 < self._max_size < buffer.length + len(part) + 1:
+            self._flush(key)
+            buffer = None
+
+        if buffer is None:
+            self._buffers[key] = buffer = _Buffer(self._time_func())
+        buffer.add(nid, aid, part)
+
+        if 0 < self._max_count <= len(buffer.parts) or 0 < self._max_size <= buffer.length + 1:
+            self._flush(key)
+
+    def pop_ready(self, flush: bool = False) -> List[CoalescedMessage]:
+        """
+        获取可以发送的数据, 等待时长超过max_age的数据将被发送
+
+        :param flush: 是否发送所有数据
+        :return: 可以发送的数据
+        """
+        now = self._time_func()
+        for key, buffer in list(self._buffers.items()):
+            if flush or now - buffer.start >= self._max_age:
+                self._flush(key)
+        result = self._ready
+        self._ready = list()
+        return result
+
+    def size(self) -> int:
+        """
+        尚未发送的结果数据数量
+        """
+        return sum(len(buffer.parts) for buffer in self._buffers.values()) + \
+            sum(message.size for message in self._ready)
+
+    def clear(self):
+        self._buffers.clear()
+        self._ready.clear()
@@ -2,8 +2,41 @@
 
 @create on: 2021.01.02
 """
+from typing import Union
+
+from kombu.utils.json import dumps
+
 from scdap import data
 
+from ..get.coder import RabbitMQFeatureItemKV
+
+# 结果数据中附带的特征数据字段
+FEATURE_KEY = 'feature'
+
+
+class RawJSON(str):
+    """
+    已经序列化的json字符串, 比如获取数据时保留的特征数据原始字符串
+    序列化结果数据时将直接拼接, 不再重新编码
+    """
+    __slots__ = []
+
+
+def dumps_result(result: Union[dict, list]) -> str:
+    """
+    将编码后的结果数据序列化为json字符串, 特征数据为RawJSON时直接拼接原始字符串
+
+    :param result: 编码后的结果数据
+    :return: json字符串
+    """
+    if not isinstance(result, dict):
+        return dumps(result)
+    feature = result.get(FEATURE_KEY)
+    if not isinstance(feature, RawJSON):
+        return dumps(result)
+    body = dumps({key: val for key, val in result.items() if key != FEATURE_KEY})
+    return f'{body[:-1]}{"," if len(body) > 2 else ""}"{FEATURE_KEY}":{feature}}}'
+
 
 class RabbitMQResultListKV(data.ResultListKV):
     algorithm_id = 'algorithmId'
@@ -42,7 +75,11 @@ class RabbitMQStatItemKV(data.StatItemKV):
 
 class RabbitMQResultItemEncoder(data.ResultItemEncoder):
     def encode_score(self, obj: data.ResultItem):
-        return dict(zip(self.encode_health_define(obj), super().encode_score(obj)))
+        return dict(zip(obj.health_define, super().encode_score(obj)))
+
+    def encode_batch_score(self, itemlist: data.ResultList, start: int, stop: int):
+        return [dict(zip(health_define, score)) for health_define, score in
+                zip(itemlist.get_range('health_define', start, stop), super().encode_batch_score(itemlist, start, stop))]
 
 
 class RabbitMQResultListEncoder(data.ResultListEncoder):
@@ -88,26 +125,27 @@ class RabbitMQResultListEncoder(data.ResultListEncoder):
         # type = 5 -> 某一类操作结束的标识符 stop -> 必填
         # type = 6 -> 传递extend数据至前端以显示数据, name -> extend 必填
         # type = 7 -> 只是用来向界面的查看人员展示信息而已, message 必填
-        node_id = self.encode_node_id(obj)
-        algorithm_id = self.encode_algorithm_id(obj)
+        head = {
+            self.kv.node_id: self.encode_node_id(obj),
+            self.kv.algorithm_id: self.encode_algorithm_id(obj)
+        }
+        # health_define已经编码至health中, 无需再编码
+        keys = tuple(key for key in obj.select_keys() if key != 'health_define')
+        stat_item = str(self.item_encoder.kv.stat_item)
         result = list()
-        kv = RabbitMQResultItemKV()
-        for o in self.encode_data(obj):
-            temp = {
-                self.kv.node_id: node_id,
-                self.kv.algorithm_id: algorithm_id,
-                **o
-            }
-
+        for o in self.item_encoder.encode_batch(obj, keys=keys):
             # 部分参数不需要编码可以去除
-            temp.pop(kv.health_define, None)
-            if temp.get(kv.stat_item) is None:
-                temp.pop(kv.stat_item, None)
-            result.append(temp)
+            if o.get(stat_item, 0) is None:
+                del o[stat_item]
+            result.append({**head, **o})
 
         return result
 
 
+def get_feature_item_encoder():
+    return data.FeatureItemEncoder(RabbitMQFeatureItemKV())
+
+
 def get_result_list_encoder():
     event_encoder = data.EventEncoder(RabbitMQEventKV())
     si_encoder = data.StatItemEncoder(RabbitMQStatItemKV())
@@ -2,15 +2,17 @@
 
 @create on: 2020.12.11
 """
-from typing import Dict
+from typing import Dict, Optional
 from random import randint
+from queue import Queue, Empty, Full
 from collections import deque
 
 from scdap import config, data
-from scdap.core.mq import DataSender
+from scdap.core.mq import DataSender, NetworkThread
 
 from ...base import BaseSendController
-from .coder import get_result_list_encoder
+from .coder import get_result_list_encoder, get_feature_item_encoder, dumps_result, RawJSON, FEATURE_KEY
+from .coalesce import ResultCoalescer, COALESCE_NONE, MESSAGE_PROPERTIES, JSON_PROPERTIES
 from scdap.middleware.limit import KeyFrequencyLimitation
 
 
@@ -27,6 +29,18 @@ class RabbitMQSendController(BaseSendController):
     queue_name: str         发送结果数据的队列名称
     exchange: str           交换机名称
     has_feature: bool       是否在结果数据中附带特征数据
+                            获取控制器配置keep_raw时将直接使用获取到的特征数据原始字符串, 无需重新编码
+    queue_ttl: float        队列存在的缓存时长, 单位秒, 默认为0即不缓存, 缓存时长内队列被删除的话发送的数据将会丢失
+    batch: bool             是否批量发送结果数据
+    confirm: bool           批量发送时是否使用发布确认
+    confirm_timeout: float  发布确认的超时时间, 单位秒
+    coalesce: str           结果数据的合并发送方式, none/device/process
+    coalesce_count: int     合并发送时一条mq数据中最多包含的结果数据数量
+    coalesce_size: int      合并发送时一条mq数据最大的json字符串长度
+    coalesce_age: float     合并发送时最早一笔结果数据的最长等待时长, 单位秒
+    outbound_timeout: float 使用网络线程时, 输出队列满了的时候计算线程等待的最长时间, 超时后结果数据将被抛弃
+
+    是否使用网络线程由config.RABBITMQ_IO_THREAD统一配置, 见scdap.core.mq.network
     """
     def transfer_mode(self) -> str:
         return 'rabbitmq'
@@ -41,7 +55,13 @@ class RabbitMQSendController(BaseSendController):
         vhost = self._get_option('vhost', config.RABBITMQ_VHOST)
         heartbeat = self._get_option('heartbeat', config.RABBITMQ_HEARTBEAT)
 
-        self._sender = DataSender(host, port, user, password, vhost, heartbeat)
+        self._batch = self._get_option('batch', config.RABBITMQ_SEND_BATCH)
+        queue_ttl = self._get_option('queue_ttl', config.RABBITMQ_SEND_QUEUE_TTL)
+        confirm = self._batch and self._get_option('confirm', config.RABBITMQ_SEND_CONFIRM)
+        confirm_timeout = self._get_option('confirm_timeout', config.RABBITMQ_SEND_CONFIRM_TIMEOUT)
+
+        self._sender = DataSender(host, port, user, password, vhost, heartbeat,
+                                  queue_ttl=queue_ttl, confirm=confirm, confirm_timeout=confirm_timeout)
 
         self._cachelen = self._get_option('cachelen', config.RESULT_CACHELEN)
         self._queue_name = self._get_option('queue_name', config.RABBITMQ_SEND_QUEUE_NAME)
@@ -51,11 +71,40 @@ class RabbitMQSendController(BaseSendController):
         self._sender.add_node(self._exchange_name, self._queue_name, queue_opts={'no_declare': True})
         self._cache = deque(maxlen=self._cachelen)
 
+        self._coalescer = None
+        coalesce = self._get_option('coalesce', config.RABBITMQ_SEND_COALESCE)
+        if coalesce != COALESCE_NONE:
+            self._coalescer = ResultCoalescer(
+                coalesce,
+                self._get_option('coalesce_count', config.RABBITMQ_SEND_COALESCE_COUNT),
+                self._get_option('coalesce_size', config.RABBITMQ_SEND_COALESCE_SIZE),
+                self._get_option('coalesce_age', config.RABBITMQ_SEND_COALESCE_AGE),
+                self._context.systimestamp_s
+            )
+        # 合并后等待发送的数据
+        self._message_cache = deque(maxlen=self._cachelen)
+
         self._has_feature = self._get_option('has_feature', False)
         self._encoder = self._create_encoder()
+        self._feature_encoder = get_feature_item_encoder()
+        # 附带特征数据时结果数据中可能包含特征数据的原始字符串, 需要自行序列化为json字符串后发送
+        self._properties = JSON_PROPERTIES if self._has_feature else dict()
         self._feature_cache: Dict[str, deque] = {aid: deque(maxlen=self._cachelen) for aid in self._context.devices}
         self.limiter = KeyFrequencyLimitation(config.LIMIT_EVENT)
 
+        # 网络线程模式下, 计算线程将编码后的结果数据放入输出队列, 由网络线程取出并发送
+        # 网络线程只在缓存未满时从输出队列取出数据, 所以mq服务无法发送数据时输出队列会被填满,
+        # 此时计算线程将等待outbound_timeout秒, 而不是抛弃最早的数据
+        self._io_thread = config.RABBITMQ_IO_THREAD
+        self._network: Optional[NetworkThread] = None
+        self._outbound: Queue = Queue(maxsize=self._cachelen or 0)
+        self._outbound_timeout = self._get_option('outbound_timeout', config.RABBITMQ_IO_OUTBOUND_TIMEOUT)
+
+    def initial(self):
+        if self._io_thread:
+            self._network = NetworkThread.get_instance()
+            self._network.register(self._network_task)
+
     def _create_encoder(self) -> data.ResultListEncoder:
         return get_result_list_encoder()
 
@@ -63,6 +112,58 @@ class RabbitMQSendController(BaseSendController):
         for cache in self._feature_cache.values():
             cache.clear()
 
+    def _serialize(self, result: dict):
+        return dumps_result(result) if self._has_feature else result
+
+    def _encode_feature(self, container: data.Container) -> list:
+        """
+        编码容器中的特征数据, 保留了原始字符串的数据直接使用原始字符串
+
+        :param container: 数据容器
+        :return: 编码后的特征数据列表
+        """
+        flist = container.flist
+        raws = container.get_raw()
+        if raws is None:
+            return self._feature_encoder.encode_batch(flist)
+        return [self._feature_encoder.encode(flist.get_ref(index), flist) if raw is None else RawJSON(raw)
+                for index, raw in enumerate(raws)]
+
+    def _network_task(self) -> bool:
+        """
+        网络线程中执行的任务, 发送输出队列中的结果数据
+
+        :return: 是否有需要发送的数据
+        """
+        self._take_outbound()
+        if not (self._cache or self._message_cache or (self._coalescer and self._coalescer.size())):
+            return False
+        if self._delayer.need_delay():
+            return False
+        self.run()
+        return bool(self._cache or self._message_cache)
+
+    def _take_outbound(self):
+        """
+        将输出队列中的数据移至缓存, 只在缓存未满时移动数据, 避免缓存超过容量而抛弃数据
+        """
+        while not (self._cachelen and len(self._cache) >= self._cachelen):
+            try:
+                self._cache.append(self._outbound.get_nowait())
+            except Empty:
+                break
+
+    def _put_outbound(self, item: tuple):
+        """
+        将结果数据放入输出队列, 输出队列满了的时候最多等待outbound_timeout秒
+        """
+        try:
+            self._outbound.put(item, timeout=self._outbound_timeout)
+        except Full:
+            nid, aid, _ = item
+            self.logger_error(f'输出队列已满, 等待{self._outbound_timeout}s后仍无法放入结果数据, '
+                              f'[nid: {nid}, aid: {aid}]的结果数据将被抛弃.')
+
     def run(self):
         # 因为send与get共享一个rabbitmq链接
         # 所以当某controller触发重连机制的时候
@@ -73,6 +174,124 @@ class RabbitMQSendController(BaseSendController):
         if self._sender.is_reconnected():
             self.logger_error(f"mq服务连接已经重新建立, 将重置相关队列.")
             self._reconnect(False)
+
+        if self._coalescer:
+            self._run_coalesce()
+        elif self._batch:
+            self._run_batch()
+        else:
+            self._run_single()
+
+    def _run_coalesce(self, flush: bool = False):
+        """
+        合并发送结果数据
+        发送失败时合并后的数据将按照原来的顺序重新放回缓存的最左边
+
+        :param flush: 是否不等待合并条件直接发送所有数据
+        """
+        while self._cache:
+            nid, aid, result = self._cache.popleft()
+            result = self.limiter.limit_event(result)  # 限制算法的事件频率
+            self.logger_info(str(result))
+            self._coalescer.add(nid, aid, result)
+        self._message_cache.extend(self._coalescer.pop_ready(flush))
+        if not self._message_cache:
+            return
+
+        messages = list(self._message_cache)
+        self._message_cache.clear()
+        try:
+            if self._batch:
+                success = self._sender.send_batch(self._queue_name, [message.body for message in messages],
+                                                  self._queue_name, **MESSAGE_PROPERTIES)
+                sent = len(messages) if success else 0
+            else:
+                sent = 0
+                for message in messages:
+                    if not self._sender.send_data(self._queue_name, message.body,
+                                                  self._queue_name, **MESSAGE_PROPERTIES):
+                        break
+                    sent += 1
+        except Exception as e:
+            # 见_run_single()
+            if self._is_closed:
+                return
+
+            self.logger_error(f"mq服务操作失败, 准备重连, 错误: {e}")
+            self.logger_exception(e)
+            # 对于发送失败的数据将重回队列之中
+            # 并且应该放置在最左边
+            self._message_cache.extendleft(reversed(messages))
+            self._reconnect(True)
+            self.exception(e)
+            return
+
+        if sent < len(messages):
+            self.logger_warning(
+                f'mq服务中不存在队列: [{self._queue_name}], '
+                f'在{self._delayer.get_max_num()}s后尝试再次发送数据.'
+            )
+            self._message_cache.extendleft(reversed(messages[sent:]))
+            self._delayer.start()
+
+        if sent:
+            messages = messages[:sent]
+            nids = set().union(*(message.nids for message in messages))
+            aids = set().union(*(message.aids for message in messages))
+            size = sum(message.size for message in messages)
+            self.logger_seco(f'send -> [nid: {list(nids)}, aid: {list(aids)}] '
+                             f'[size: {size}, message: {len(messages)}]')
+
+    def _run_batch(self):
+        """
+        批量发送缓存中的所有结果数据
+        发送失败时所有数据将按照原来的顺序重新放回缓存的最左边
+        """
+        if not self._cache:
+            return
+
+        batch = list()
+        while self._cache:
+            nid, aid, result = self._cache.popleft()
+            result = self.limiter.limit_event(result)  # 限制算法的事件频率
+            self.logger_info(str(result))
+            batch.append((nid, aid, result))
+
+        try:
+            # 后端的结果数据接收队列配置的交换机类型是direct
+            # 意味着队列的routing_key必须与队列名称相同
+            # 队列才能够接收到数据
+            if not self._sender.send_batch(self._queue_name, [self._serialize(result) for _, _, result in batch],
+                                           self._queue_name, **self._properties):
+                self.logger_warning(
+                    f'mq服务中不存在队列: [{self._queue_name}], '
+                    f'在{self._delayer.get_max_num()}s后尝试再次发送数据.'
+                )
+                self._cache.extendleft(reversed(batch))
+                self._delayer.start()
+                return
+        except Exception as e:
+            # 见_run_single()
+            if self._is_closed:
+                return
+
+            self.logger_error(f"mq服务操作失败, 准备重连, 错误: {e}")
+            self.logger_exception(e)
+            # 对于发送失败的数据将重回队列之中
+            # 并且应该放置在最左边
+            self._cache.extendleft(reversed(batch))
+            self._reconnect(True)
+            self.exception(e)
+            return
+
+        nids = set(nid for nid, _, _ in batch)
+        aids = set(aid for _, aid, _ in batch)
+        self.logger_seco(f'send -> [nid: {list(nids)}, aid: {list(aids)}] [size: {len(batch)}]')
+
+    def _run_single(self):
+        """
+        逐笔发送缓存中的结果数据
+        """
         aids = set()
         nids = set()
         size = 0
@@ -84,7 +303,8 @@ class RabbitMQSendController(BaseSendController):
                 # 队列才能够接收到数据
                 result = self.limiter.limit_event(result)  # 限制算法的事件频率
                 self.logger_info(str(result))
-                if self._sender.send_data(self._queue_name, result, self._queue_name):
+                if self._sender.send_data(self._queue_name, self._serialize(result), self._queue_name,
+                                          **self._properties):
                     aids.add(aid)
                     nids.add(nid)
                     size += 1
@@ -125,23 +345,26 @@ class RabbitMQSendController(BaseSendController):
             self.logger_seco(f'send -> [nid: {list(nids)}, aid: {list(aids)}] [size: {size}]')
 
     def need_run(self) -> bool:
+        put = self._put_outbound if self._io_thread else self._cache.append
         for aid, cont, res in self._context.crimp.generator_dcr():
             # 部分环境下需要返回带特征的结果数据
             fcache = self._feature_cache[aid]
             nid = cont.get_node_id()
             if self._has_feature:
-                for obj in cont.flist:
-                    fcache.append(self._encoder.encode(obj))
+                fcache.extend(self._encode_feature(cont))
 
             if res.empty():
                 continue
 
             for obj in self._encode(res):
                 if self._has_feature:
-                    obj['feature'] = fcache.popleft()
+                    obj[FEATURE_KEY] = fcache.popleft()
 
-                self._cache.append((nid, aid, obj))
+                put((nid, aid, obj))
 
+        # 网络线程模式下数据的发送由网络线程进行
+        if self._io_thread:
+            return False
         return super().need_run()
 
     def _reconnect(self, reconnect: bool) -> bool:
@@ -154,7 +377,23 @@ class RabbitMQSendController(BaseSendController):
             self._delayer.start(max_num)
             return False
 
-    def close(self):
+    def _close(self):
+        # 尽可能的发送还在等待合并的数据, 关闭时发送失败则不再重连
+        if self._coalescer and not self._is_closed:
+            self._is_closed = True
+            # 缓存容量有限, 分批将输出队列中的数据移至缓存并发送, 发送失败时不再继续
+            while True:
+                self._take_outbound()
+                self._run_coalesce(True)
+                if self._outbound.empty() or self._message_cache:
+                    break
         self._sender.close_connect()
         self._is_closed = True
+
+    def close(self):
+        if self._network:
+            self._network.unregister(self._network_task)
+            self._network.call(self._close)
+        else:
+            self._close()
         super().close()
@@ -0,0 +1,150 @@
+"""
+
+@create on: 2026.10.18
+
+字符串与ndarray之间的批量编解码
+高分特征在传输中以","分割的字符串表示, 例如:
+feature1: "1.2,3.4,5.6,..."
+解码时需要取自然指数, 编码时需要取对数并保留一位小数
+
+逐笔调用np.fromstring与','.join(map(str, array))在高分特征的场景下占据了大部分的编解码时间
+所以在此提供了批量的编解码方法:
+    1. 解码: 将多个字符串拼接后只进行一次解析, 解析结果直接reshape为(size, width)的矩阵, 并只进行一次自然指数转换
+    2. 编码: 对整个矩阵只进行一次对数与取整, 之后使用固定精度的格式化字符串逐行格式化
+编码结果与','.join(map(str, np.round(array, decimals)))逐字节相同
+固定精度的格式化只在保留一位小数时与str(float)一致, 其他小数位数时逐个使用str格式化
+"""
+from functools import partial
+from typing import List, Union, Iterable
+
+import numpy as np
+
+LOG = np.log
+EXP = np.exp
+FROMSTRING = partial(np.fromstring, dtype=np.float64)
+
+# 默认保留的小数位数
+DEFAULT_DECIMALS = 1
+# 固定精度格式化的数值上限
+# 超过该数值时str(float)可能会使用科学计数法, 与固定精度的格式化结果不一致, 需要逐个使用repr格式化
+FIXED_FORMAT_LIMIT = 1e15
+
+
+def string_to_array(string: str, sep: str = ',', exp: bool = False) -> np.ndarray:
+    """
+    分割字符串并且转型分割后的结果至ndarray
+
+    :param string: 需要分割与转型的字符串
+    :param sep: 分割的依据
+    :param exp: 是否需要转换自然指数
+    :return: 返回ndarray类型的数组
+    """
+    result = FROMSTRING(string or '', sep=sep)
+    if exp:
+        result = EXP(result)
+    return result
+
+
+def strings_to_arrays(strings: List[str], sep: str = ',', exp: bool = False) -> Union[np.ndarray, List[np.ndarray]]:
+    """
+    批量分割字符串并且转型至ndarray
+    将所有字符串拼接后只进行一次解析与一次自然指数的转换
+
+    :param strings: 需要分割与转型的字符串列表
+    :param sep: 分割的依据
+    :param exp: 是否需要转换自然指数
+    :return: 所有字符串长度一致时返回(size, width)的二维数组, 否则返回ndarray列表
+    """
+    strings = [string or '' for string in strings]
+    lengths = [string.count(sep) + 1 if string else 0 for string in strings]
+    total = sum(lengths)
+    if total == 0:
+        return [FROMSTRING('', sep=sep) for _ in strings]
+
+    result = FROMSTRING(sep.join(string for string in strings if string), sep=sep)
+    # 数据格式不规范的时候解析后的长度会与预期不一致, 则退回逐个解析
+    if result.shape[0] != total:
+        return [string_to_array(string, sep, exp) for string in strings]
+
+    if exp:
+        result = EXP(result)
+
+    if lengths.count(lengths[0]) == len(lengths):
+        return result.reshape(len(strings), lengths[0])
+    return np.split(result, np.cumsum(lengths)[:-1])
+
+
+def _format_rows(matrix: np.ndarray, sep: str, decimals: int) -> List[str]:
+    """
+    格式化已经取整的二维float64矩阵
+
+    :param matrix: (size, width)的二维矩阵
+    :param sep: 分割的依据
+    :param decimals: 保留的小数位数
+    :return: 字符串列表
+    """
+    width = matrix.shape[1]
+    if width == 0:
+        return [''] * matrix.shape[0]
+    rows = matrix.tolist()
+    # 保留0位小数时str(float)为'1.0', 保留2位及以上小数时str(float)会省略末尾的0,
+    # 均与固定精度的格式化结果不一致
+    if decimals != DEFAULT_DECIMALS:
+        return [sep.join(map(str, row)) for row in rows]
+    # 在取整至一位小数后, 固定精度的格式化结果与str(float)相同
+    fmt = sep.join([f'%.{decimals}f'] * width)
+    result = [fmt % tuple(row) for row in rows]
+    # 数值过大时str(float)可能使用科学计数法, 这部分数据需要使用repr格式化
+    large = np.abs(matrix) >= FIXED_FORMAT_LIMIT
+    large &= np.isfinite(matrix)
+    for index in np.flatnonzero(large.any(axis=1)).tolist():
+        result[index] = sep.join(map(repr, rows[index]))
+    return result
+
+
+def array_to_string(array: np.ndarray, sep: str = ',', ln: bool = False, decimals: int = DEFAULT_DECIMALS) -> str:
+    """
+    将ndarray反向解析成字符串
+
+    :param array: 需要解析的数组
+    :param sep: 分割的依据
+    :param ln: 是否需要取对数
+    :param decimals: 保留的小数位数
+    :return: 字符串
+    """
+    array = np.asarray(array)
+    if ln:
+        array = LOG(array)
+    array = np.round(array, decimals)
+    if array.dtype != np.float64 or array.ndim != 1:
+        return sep.join(map(str, array))
+    return _format_rows(array[np.newaxis], sep, decimals)[0]
+
+
+def arrays_to_strings(arrays: Union[np.ndarray, Iterable[np.ndarray]], sep: str = ',',
+                      ln: bool = False, decimals: int = DEFAULT_DECIMALS) -> List[str]:
+    """
+    批量将ndarray反向解析成字符串
+    对整个矩阵只进行一次对数与取整
+
+    :param arrays: (size, width)的二维数组或者ndarray列表
+    :param sep: 分割的依据
+    :param ln: 是否需要取对数
+    :param decimals: 保留的小数位数
+    :return: 字符串列表
+    """
+    if not isinstance(arrays, np.ndarray):
+        arrays = list(arrays)
+        if not arrays:
+            return []
+        # 长度不一致的数组无法组成矩阵, 逐个解析
+        if len(set(np.shape(array) for array in arrays)) != 1:
+            return [array_to_string(array, sep, ln, decimals) for array in arrays]
+        arrays = np.asarray(arrays)
+
+    if arrays.ndim != 2 or arrays.dtype != np.float64:
+        return [array_to_string(array, sep, ln, decimals) for array in arrays]
+
+    if ln:
+        arrays = LOG(arrays)
+    return _format_rows(np.round(arrays, decimals), sep, decimals)
@@ -15,6 +15,9 @@ from datetime import datetime, timedelta
 
 import numpy as np
 
+# 字符串与ndarray之间的编解码, 详细见scdap.util.codec
+from .codec import string_to_array, strings_to_arrays, array_to_string, arrays_to_strings
+
 LOG = np.log
 EXP = np.exp
 ARANGE = np.arange
@@ -92,43 +95,36 @@ def long_to_datetime(t: int, ms: bool = True, timestamp_shift: int = 0) -> datet
     return FROMTIMESTAMP(t)
 
 
-def get_next_time(current_time: datetime, delta: int):
+def datetime_to_ms(t: Union[datetime, int]) -> int:
     """
-    获得下一次保存音频的时间
+    将datetime转换为毫秒时间戳
+    与datetime_to_long不同的是使用四舍五入, 避免浮点误差导致毫秒精度的时间在来回转换后相差1ms
+
+    :param t: datetime, 如果是整型则认为已经是毫秒时间戳
+    :return: 毫秒时间戳
     """
-    delta = timedelta(seconds=delta)
-    next_time = (int((current_time - datetime.min) / delta) + 1) * delta + datetime.min
-    return next_time
+    if isinstance(t, (int, np.integer)):
+        return int(t)
+    return int(round(t.timestamp() * 1000))
 
 
-def string_to_array(string: str, sep: str = ',', exp: bool = False) -> np.ndarray:
+def ms_to_datetime(t: int) -> datetime:
     """
-    分割字符串并且转型分割后的结果至ndarray
+    将毫秒时间戳转换为datetime
 
-    :param string: 需要分割与转型的字符串
-    :param sep: 分割的依据
-    :param exp: 是否需要转换自然指数
-    :return: 返回ndarray类型的数组
+    :param t: 毫秒时间戳
+    :return: datetime
     """
-    result = FROMSTRING(string, sep=sep)
-    if exp:
-        result = EXP(result)
-    return result
+    return FROMTIMESTAMP(t / 1000)
 
 
-def array_to_string(array: np.ndarray, sep: str = ',', ln: bool = False) -> str:
+def get_next_time(current_time: datetime, delta: int):
     """
-    将ndarray反向解析成字符串
-
-    :param array: 需要解析的数组
-    :param sep: 分割的依据
-    :param ln: 是否需要取对数
-    :return: 字符串
+    获得下一次保存音频的时间
     """
-    if ln:
-        array = LOG(array)
-    array = ROUND(array)
-    return sep.join(map(str, array))
+    delta = timedelta(seconds=delta)
+    next_time = (int((current_time - datetime.min) / delta) + 1) * delta + datetime.min
+    return next_time
 
 
 def dict_to_str(data: Union[dict, list]) -> str:
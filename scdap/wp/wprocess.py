@@ -31,7 +31,7 @@ class WorkerProcess(LoggerInterface, metaclass=ABCMeta):
     *evaluation: list[dict] 评价算法
     *other: list[dict]      其他算法
     ------------------------------------
-    clock_time: int         进程唤醒与计算的间隔时间
+    clock_time: int         进程唤醒与计算的最长间隔时间, 数据到达时将立即唤醒进程
     extra: dict                 其他参数/controller/worker
                             extra: {
                                 'c_switch': {
@@ -310,8 +310,13 @@ class WorkerProcess(LoggerInterface, metaclass=ABCMeta):
             wake_up_time = time() + clock_time
             self.call_controllers()
             # 运行超时将不进行睡眠直接进入下一次计算
+            timeout = max(wake_up_time - time(), 0)
             if need_sleep and clock_time > 0:
-                sleep(max(wake_up_time - time(), 0))
+                sleep(timeout)
+            elif self.get_controller:
+                # 事件驱动, 数据到达时立即唤醒进行计算
+                # 没有数据时最多等待clock_time, 保证probe/crontab等控制器的运行间隔不超过clock_time
+                self.get_controller.wait(timeout)
 
     def debug_reigster(self):
         from scdap.flag import column
@@ -24,6 +24,8 @@ conf = (
     config.RABBITMQ_VHOST
 )
 delta_time = 1
+# 是否使用二进制格式发送特征数据, 用于与json格式比较吞吐量
+binary_format = False
 
 app = Flask(__name__)
 app.logger.disabled = True
@@ -36,6 +38,7 @@ os.environ["WERKZEUG_RUN_MAIN"] = "true"
 stask: Dict[str, Stack] = dict()
 
 rabbitmq_encoder = rabbitmq.get_feature_list_encoder().item_encoder
+rabbitmq_binary_encoder = rabbitmq.get_feature_list_binary_encoder().item_encoder
 
 
 
@@ -88,7 +91,13 @@ def boardcast_data():
             data, flist = s.get(dev)
 
             print_red(f'rabbitmq send dev: {dev}, seq: {seq}, {data}')
-            if data:
+            if not data:
+                continue
+            if binary_format:
+                data = rabbitmq_binary_encoder.encode(data, flist)
+                broadcast.broadcast(exchange_name, data, f'scene.{dev}', seq,
+                                    config.RABBITMQ_GET_BINARY_CONTENT_TYPE)
+            else:
                 data = rabbitmq_encoder.encode(data, flist)
                 broadcast.broadcast(exchange_name, data, f'scene.{dev}',  seq)
         time.sleep(max(0., next_time - time.time()))
@@ -101,11 +110,12 @@ def get_data():
         print_green('rabbitmq get data:', getter.get_data())
 
 
-def main(delta=1, start_time=None):
+def main(delta=1, start_time=None, binary=False):
     if start_time:
         Stack.start = start_time
-    global delta_time
+    global delta_time, binary_format
     delta_time = delta
+    binary_format = binary
     thread = Thread(target=app.run, daemon=True, args=('0.0.0.0', 8846))
     thread.start()
     thread = Thread(target=get_data, daemon=True)
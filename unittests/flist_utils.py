@@ -7,6 +7,7 @@ from datetime import datetime
 
 import numpy as np
 
+from scdap.data import Container, Result
 from scdap.data.feature_item import FeatureList
 
 
@@ -198,3 +199,41 @@ def random_flist(algorithm_id, columns, size):
     data = random_list_dict(size)
     flist.extend_ldict(**data)
     return flist
+
+
+class FakeWorker(object):
+    """
+    只实现了数据容器与结果容器绑定(bind_worker)所需接口的单点位worker
+    """
+    def __init__(self, column: list = None, health_define: list = None, default_score: list = None,
+                 score_limit: list = None, algorithm_id: str = '0'):
+        self.algorithm_id = algorithm_id
+        self.column = list(column or [])
+        self.health_define = list(health_define or [])
+        self.default_score = list(default_score or [100] * len(self.health_define))
+        self.score_limit = list(score_limit or [True] * len(self.health_define))
+
+    def get_column(self):
+        return {self.algorithm_id: self.column}
+
+    def get_health_define(self):
+        return {self.algorithm_id: self.health_define}
+
+    def get_default_score(self):
+        return {self.algorithm_id: self.default_score}
+
+    def get_score_limit(self):
+        return {self.algorithm_id: self.score_limit}
+
+
+def create_container(column, debug=True, systime_function=datetime.now, algorithm_id='0', **option):
+    container = Container(algorithm_id, 0, 0, systime_function, debug, **option)
+    container.bind_worker(FakeWorker(column, algorithm_id=algorithm_id))
+    return container
+
+
+def create_result(health_define, default_score=None, score_limit=None, debug=False, algorithm_id='0', **option):
+    result = Result(algorithm_id, 0, 0, datetime.now, debug, **option)
+    result.bind_worker(FakeWorker(health_define=health_define, default_score=default_score,
+                                  score_limit=score_limit, algorithm_id=algorithm_id))
+    return result
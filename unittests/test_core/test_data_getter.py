@@ -0,0 +1,201 @@
+"""
+
+@create on: 2026.10.18
+"""
+from collections import deque
+
+import pytest
+
+from scdap.core.mq import data_getter
+from scdap.core.mq.data_getter import DataGetter, SequenceQueue, MessageData
+
+
+class _Message(object):
+    def __init__(self, body, routing_key, seq):
+        self.body = body
+        self.content_type = 'application/json'
+        self.delivery_info = {'routing_key': routing_key}
+        self.headers = {'seq': seq}
+
+    def decode(self):
+        return self.body
+
+    def ack(self):
+        pass
+
+
+class _Consumer(object):
+    def add_queue(self, queue):
+        pass
+
+    def consume(self):
+        pass
+
+
+class _Queue(object):
+    def __init__(self, routing_key):
+        self.routing_key = routing_key
+
+
+class _MQBase(object):
+    """
+    不连接mq服务的mqbase, drain_events()时每一次触发一笔预先放入的数据
+    """
+    def __init__(self, *args):
+        self.callback = None
+        self.messages = deque()
+        self.drain_count = 0
+        self.timeouts = list()
+
+    def get_comsumer(self, callback):
+        self.callback = callback
+        return _Consumer()
+
+    def connect_timestamp(self):
+        return 0
+
+    def get_exchange(self, name, **kwargs):
+        return name
+
+    def get_queue(self, name, exchange, routing_key, **kwargs):
+        return _Queue(routing_key)
+
+    def drain_events(self, timeout=None):
+        self.drain_count += 1
+        self.timeouts.append(timeout)
+        if not self.messages:
+            return False
+        self.callback(self.messages.popleft())
+        return True
+
+
+@pytest.fixture
+def getter_class(monkeypatch):
+    monkeypatch.setattr(data_getter, 'MQBaseClass', _MQBase)
+    return DataGetter
+
+
+class TestDataGetter(object):
+    @staticmethod
+    def put(getter, routing_key, size):
+        for i in range(size):
+            getter._mqbase.messages.append(_Message(f'{routing_key}:{i}', routing_key, i + 1))
+
+    def test_batch(self, getter_class):
+        getter = getter_class('', 0, '', '', new_mqbase=True, max_endurance_limit=100, batch_size=10)
+        getter.add_node('exchange', 'queue', ['a', 'b'])
+        self.put(getter, 'a', 6)
+        self.put(getter, 'b', 2)
+
+        result = getter.get_data()
+        # 每一个队列轮流抛出数据, 并且保持队列内的顺序
+        assert [m.data for m in result] == ['a:0', 'b:0', 'a:1', 'b:1', 'a:2', 'a:3', 'a:4', 'a:5']
+        assert getter.get_data() == []
+
+    def test_batch_limit(self, getter_class):
+        getter = getter_class('', 0, '', '', new_mqbase=True, max_endurance_limit=100, batch_size=3)
+        getter.add_node('exchange', 'queue', ['a', 'b'])
+        self.put(getter, 'a', 2)
+        self.put(getter, 'b', 3)
+
+        # 获取的数据达到batch_size后不再继续获取mq中的数据
+        assert [m.data for m in getter.get_data()] == ['a:0', 'b:0', 'a:1']
+        assert getter._mqbase.messages
+        assert [m.data for m in getter.get_data()] == ['b:1', 'b:2']
+
+    def test_single(self, getter_class):
+        getter = getter_class('', 0, '', '', new_mqbase=True)
+        getter.add_node('exchange', 'queue', ['a', 'b'])
+        self.put(getter, 'a', 2)
+        self.put(getter, 'b', 2)
+        result = [getter.get_data()[0].data for _ in range(4)]
+        assert result == ['a:0', 'a:1', 'b:0', 'b:1']
+
+    def test_linger(self, getter_class):
+        getter = getter_class('', 0, '', '', new_mqbase=True, max_endurance_limit=100, batch_size=10)
+        getter.add_node('exchange', 'queue', ['a', 'b'])
+        self.put(getter, 'a', 3)
+        assert len(getter.get_data(3)) == 3
+        timeouts = getter._mqbase.timeouts
+        assert timeouts[0] == 3
+        assert all(t == data_getter.DRAIN_TIMEOUT for t in timeouts[1:])
+
+        # 获取到第一笔数据后继续等待linger秒
+        timeouts.clear()
+        self.put(getter, 'b', 3)
+        assert len(getter.get_data(3, 10)) == 3
+        assert timeouts[0] == 3
+        assert all(5 < t <= 10 for t in timeouts[1:])
+
+    def test_drain_all(self, getter_class):
+        getter = getter_class('', 0, '', '', new_mqbase=True, max_endurance_limit=100, batch_size=0)
+        getter.add_node('exchange', 'queue', ['a', 'b'])
+        getter.add_node('exchange', 'queue', ['a', 'b'])
+        assert len(getter._data_queue_list) == 2
+        self.put(getter, 'a', 100)
+        self.put(getter, 'b', 100)
+        self.put(getter, 'c', 3)
+        result = getter.get_data()
+        assert len(result) == 203
+        assert [m.data for m in result if m.routing_key == 'c'] == ['c:0', 'c:1', 'c:2']
+        assert [m.data for m in result if m.routing_key == 'b'] == [f'b:{i}' for i in range(100)]
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def quiet_queue(monkeypatch):
+    # 顺序错误时会输出大量的警告日志
+    monkeypatch.setattr(SequenceQueue, 'logger_warning', lambda self, message: None)
+    return SequenceQueue
+
+
+class TestSequenceQueue(object):
+    @staticmethod
+    def seqs(result):
+        return [m.seq for m in result]
+
+    def test_order(self, quiet_queue):
+        clock = _Clock()
+        queue = quiet_queue('test', 10, 5, clock)
+        for seq in [11, 13, 14, 12]:
+            queue.put(MessageData(str(seq), 'a', seq))
+        assert self.seqs(queue.get()) == [11, 12, 13, 14]
+        stats = queue.stats()
+        assert stats['reorders'] == 1 and stats['depth'] == 0
+
+        # 缺少seq=15的数据, 堵塞直到超过忍耐极限
+        queue.put(MessageData('17', 'a', 17))
+        queue.put(MessageData('16', 'a', 16))
+        assert queue.get() == []
+        assert queue.get() == []
+        assert queue.stats()['gap_waits'] == 1
+        assert queue.stats()['depth'] == 2
+        clock.now = 5
+        assert self.seqs(queue.get()) == [16, 17]
+        assert queue.stats()['forced_releases'] == 1
+        assert queue.stats()['reorders'] == 2
+
+        # 过期的数据将被遗弃
+        queue.put(MessageData('15', 'a', 15))
+        assert queue.get() == []
+        assert queue.stats()['stale_drops'] == 1
+
+    def test_overflow(self, quiet_queue):
+        queue = quiet_queue('test', 2)
+        for seq in [11, 14, 13, 15]:
+            queue.put(MessageData(str(seq), 'a', seq))
+        assert queue.stats()['overflow_drops'] == 2
+        assert self.seqs(queue.get()) == [11, 13, 14, 15]
+
+        queue.put(MessageData('19', 'a', 19))
+        queue.reset()
+        assert queue.empty()
+        queue.reset_stats()
+        assert not any(queue.stats().values())
@@ -0,0 +1,144 @@
+"""
+
+@create on: 2026.10.18
+"""
+from collections import defaultdict
+
+import pytest
+
+from scdap.core.mq import data_sender
+from scdap.core.mq.data_sender import DataSender, PublishConfirmError
+
+
+class _Channel(object):
+    def __init__(self):
+        self.events = defaultdict(set)
+        self.confirm_mode = False
+
+    def confirm_select(self):
+        self.confirm_mode = True
+
+
+class _Producer(object):
+    def __init__(self):
+        self.channel = _Channel()
+
+
+class _SimpleQueue(object):
+    def __init__(self):
+        self.producer = _Producer()
+        self.data = list()
+        self.fail = False
+
+    def put(self, message, routing_key=None, **kwargs):
+        if self.fail:
+            raise ConnectionError('publish failed')
+        self.data.append((message, routing_key))
+
+    def close(self):
+        pass
+
+
+class _MQBase(object):
+    """
+    不连接mq服务的mqbase
+    """
+    def __init__(self, *args):
+        self.exists = True
+        self.has_queue_count = 0
+        # drain_events()时确认所有数据(ack)或者拒绝所有数据(nack), None则不进行确认
+        self.confirm = 'basic_ack'
+        self.simple_queue = None
+
+    def connect_timestamp(self):
+        return 0
+
+    def get_exchange(self, name, **kwargs):
+        return name
+
+    def get_queue(self, name, exchange, **kwargs):
+        return type('Queue', (object, ), {'routing_key': name})()
+
+    def get_simplequeue(self, queue):
+        self.simple_queue = _SimpleQueue()
+        return self.simple_queue
+
+    def has_queue(self, queue):
+        self.has_queue_count += 1
+        return self.exists
+
+    def drain_events(self, timeout=None):
+        if self.confirm is None:
+            return False
+        channel = self.simple_queue.producer.channel
+        for callback in channel.events[self.confirm]:
+            callback(len(self.simple_queue.data), True)
+        return True
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def sender_class(monkeypatch):
+    monkeypatch.setattr(data_sender, 'MQBaseClass', _MQBase)
+    return DataSender
+
+
+class TestDataSender(object):
+    def test_queue_ttl(self, sender_class):
+        clock = _Clock()
+        sender = sender_class('', 0, '', '', new_mqbase=True, queue_ttl=10, time_func=clock)
+        sender.add_node('', 'queue')
+        mqbase = sender._mqbase
+        for i in range(5):
+            assert sender.send_data('queue', i, 'queue')
+        assert mqbase.has_queue_count == 1
+
+        clock.now = 10
+        assert sender.send_data('queue', 5, 'queue')
+        assert mqbase.has_queue_count == 2
+
+        # 发送失败时缓存失效
+        mqbase.simple_queue.fail = True
+        with pytest.raises(ConnectionError):
+            sender.send_data('queue', 6, 'queue')
+        mqbase.simple_queue.fail = False
+        mqbase.exists = False
+        assert not sender.send_data('queue', 6, 'queue')
+        assert [d for d, _ in mqbase.simple_queue.data] == list(range(6))
+
+    def test_no_ttl(self, sender_class):
+        sender = sender_class('', 0, '', '', new_mqbase=True)
+        sender.add_node('', 'queue')
+        for i in range(3):
+            assert sender.send_data('queue', i, 'queue')
+        assert sender._mqbase.has_queue_count == 3
+
+    def test_send_batch(self, sender_class):
+        sender = sender_class('', 0, '', '', new_mqbase=True, queue_ttl=10, confirm=True)
+        sender.add_node('', 'queue')
+        mqbase = sender._mqbase
+        assert mqbase.simple_queue.producer.channel.confirm_mode
+        assert sender.send_batch('queue', list(range(10)), 'queue')
+        assert mqbase.has_queue_count == 1
+        assert [d for d, _ in mqbase.simple_queue.data] == list(range(10))
+
+        mqbase.confirm = 'basic_nack'
+        with pytest.raises(PublishConfirmError):
+            sender.send_batch('queue', [10, 11], 'queue')
+
+        mqbase.confirm = None
+        sender._confirm_timeout = 0.01
+        with pytest.raises(PublishConfirmError):
+            sender.send_batch('queue', [12], 'queue')
+        # 确认失败后缓存失效
+        assert mqbase.has_queue_count == 2
+        mqbase.confirm = 'basic_ack'
+        assert sender.send_batch('queue', [13], 'queue')
+        assert mqbase.has_queue_count == 3
@@ -0,0 +1,86 @@
+"""
+
+@create on: 2026.10.18
+"""
+import time
+from threading import Event, current_thread
+
+import pytest
+
+from scdap.core.mq.network import NetworkThread
+
+
+@pytest.fixture(autouse=True)
+def quiet_network(monkeypatch):
+    for name in ['logger_info', 'logger_error', 'logger_exception']:
+        monkeypatch.setattr(NetworkThread, name, lambda self, message: None)
+
+
+def wait(condition, timeout: float = 2):
+    end = time.time() + timeout
+    while time.time() < end:
+        if condition():
+            return True
+        time.sleep(0.001)
+    return False
+
+
+class TestNetworkThread(object):
+    def test_register(self):
+        network = NetworkThread(idle_time=0.001)
+        threads = set()
+        count = [0, 0]
+
+        def task1():
+            threads.add(current_thread())
+            count[0] += 1
+            return False
+
+        def task2():
+            threads.add(current_thread())
+            count[1] += 1
+            raise ConnectionError('test')
+
+        network.register(task1)
+        network.register(task2)
+        assert network.is_alive()
+        # 任务中的异常不会导致网络线程退出
+        assert wait(lambda: count[0] > 3 and count[1] > 3)
+        assert threads and current_thread() not in threads and len(threads) == 1
+
+        network.unregister(task1)
+        assert network.is_alive()
+        value = count[0]
+        assert wait(lambda: count[1] > 10)
+        assert count[0] == value
+
+        network.unregister(task2)
+        assert not network.is_alive()
+
+    def test_call(self):
+        network = NetworkThread(idle_time=0.001)
+        running = Event()
+        released = Event()
+
+        def task():
+            running.set()
+            released.wait(1)
+            return True
+
+        network.register(task)
+        assert running.wait(1)
+        # 网络任务执行期间call()将等待任务结束
+        start = time.time()
+        time.sleep(0.05)
+        released.set()
+        assert network.call(lambda x: x + 1, 1) == 2
+        assert time.time() - start >= 0.05
+        network.unregister(task)
+        assert not network.is_alive()
+
+    def test_instance(self):
+        network = NetworkThread.get_instance()
+        assert NetworkThread.get_instance() is network
+        NetworkThread.clear_instance()
+        assert NetworkThread.get_instance() is not network
+        NetworkThread.clear_instance()
@@ -0,0 +1,101 @@
+"""
+
+@create on: 2026.10.18
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from scdap.data import Container
+from scdap.data.feature_item import FeatureList
+
+from unittests import flist_utils
+
+COLUMNS = ['meanhf', 'hrtime', 'time']
+SYSTIME = datetime(2026, 10, 18, 12)
+# 相对于系统时间的秒数, 包含重复/乱序/超前/落后的数据
+OFFSETS = [-100, -10, -9, -9, -11, -8, 50, -7, -120, -6, -6.5, -5, 30, -4, -3]
+
+
+def create_container(storage, maxlen=None, **option):
+    return flist_utils.create_container(COLUMNS, False, lambda: SYSTIME, storage=storage, maxlen=maxlen, **option)
+
+
+def create_flist(offsets):
+    data = flist_utils.random_list_dict(len(offsets))
+    flist = FeatureList('0', column=COLUMNS)
+    flist.extend_ldict(meanhf=data['meanhf'], hrtime=data['hrtime'],
+                       time=[SYSTIME + timedelta(seconds=o) for o in offsets])
+    return flist
+
+
+def dump(container):
+    flist = container.flist
+    return [(flist.get_meanhf(i), flist.get_time(i), list(flist.get_hrtime(i))) for i in range(flist.size())]
+
+
+@pytest.fixture(autouse=True)
+def warnings(monkeypatch):
+    output = list()
+    monkeypatch.setattr(Container, 'logger_warning', lambda self, msg: output.append(msg))
+    return output
+
+
+@pytest.mark.parametrize('storage', ['list', 'ring'])
+@pytest.mark.parametrize('maxlen', [None, 4])
+@pytest.mark.parametrize('option', [
+    {},
+    {'dump_error_data': False},
+    {'filter_time': [60, 20]},
+    {'filter_time': [60, 20], 'dump_error_data': False},
+])
+class TestContainerExtend(object):
+    def test_extend(self, storage, maxlen, option, warnings):
+        batch = create_container(storage, maxlen, **option)
+        row = create_container(storage, maxlen, **option)
+        for offsets in [OFFSETS[:7], OFFSETS[7:]]:
+            flist = create_flist(offsets)
+            count = batch.extend(flist)
+            assert count == sum(map(row.append, flist.generator()))
+            assert dump(batch) == dump(row)
+            assert batch._previous_time == row._previous_time
+            assert batch._hr_curr_time == row._hr_curr_time
+
+    def test_warning(self, storage, maxlen, option, warnings):
+        container = create_container(storage, maxlen, **option)
+        container.extend(create_flist(OFFSETS))
+        # 被筛选的数据按批次汇总输出一次警告
+        expect = int(container.extend(create_flist(OFFSETS)) < len(OFFSETS))
+        assert len(warnings) == 2 * expect
+        assert container.extend(create_flist([])) == 0
+        assert len(warnings) == 2 * expect
+
+
+@pytest.mark.parametrize('storage', ['list', 'ring'])
+def test_remove_raw(storage):
+    container = create_container(storage, 6)
+    container.extend(create_flist(range(-8, 0)))
+    container.extend_raw(list(range(8)))
+    # 超出容量时原始数据与数据一同被移除
+    assert container.get_raw() == list(range(2, 8))
+    container.remove_range(0, 2)
+    assert container.get_raw() == [4, 5, 6, 7]
+    container.remove(1)
+    assert container.get_raw() == [4, 6, 7]
+    container.remove_range(1)
+    assert container.get_raw() == [4]
+
+
+@pytest.mark.parametrize('storage', ['list', 'ring'])
+def test_extend_raw(storage):
+    container = create_container(storage, 4)
+    # 时间重复的数据被过滤, 对应的原始数据也需要被丢弃
+    offsets = [-10, -10, -9, -8]
+    container.extend(create_flist(offsets), [str(i) for i in range(4)])
+    assert container.size() == 3 and container.get_raw() == ['0', '2', '3']
+    # 超出容量后原始数据依旧与数据一一对应
+    flist = create_flist([-7, -6])
+    container.extend(flist, ['4', '5'])
+    assert container.get_raw() == ['2', '3', '4', '5']
+    assert container.flist.get_meanhf(3) == flist.get_meanhf(1)
+    assert container.flist.get_meanhf(0) != flist.get_meanhf(0)
@@ -0,0 +1,101 @@
+"""
+
+@create on: 2026.10.18
+"""
+import numpy as np
+import pytest
+
+from scdap.data.derived import DerivedCache
+from scdap.frame.api.capi import ContainerAPI
+
+from unittests import flist_utils
+
+COLUMNS = ['meanhf', 'feature1', 'time']
+
+
+class _Function(object):
+    def get_column(self):
+        return ['meanhf']
+
+
+def create_container(size):
+    container = flist_utils.create_container(COLUMNS)
+    container.flist.extend_itemlist(flist_utils.random_flist('0', COLUMNS, size))
+    return container
+
+
+class Counter(object):
+    def __init__(self, fn):
+        self.fn = fn
+        self.count = 0
+
+    def __call__(self, value):
+        self.count += 1
+        return self.fn(value)
+
+
+class TestDerivedCache(object):
+    def test_cache(self):
+        cache = DerivedCache()
+        assert cache.get(0, 'a', 'a', lambda: 1) == 1
+        assert cache.get(0, 'a', 'a', lambda: 2) == 1
+        # 指针位置改变后缓存失效
+        assert cache.get(1, 'a', 'a', lambda: 3) == 3
+        assert len(cache) == 1
+        cache.invalidate()
+        assert len(cache) == 0
+        assert cache.stats() == {'a': (1, 2)}
+        cache.clear_stats()
+        assert cache.stats() == {}
+
+
+class TestContainerDerived(object):
+    def test_derived(self):
+        container = create_container(10)
+        fn = Counter(np.log1p)
+        with pytest.raises(IndexError):
+            container.derived('log', fn, 'meanhf')
+
+        container.next()
+        value = container.derived('log', fn, 'meanhf')
+        assert container.derived('log', fn, 'meanhf') == value == np.log1p(container.flist.get_meanhf())
+        assert fn.count == 1
+
+        # 指针移动后重新计算
+        container.next()
+        assert container.derived('log', fn, 'meanhf') == np.log1p(container.flist.get_meanhf())
+        assert fn.count == 2
+        assert container.derived_cache.stats() == {'log': (1, 2)}
+
+        container.clear()
+        assert len(container.derived_cache) == 0
+
+    def test_window(self):
+        container = create_container(10)
+        fn = Counter(np.sum)
+        container.next()
+        # 数据不足窗口大小时使用现有的所有数据
+        assert container.derived('sum', fn, 'meanhf', 3) == container.flist.get_meanhf()
+        while container.next():
+            pass
+        assert container.derived('sum', fn, 'meanhf', 3) == pytest.approx(
+            sum(container.flist.get_meanhf(i) for i in range(7, 10)))
+        # 不同窗口大小分别缓存
+        container.derived('sum', fn, 'meanhf', 2)
+        container.derived('sum', fn, 'meanhf', 2)
+        assert fn.count == 3
+        with pytest.raises(ValueError):
+            container.derived('sum', fn, 'meanhf', 0)
+
+    def test_api(self):
+        container = create_container(5)
+        container.next()
+        api = ContainerAPI(container, _Function())
+        api.derived('log', np.log1p, 'meanhf')
+        # 接口与容器共享缓存
+        assert container.derived_cache.stats() == {'log': (0, 1)}
+        container.derived('log', np.log1p, 'meanhf')
+        assert container.derived_cache.stats() == {'log': (1, 1)}
+        # 只允许使用算法配置的特征
+        with pytest.raises(NotImplementedError):
+            api.derived('log', np.log1p, 'feature1')
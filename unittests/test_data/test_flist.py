@@ -262,3 +262,43 @@ class TestFeatureItem(object):
 
         flist.set_position(1)
         assert flist.get_position() == 1
+
+    @pytest.mark.parametrize('storage', ['list', 'ring', 'matrix'])
+    def test_cursor(self, storage):
+        column = flist_utils.column().copy()
+        data = flist_utils.random_list_dict(5)
+        flist = FeatureList('0', 0, column, storage=storage)
+        flist.extend_ldict(**data)
+
+        # 游标的读取结果与RefItem一致, 并且每一次返回的都是同一个游标
+        cursors = list()
+        for index, cursor in enumerate(flist.iter_cursor()):
+            ref = flist.get_ref(index)
+            flist_utils.assert_feature_range([getattr(cursor, key) for key in column],
+                                             [getattr(ref, key) for key in column])
+            cursors.append(cursor)
+        assert len(cursors) == 5 and all(c is cursors[0] for c in cursors)
+        assert isinstance(cursors[0], FeatureItem)
+        assert [c.meanhf for c in flist.iter_cursor(1, 3)] == [flist.get_meanhf(1), flist.get_meanhf(2)]
+
+        cursor = flist.cursor(0)
+        assert cursor.move(4) is cursor
+        assert cursor.meanhf == flist.get_meanhf(4)
+        # 写入游标即写入对应位置的数据
+        cursor.meanhf = 1
+        assert flist.get_meanhf(4) == 1
+        with pytest.raises(AttributeError):
+            FeatureList('0', 0, ['meanhf']).cursor(0).mean
+
+    @pytest.mark.parametrize('storage', ['list', 'ring', 'matrix'])
+    def test_iter_columns(self, storage):
+        column = flist_utils.column().copy()
+        flist = FeatureList('0', 0, column, storage=storage)
+        flist.extend_ldict(**flist_utils.random_list_dict(5))
+        rows = list(flist.iter_columns(column))
+        assert len(rows) == 5
+        for index, row in enumerate(rows):
+            flist_utils.assert_feature_range(list(row), [flist.get_value(key, index) for key in column])
+        assert list(flist.iter_columns(['meanhf', 'status'], 3)) == \
+            [(flist.get_meanhf(i), flist.get_status(i)) for i in range(3, 5)]
+        assert list(flist.iter_columns(['meanhf'], 2, 2)) == []
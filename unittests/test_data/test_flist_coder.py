@@ -49,3 +49,33 @@ class TestFeatureListCoder(object):
         dist = encoder.encode(flist)
         src = flist_utils.itemlist_to_decoder_src(data, True)
         assert dist == src
+
+    def test_feature_item_batch_decoder(self):
+        # 批量解码的结果需要与逐笔解码一致
+        decoder = FeatureItemDecoder(FeatureItemKV())
+        data = [flist_utils.random_item_dict() for _ in range(5)]
+        # 长度不一致的数组
+        data[0]['peakfreqs'] = data[0]['peakfreqs'][:3]
+        src = [flist_utils.item_to_decoder_src(d, False) for d in data]
+
+        flist = FeatureList('0', 0, flist_utils.column())
+        assert decoder.decode_batch(src, flist) == len(data)
+        single = FeatureList('0', 0, flist_utils.column())
+        for s in src:
+            decoder.decode(s, single)
+
+        assert flist.size() == single.size() == len(data)
+        for i in range(flist.size()):
+            flist_utils.assert_feature_item(flist.get_ref(i), data[i])
+            single_item = {key: getattr(single.get_ref(i), key) for key in flist_utils.column()}
+            flist_utils.assert_feature_list(flist, single_item, i)
+
+    def test_feature_item_batch_decoder_storage(self):
+        decoder = FeatureItemDecoder(FeatureItemKV())
+        data = [flist_utils.random_item_dict() for _ in range(3)]
+        src = [flist_utils.item_to_decoder_src(d, False) for d in data]
+        flist = FeatureList('0', 0, ['time', 'feature1', 'meanhf'], storage='matrix')
+        decoder.decode_batch(src, flist)
+        assert flist.get_all_feature1().shape == (3, 24)
+        assert flist.get_all_time() == [d['time'] for d in data]
+        assert decoder.decode_batch([], flist) == 0
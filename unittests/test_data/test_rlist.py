@@ -2,9 +2,16 @@
 
 @create on: 2021.05.24
 """
+import json
+from datetime import datetime
+
 import numpy as np
-from unittests import rlist_utils
-from scdap.data.result_item import ResultItem, ResultList, IResult, check
+import pytest
+
+from unittests import rlist_utils, flist_utils
+from scdap.data import STORAGE_LIST, STORAGE_MATRIX
+from scdap.data.result_item import ResultItem, ResultList, IResult, check, score_tolist, DTYPE_SCORE
+from scdap.data.result_item import ResultItemEncoder, ResultItemKV, EventEncoder, EventKV, StatItemEncoder, StatItemKV
 
 
 class TestFeatureItem(object):
@@ -163,3 +170,54 @@ class TestFeatureItem(object):
 
         rlist.set_position(1)
         assert rlist.get_position() == 1
+
+
+class TestCompactResult(object):
+    def create_result(self, storage):
+        return flist_utils.create_result(['trend', 'stab'], [100, 100], [True, False], storage=storage)
+
+    def test_matrix_score(self):
+        result = self.create_result(STORAGE_MATRIX)
+        for i in range(5):
+            result.add_result(0, datetime.now(), i, i + 1)
+        result.add_result(0, datetime.now())
+        rlist = result.rlist
+        scores = rlist.get_all_score()
+        assert isinstance(scores, np.ndarray) and scores.dtype == DTYPE_SCORE and scores.shape == (6, 2)
+
+        rlist.set_simple_score(1, 50, 0)
+        assert rlist.get_simple_score(1, 0) == 50 and type(rlist.get_simple_score(1, 0)) is int
+        assert score_tolist(rlist.get_score(0)) == [0, 50]
+        assert score_tolist(rlist.get_score(5)) == [100, 100]
+
+        result.set_score(1, -30000)
+        assert result.get_score(1) == -30000
+        with pytest.raises(ValueError):
+            result.set_score(1, 40000)
+        with pytest.raises(ValueError):
+            result.set_score_force(1, -40000)
+
+    def test_shared_health_define(self):
+        for storage in [STORAGE_LIST, STORAGE_MATRIX]:
+            result = self.create_result(storage)
+            result.add_result(0, datetime.now())
+            result.add_result(0, datetime.now())
+            rlist = result.rlist
+            assert rlist.get_health_define(0) is rlist.get_health_define(1)
+
+            # 修改时不影响其他数据
+            rlist.set_simple_health_define(0, 'other', 0)
+            assert list(rlist.get_health_define(0)) == ['other', 'stab']
+            assert list(rlist.get_health_define(1)) == ['trend', 'stab']
+
+    def test_encode(self):
+        encoders = list()
+        for storage in [STORAGE_LIST, STORAGE_MATRIX]:
+            result = self.create_result(storage)
+            for i in range(3):
+                result.add_result(i, datetime(2021, 1, 1, 0, 0, i), i, i * 2)
+            encoder = ResultItemEncoder(ResultItemKV(), EventEncoder(EventKV()), StatItemEncoder(StatItemKV()))
+            encoded = encoder.encode_batch(result.rlist)
+            assert encoded == [encoder.encode(ref, result.rlist) for ref in result.rlist.generator()]
+            encoders.append(json.dumps(encoded))
+        assert encoders[0] == encoders[1]
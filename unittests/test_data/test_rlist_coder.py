@@ -53,3 +53,25 @@ class TestResultListCoder(object):
         dist = encoder.encode(rlist)
         src = rlist_utils.itemlist_to_decoder_src(data)
         assert dist == src
+
+    def test_compile_coder(self):
+        from scdap.data.coder import compile_coder, COMPILE_ENCODE, COMPILE_DECODE
+
+        class OtherEventKV(EventKV):
+            name = 'otherName'
+
+        event = Event(name='event')
+        encoder, other = EventEncoder(EventKV()), EventEncoder(OtherEventKV())
+        # 按照(编解码类, kv类, 编译类型, 字段)缓存
+        assert compile_coder(encoder, COMPILE_ENCODE, event.__slots__) is \
+            compile_coder(EventEncoder(EventKV()), COMPILE_ENCODE, list(event.__slots__))
+        assert compile_coder(encoder, COMPILE_ENCODE, event.__slots__) is not \
+            compile_coder(other, COMPILE_ENCODE, event.__slots__)
+        assert compile_coder(EventDecoder(EventKV()), COMPILE_DECODE, event.__slots__) is not \
+            compile_coder(EventDecoder(OtherEventKV()), COMPILE_DECODE, event.__slots__)
+
+        assert encoder.encode(event)['name'] == other.encode(event)['otherName'] == 'event'
+        assert 'name' not in other.encode(event)
+
+        decoded = EventDecoder(OtherEventKV()).decode(other.encode(event), Event())
+        assert decoded.name == 'event'
@@ -0,0 +1,287 @@
+"""
+
+@create on: 2026.10.18
+"""
+import pytest
+import numpy as np
+
+from scdap.data import Container, Result, STORAGE_RING, STORAGE_MATRIX
+from scdap.util.tc import lrtime_to_hrtime, datetime_to_ms, ms_to_datetime
+from scdap.data.storage import RingColumn, MatrixColumn, TimeColumn, HRTimeColumn, create_column, check_storage
+from scdap.data.feature_item import FeatureList
+from scdap.data.result_item import ResultList
+
+from unittests import flist_utils
+
+
+class TestRingColumn(object):
+    def test_create_column(self):
+        assert isinstance(create_column(np.float64, 'list'), list)
+        assert isinstance(create_column(None, STORAGE_RING), list)
+        assert isinstance(create_column(np.float64, STORAGE_RING), RingColumn)
+        assert isinstance(create_column(np.float64, STORAGE_RING, matrix=True), list)
+        assert isinstance(create_column(np.float64, STORAGE_MATRIX, matrix=True), MatrixColumn)
+        assert check_storage(None) == 'list'
+        with pytest.raises(ValueError):
+            check_storage('unknown')
+
+    def test_list_semantics(self):
+        col = RingColumn(np.float64, 4)
+        src = list()
+        for i in range(20):
+            col.append(i)
+            src.append(float(i))
+            if len(src) > 4:
+                del col[:len(src) - 4]
+                del src[:len(src) - 4]
+            assert col.tolist() == src
+        assert col[0] == src[0] and col[-1] == src[-1]
+        assert isinstance(col[0], float)
+        # 缓冲区容量不会因为持续写入而增长
+        assert col.capacity() == 10
+
+        col.extend([100, 101, 102])
+        src.extend([100., 101., 102.])
+        del col[2]
+        del src[2]
+        del col[-1]
+        del src[-1]
+        del col[1:3]
+        del src[1:3]
+        assert col.tolist() == src
+        col[0] = -1
+        assert col[0] == -1
+
+        col.clear()
+        assert len(col) == 0
+        with pytest.raises(IndexError):
+            col[0]
+
+    def test_view_is_stable(self):
+        col = RingColumn(np.int64, 2)
+        col.extend([1, 2])
+        view = col[0:2]
+        assert isinstance(view, np.ndarray)
+        for i in range(10):
+            col.append(i)
+            del col[:1]
+        assert view.tolist() == [1, 2]
+
+        # 清空或者删除右侧数据后写入的数据同样不会改写已经获取的视图
+        col = RingColumn(np.int64, 4)
+        col.extend([1, 2, 3])
+        view = col[:]
+        col.clear()
+        col.extend([7, 8, 9])
+        assert view.tolist() == [1, 2, 3] and col.tolist() == [7, 8, 9]
+        view = col[:]
+        del col[1:]
+        col.append(4)
+        assert view.tolist() == [7, 8, 9] and col.tolist() == [7, 4]
+        # 清空后容量不变
+        assert col.capacity() == 10
+
+
+class TestMatrixColumn(object):
+    def test_matrix(self):
+        col = MatrixColumn(np.float64, 3)
+        rows = [np.arange(4) + i for i in range(5)]
+        for row in rows:
+            col.append(row)
+        del col[:2]
+        view = col[0:3]
+        assert view.shape == (3, 4)
+        assert view.base is not None
+        assert col.width() == 4
+        assert col[0].tolist() == rows[2].tolist()
+        assert [r.tolist() for r in col] == [r.tolist() for r in rows[2:]]
+
+        col.extend(np.ones((2, 4)))
+        assert len(col) == 5
+        assert col[-1].tolist() == [1., 1., 1., 1.]
+
+        view = col[:]
+        col.clear()
+        col.extend(np.zeros((5, 3)))
+        assert view.tolist() == [rows[2].tolist(), rows[3].tolist(), rows[4].tolist(), [1.] * 4, [1.] * 4]
+        assert col.width() == 3
+
+    def test_ragged_fallback(self):
+        col = MatrixColumn(np.float64)
+        col.extend([np.arange(3), np.arange(3)])
+        col.append(np.arange(5))
+        assert col.is_ragged()
+        assert isinstance(col[0:3], list)
+        assert [len(r) for r in col] == [3, 3, 5]
+        del col[0]
+        assert len(col) == 2
+
+        # 清空之后重新使用矩阵储存
+        col.clear()
+        col.extend([np.arange(2), np.arange(2)])
+        assert not col.is_ragged()
+        assert col[0:2].shape == (2, 2)
+
+        col.clear()
+        col.extend([np.arange(2), np.arange(3)])
+        assert col.is_ragged()
+
+
+def random_list_dict(size):
+    # ring/matrix储存方式下时间精度为ms, 高分时间为等间隔的时间序列
+    data = flist_utils.random_list_dict(size)
+    data['time'] = [ms_to_datetime(1600000000000 + i * 1000) for i in range(size)]
+    data['hrtime'] = [lrtime_to_hrtime(None, t, 24) for t in data['time']]
+    return data
+
+
+def random_item_dict():
+    data = flist_utils.random_item_dict()
+    data['hrtime'] = lrtime_to_hrtime(None, data['time'], 24)
+    return data
+
+
+def assert_item(flist, data):
+    item = flist.get_last_ref()
+    for key, val in data.items():
+        if isinstance(val, np.ndarray):
+            assert getattr(item, key).tolist() == val.tolist()
+        else:
+            assert getattr(item, key) == val
+
+
+class TestTimeColumn(object):
+    def test_time(self):
+        col = TimeColumn(2)
+        times = [ms_to_datetime(1600000000000 + i * 1500) for i in range(4)]
+        col.extend(times[:2])
+        col.append(times[2])
+        col.append(datetime_to_ms(times[3]))
+        del col[:2]
+        assert col[0] == times[2]
+        assert col[0:2] == times[2:]
+        assert list(col) == times[2:]
+        assert col.get_ms(slice(None)).tolist() == [datetime_to_ms(t) for t in times[2:]]
+        col[0] = times[0]
+        assert col.get_ms(0) == datetime_to_ms(times[0])
+
+    def test_hrtime(self):
+        col = HRTimeColumn()
+        previous = ms_to_datetime(1600000000000)
+        current = ms_to_datetime(1600000001000)
+        hrtime = lrtime_to_hrtime(previous, current, 24)
+        col.append(hrtime)
+        col.append([])
+        col.append(None)
+        col.set_span(2, datetime_to_ms(current), datetime_to_ms(current) + 2000, 24)
+
+        assert col[0].tolist() == hrtime.tolist()
+        assert col[1] == []
+        assert col[2].tolist() == lrtime_to_hrtime(current, ms_to_datetime(1600000003000), 24).tolist()
+        assert col.get_ms(0).tolist() == [1600000000000 + i * 1000 // 24 for i in range(24)]
+        assert col.get_ms(slice(2, 3)).shape == (1, 24)
+        with pytest.raises(ValueError):
+            col.get_ms(slice(0, 3))
+
+
+class TestRingStorage(object):
+    def test_feature_list(self):
+        column = flist_utils.column().copy()
+        data = random_list_dict(10)
+        flist = FeatureList('0', 0, column, 4, storage=STORAGE_RING)
+        assert flist.storage() == STORAGE_RING
+        assert isinstance(flist.item_list().meanhf, RingColumn)
+        assert isinstance(flist.item_list().feature1, list)
+
+        flist.extend_ldict(**data)
+        assert flist.size() == 4
+        for key, val in data.items():
+            flist_utils.assert_feature_range(flist.get_range(key), val[-4:])
+        assert isinstance(flist.get_all_meanhf(), np.ndarray)
+        assert flist.get_time(3) == data['time'][-1]
+
+        sub = flist.sub_itemlist(0, 2)
+        assert sub.storage() == STORAGE_RING
+        flist_utils.assert_feature_range(sub.get_all_mean(), data['mean'][-4:-2])
+
+        item = random_item_dict()
+        flist.append_dict(**item)
+        assert_item(flist, item)
+
+    @pytest.mark.parametrize('storage', [STORAGE_RING, STORAGE_MATRIX])
+    def test_view_across_clear(self, storage):
+        column = flist_utils.column().copy()
+        data = random_list_dict(8)
+        flist = FeatureList('0', 0, column, 4, storage=storage)
+        flist.extend_ldict(**{key: val[:4] for key, val in data.items()})
+        meanhf = flist.get_all_meanhf()
+        feature1 = flist.get_all_feature1()
+        # 算法跨计算周期保留的数据不会因为容器被清空后写入新数据而改变
+        flist.clear()
+        flist.extend_ldict(**{key: val[4:] for key, val in data.items()})
+        flist_utils.assert_feature_range(meanhf, data['meanhf'][:4])
+        flist_utils.assert_feature_range(feature1, data['feature1'][:4])
+        flist_utils.assert_feature_range(flist.get_all_meanhf(), data['meanhf'][4:])
+
+    def test_matrix_feature_list(self):
+        column = flist_utils.column().copy()
+        data = random_list_dict(10)
+        flist = FeatureList('0', 0, column, 4, storage=STORAGE_MATRIX)
+        assert isinstance(flist.item_list().feature1, MatrixColumn)
+        assert isinstance(flist.item_list().meanhf, RingColumn)
+        assert isinstance(flist.item_list().customfeature, list)
+
+        flist.extend_ldict(**data)
+        for key, val in data.items():
+            flist_utils.assert_feature_range(flist.get_range(key), val[-4:])
+        hrdata = flist.get_all_hrdata()
+        assert all(isinstance(f, np.ndarray) and f.shape == (4, 24) for f in hrdata)
+
+        item = random_item_dict()
+        flist.append_dict(**item)
+        assert_item(flist, item)
+        # peakpowers的长度与之前不一致, 回退为list
+        assert isinstance(flist.get_all_peakpowers(), list)
+        assert flist.get_all_feature1().shape == (4, 24)
+
+        sub = flist.sub_itemlist(0, 2)
+        assert sub.get_all_feature2().tolist() == flist.get_all_feature2()[:2].tolist()
+
+    def test_extend_range(self):
+        column = flist_utils.column().copy()
+        data = random_list_dict(6)
+        for source_storage in [None, STORAGE_RING, STORAGE_MATRIX]:
+            source = FeatureList('0', 0, column, storage=source_storage)
+            source.extend_ldict(**data)
+            for storage in [None, STORAGE_RING, STORAGE_MATRIX]:
+                flist = FeatureList('0', 0, column, storage=storage)
+                flist.extend_itemlist(source, 1, 4)
+                assert flist.size() == 3
+                for key, val in data.items():
+                    flist_utils.assert_feature_range(flist.get_range(key), val[1:4])
+                flist.extend_itemlist(source, 5)
+                flist.extend_itemlist(source, 3, 3)
+                assert flist.size() == 4
+                assert flist.get_time(3) == data['time'][5]
+
+    def test_result_list(self):
+        rlist = ResultList('0', 0, 2, storage=STORAGE_RING)
+        for i in range(3):
+            rlist.append_dict(status=i)
+        assert rlist.get_all_status().tolist() == [1, 2]
+
+    def test_option(self):
+        container = Container('0', 0, 0, None, False, storage=STORAGE_RING)
+        assert container._storage == STORAGE_RING
+        container.flist = FeatureList('0', 0, ['time', 'hrtime', 'meanhf'], storage=STORAGE_RING)
+        container._has_high_reso = True
+        src = random_list_dict(3)
+        src_list = FeatureList('0', 0, ['time', 'hrtime', 'meanhf'])
+        src_list.extend_ldict(**src)
+        assert container.extend(src_list) == 3
+        assert container.flist.get_all_time() == src['time']
+        assert container.flist.get_all_time_ms().tolist() == [1600000000000, 1600000001000, 1600000002000]
+        assert container.flist.get_hrtime(1).tolist() == lrtime_to_hrtime(src['time'][0], src['time'][1], 24).tolist()
+        assert container.flist.get_all_hrtime_ms().shape == (3, 24)
+        result = Result('0', 0, 0, None, False, storage=STORAGE_RING)
+        assert result.rlist.storage() == STORAGE_RING
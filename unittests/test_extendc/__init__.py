@@ -0,0 +1,4 @@
+"""
+
+@create on: 2026.10.18
+"""
@@ -0,0 +1,53 @@
+"""
+
+@create on: 2026.10.18
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from scdap.data import STORAGE_LIST, STORAGE_MATRIX
+from scdap.extendc.stat.controller import DeviceSocreStack
+
+from unittests import flist_utils
+
+
+def create_result(storage, size):
+    random.seed(size)
+    result = flist_utils.create_result(['trend', 'stab', 'other'], [100, 100, 0], [True, True, False],
+                                       storage=storage)
+    time = datetime(2021, 1, 1, 0, 0, 30)
+    for _ in range(size):
+        time += timedelta(seconds=random.choice([1, 5, 20, 70]))
+        result.add_result(random.randint(0, 3), time,
+                          random.choice([0, random.randint(1, 100)]), random.randint(0, 100), random.randint(-5, 5))
+    return result
+
+
+def stat_items(result):
+    return [str(ref.stat_item) for ref in result.rlist.generator()]
+
+
+@pytest.mark.parametrize('storage', [STORAGE_LIST, STORAGE_MATRIX])
+@pytest.mark.parametrize('mode', ['mean', 'min', 'max'])
+def test_run_batch(storage, mode):
+    row_result = create_result(storage, 200)
+    batch_result = create_result(storage, 200)
+    row_stack = DeviceSocreStack(row_result, 3, 60, mode, [True, True, False], print)
+    batch_stack = DeviceSocreStack(batch_result, 3, 60, mode, [True, True, False], print)
+
+    # 分多次统计, 统计间隔跨越多次调用
+    for start, stop in [(0, 50), (50, 51), (51, 200)]:
+        for index in range(start, stop):
+            row_stack.run(row_result.rlist.get_ref(index))
+        sub = batch_result.rlist.sub_itemlist(start, stop)
+        batch_stack.run_batch(sub)
+        for index in range(stop - start):
+            batch_result.rlist.set_stat_item(sub.get_stat_item(index), start + index)
+
+    assert any(ref.stat_item for ref in row_result.rlist.generator())
+    assert stat_items(row_result) == stat_items(batch_result)
+    assert row_stack.status_temp == batch_stack.status_temp
+    assert row_stack.score_temp.tolist() == batch_stack.score_temp.tolist()
+    assert row_stack.stack_size.tolist() == batch_stack.stack_size.tolist()
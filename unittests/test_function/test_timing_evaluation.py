@@ -6,9 +6,11 @@ from typing import List
 from unittest import TestCase
 from datetime import datetime, timedelta
 
+import numpy as np
 import pytest
 
 from scdap.flag import column, ColumnItem
+from scdap.data import STORAGE_LIST, STORAGE_RING
 from scdap.frame.function import TimingEvaluation, BaseFunction
 
 
@@ -280,3 +282,106 @@ class TestEvaluation(TestCase):
         function = Test1(0, [], 0, -1)
         with pytest.raises(Exception):
             function.initial()
+
+    def test_stack_storage(self):
+        for storage in [STORAGE_LIST, STORAGE_RING]:
+            self._test_stack_storage(storage)
+
+    def _test_stack_storage(self, storage):
+        snapshots = list()
+
+        class Test1(EvaluationTest1):
+            def get_analysis_second(self) -> int: return 10
+
+            def get_column(self):
+                return [column.meanhf]
+
+            def get_stack_storage(self) -> str:
+                return storage
+
+            def get_aggregate_column(self) -> List[str]:
+                return [column.meanhf]
+
+            def analysis(self) -> List[int]:
+                snapshots.append((
+                    self.get_stack(column.meanhf).copy(), self.get_stack(column.status, True).copy(),
+                    {s: (a.count, a.sum, a.sum2, a.min, a.max) for s in [0, 1, 2]
+                     for a in [self.get_aggregate(column.meanhf, s)]},
+                    self.get_aggregate(column.meanhf)
+                ))
+                return [10]
+
+        class CAPI(object):
+            def __init__(self):
+                self.time = datetime(2021, 1, 1)
+                self.index = 0
+
+            def get_meanhf(self): return float(self.index % 7)
+
+            def get_status(self): return 0
+
+            def get_time(self): return self.time
+
+            def get_algorithm_id(self): return 0
+
+        class RAPI(CAPI):
+            def __init__(self, capi):
+                super().__init__()
+                self.capi = capi
+                self.score = list()
+
+            def get_status(self): return self.capi.index % 3
+
+            def set_total_score(self, *args):
+                self.score.append(args)
+
+            def get_total_score(self):
+                return self.score
+
+        function = Test1(0, [], 0, -1)
+        function.initial()
+        capi = CAPI()
+        rapi = RAPI(capi)
+        function.set_cr(capi, rapi)
+        for i in range(35):
+            capi.index = i
+            rapi.time = capi.time = capi.time + timedelta(seconds=1)
+            function.compute()
+
+        assert len(snapshots) == 3
+        for meanhf, status, aggregate, total in snapshots:
+            assert isinstance(meanhf, np.ndarray) and meanhf.dtype == np.float64
+            assert meanhf.size == status.size > 0
+            for s in [0, 1, 2]:
+                value = meanhf[status == s]
+                if value.size == 0:
+                    assert aggregate[s][0] == 0
+                    continue
+                assert aggregate[s] == (value.size, value.sum(), (value ** 2).sum(), value.min(), value.max())
+            assert total.count == meanhf.size
+            assert total.mean() == pytest.approx(meanhf.mean())
+            assert total.std() == pytest.approx(meanhf.std())
+        # 计算健康度后清空累积的数据
+        assert 0 < function.stack_size < 10
+        assert function.get_aggregate(column.meanhf).count == function.stack_size
+
+    def test_check_aggregate_column(self):
+        for aggregate_column in [[column.meanlf], [column.feature1], [column.time]]:
+            class Test1(EvaluationTest1):
+                def get_aggregate_column(self) -> List[str]:
+                    return aggregate_column
+
+                def get_column(self):
+                    return [column.meanhf, column.feature1]
+
+            function = Test1(0, [], 0, -1)
+            with pytest.raises(Exception):
+                function.initial()
+
+        class Test1(EvaluationTest1):
+            def get_stack_storage(self) -> str:
+                return 'unknown'
+
+        function = Test1(0, [], 0, -1)
+        with pytest.raises(Exception):
+            function.initial()
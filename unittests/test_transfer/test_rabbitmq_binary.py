@@ -0,0 +1,102 @@
+"""
+
+@create on: 2026.10.18
+"""
+import json
+from datetime import datetime
+
+import pytest
+import numpy as np
+
+from scdap.data import FeatureList
+from scdap.core.mq.data_getter import MessageData
+from scdap.transfer.rabbitmq.get import RabbitMQGetController
+from scdap.transfer.rabbitmq.get.binary import pack_feature, unpack_feature
+from scdap.transfer.rabbitmq.get.coder import RabbitMQFeatureItemKV, \
+    get_feature_list_binary_encoder, get_feature_list_binary_decoder, get_feature_list_encoder, \
+    get_feature_list_decoder
+
+from unittests import flist_utils
+
+BINARY_CONTENT_TYPE = 'application/x-feature'
+
+
+class TestRabbitMQBinaryCoder(object):
+    def test_pack_feature(self):
+        src = {
+            'status': 1,
+            'meanHf': 1.5,
+            'hrtime': np.arange(3, dtype=np.int64),
+            'feature1': np.array([1., 2.5]),
+            'extend': {'test': '1'}
+        }
+        dist = unpack_feature(pack_feature(src))
+        assert dist['status'] == 1 and dist['meanHf'] == 1.5
+        assert dist['hrtime'].tolist() == [0, 1, 2]
+        assert dist['feature1'].dtype == np.float32
+        assert dist['feature1'].tolist() == [1., 2.5]
+        assert dist['extend'] == {'test': '1'}
+
+        with pytest.raises(ValueError):
+            unpack_feature(b'JSON' + pack_feature(src)[4:])
+        with pytest.raises(ValueError):
+            unpack_feature(pack_feature(src) + b'\x00')
+
+    def test_binary_coder(self):
+        # 二进制格式与json格式的字段名称一致, 并且编解码的结果一致
+        column = flist_utils.column()
+        data = [flist_utils.random_item_dict() for _ in range(3)]
+        # 长度不一致的数组
+        data[0]['peakfreqs'] = data[0]['peakfreqs'][:3]
+        flist = FeatureList('0', 0, column)
+        for d in data:
+            flist.append_dict(**d)
+
+        encoder = get_feature_list_binary_encoder().item_encoder
+        messages = encoder.encode_batch(flist)
+        assert messages[0] == encoder.encode(flist.get_ref(0), flist)
+        objs = [unpack_feature(message) for message in messages]
+        json_obj = get_feature_list_encoder().item_encoder.encode(flist.get_ref(0), flist)
+        assert set(objs[0].keys()) == set(json_obj.keys())
+        assert RabbitMQFeatureItemKV.meanhf in objs[0]
+
+        decoder = get_feature_list_binary_decoder()
+        dist = FeatureList('0', 0, column)
+        decoder.decode({'algorithmId': '0', 'nodeId': 0, 'data': objs}, dist)
+        assert dist.size() == len(data)
+        for i, d in enumerate(data):
+            flist_utils.assert_feature_item(dist.get_ref(i), d)
+
+        dist = FeatureList('0', 0, column)
+        decoder.item_decoder.decode(objs[1], dist)
+        flist_utils.assert_feature_item(dist.get_last_ref(), data[1])
+
+    def test_encode_batch_keys(self):
+        flist = FeatureList('0', 0, ['meanhf', 'time'])
+        flist.extend_ldict(meanhf=[1., 2.], time=[datetime(2026, 10, 18), datetime(2026, 10, 18, 0, 0, 1)])
+        messages = get_feature_list_binary_encoder().item_encoder.encode_batch(flist, keys=['meanhf'])
+        assert [set(unpack_feature(message).keys()) for message in messages] == [{RabbitMQFeatureItemKV.meanhf}] * 2
+
+    def test_interleaved(self, monkeypatch):
+        # 同一个容器交替到达的json与二进制数据需要按照到达的顺序解码
+        column = ['meanhf', 'time']
+        source = FeatureList('0', 0, column)
+        source.extend_ldict(meanhf=list(range(6)), time=[datetime(2026, 10, 18, 0, 0, i) for i in range(6)])
+        json_objs = get_feature_list_encoder().item_encoder.encode_batch(source)
+        binary_objs = get_feature_list_binary_encoder().item_encoder.encode_batch(source)
+        messages = [MessageData(binary_objs[i], 'key', content_type=BINARY_CONTENT_TYPE) if i in (1, 2, 4)
+                    else MessageData(json.dumps(json_objs[i]), 'key') for i in range(6)]
+
+        controller = RabbitMQGetController.__new__(RabbitMQGetController)
+        container = flist_utils.create_container(column)
+        controller._pending = messages
+        controller._routing_key_to_cont = {'key': container}
+        controller._binary_content_type = BINARY_CONTENT_TYPE
+        controller._binary_decoder = get_feature_list_binary_decoder()
+        controller._decoder = get_feature_list_decoder()
+        controller._keep_raw = False
+        for name in ['logger_debug', 'logger_seco', 'logger_warning']:
+            monkeypatch.setattr(controller, name, lambda message: None, raising=False)
+        controller.run()
+        assert [container.flist.get_meanhf(i) for i in range(6)] == list(range(6))
+        assert [container.flist.get_time(i) for i in range(6)] == source.get_range('time')
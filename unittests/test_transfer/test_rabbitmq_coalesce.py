@@ -0,0 +1,64 @@
+"""
+
+@create on: 2026.10.18
+"""
+import json
+
+import pytest
+
+from scdap.transfer.rabbitmq.send.coalesce import ResultCoalescer, COALESCE_DEVICE, COALESCE_PROCESS
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def result(aid, i):
+    return {'algorithmId': aid, 'nodeId': int(aid), 'status': i}
+
+
+class TestResultCoalescer(object):
+    def test_count(self):
+        clock = _Clock()
+        coalescer = ResultCoalescer(COALESCE_PROCESS, 3, 0, 10, clock)
+        for i in range(7):
+            coalescer.add(int(str(i % 2)), str(i % 2), result(str(i % 2), i))
+        messages = coalescer.pop_ready()
+        assert [m.size for m in messages] == [3, 3]
+        assert json.loads(messages[0].body) == [result(str(i % 2), i) for i in range(3)]
+        assert messages[0].nids == {0, 1} and messages[0].aids == {'0', '1'}
+        assert coalescer.size() == 1
+
+        # 等待时长超过max_age
+        clock.now = 10
+        messages = coalescer.pop_ready()
+        assert [m.size for m in messages] == [1]
+        assert coalescer.size() == 0
+
+    def test_device(self):
+        clock = _Clock()
+        coalescer = ResultCoalescer(COALESCE_DEVICE, 0, 0, 10, clock)
+        for i in range(4):
+            coalescer.add(i % 2, str(i % 2), result(str(i % 2), i))
+        assert coalescer.pop_ready() == []
+        messages = coalescer.pop_ready(True)
+        assert sorted(json.loads(m.body)[0]['algorithmId'] for m in messages) == ['0', '1']
+        for m in messages:
+            assert len(m.aids) == 1 and m.size == 2
+
+    def test_size(self):
+        clock = _Clock()
+        size = len(json.dumps(result('0', 0)))
+        coalescer = ResultCoalescer(COALESCE_PROCESS, 0, size * 2 + 3, 10, clock)
+        for i in range(5):
+            coalescer.add(0, '0', result('0', i))
+        messages = coalescer.pop_ready(True)
+        assert [m.size for m in messages] == [2, 2, 1]
+        assert all(len(m.body) <= size * 2 + 3 for m in messages)
+
+        with pytest.raises(ValueError):
+            ResultCoalescer('unknown', 0, 0, 10, clock)
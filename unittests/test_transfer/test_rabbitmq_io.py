@@ -0,0 +1,79 @@
+"""
+
+@create on: 2026.10.18
+"""
+from queue import Queue
+from collections import deque
+
+from scdap.transfer.rabbitmq.get import RabbitMQGetController
+from scdap.transfer.rabbitmq.send import RabbitMQSendController
+
+
+class _Delayer(object):
+    def need_delay(self):
+        return False
+
+
+def create_get_controller(inbound_size, batches):
+    controller = RabbitMQGetController.__new__(RabbitMQGetController)
+    controller._inbound = Queue(maxsize=inbound_size)
+    controller._backlog = deque()
+    controller._delayer = _Delayer()
+    controller._poll_timeout = 0
+    fetched = list()
+
+    def fetch(timeout):
+        fetched.append(timeout)
+        return batches.pop(0) if batches else []
+
+    controller._fetch = fetch
+    return controller, fetched
+
+
+def create_send_controller(cachelen, errors):
+    controller = RabbitMQSendController.__new__(RabbitMQSendController)
+    controller._cachelen = cachelen
+    controller._cache = deque(maxlen=cachelen)
+    controller._outbound = Queue(maxsize=cachelen)
+    controller._outbound_timeout = 0.01
+    controller.logger_error = errors.append
+    return controller
+
+
+class TestNetworkQueue(object):
+    def test_inbound(self):
+        controller, fetched = create_get_controller(2, [[1, 2, 3], [4]])
+        # 输入队列满了的时候不会堵塞, 无法放入的数据积压至下一次任务
+        assert controller._network_task()
+        assert list(controller._backlog) == [3]
+        # 积压的数据全部放入之前不再获取数据
+        assert not controller._network_task()
+        assert len(fetched) == 1
+
+        assert controller._inbound.get_nowait() == 1
+        assert controller._network_task()
+        assert len(fetched) == 2
+        assert [controller._inbound.get_nowait() for _ in range(2)] == [2, 3]
+        assert list(controller._backlog) == [4]
+
+    def test_outbound(self):
+        errors = list()
+        controller = create_send_controller(2, errors)
+        for i in range(2):
+            controller._put_outbound((0, '0', i))
+        controller._take_outbound()
+        for i in range(2, 4):
+            controller._put_outbound((0, '0', i))
+        assert not errors
+        # 缓存未满时才会取出数据, 缓存中的数据不会被抛弃
+        controller._take_outbound()
+        assert list(controller._cache) == [(0, '0', 0), (0, '0', 1)]
+        assert controller._outbound.qsize() == 2
+
+        # 输出队列满了的时候等待超时后输出错误日志
+        controller._put_outbound((0, '0', 4))
+        assert len(errors) == 1
+
+        controller._cache.clear()
+        controller._take_outbound()
+        assert list(controller._cache) == [(0, '0', 2), (0, '0', 3)]
@@ -0,0 +1,67 @@
+"""
+
+@create on: 2026.10.18
+"""
+import json
+
+from scdap.transfer.rabbitmq.send import RabbitMQSendController, RawJSON, dumps_result, get_feature_item_encoder
+from scdap.transfer.rabbitmq.send.coalesce import ResultCoalescer, COALESCE_PROCESS
+from scdap.transfer.rabbitmq.get.coder import get_feature_list_decoder
+
+from unittests.flist_utils import random_flist, create_container
+
+COLUMNS = ['meanhf', 'feature1', 'time']
+
+
+def create_raws(size):
+    # 模拟获取控制器从mq获取到的json字符串
+    encoder = get_feature_item_encoder()
+    return [json.dumps(obj) for obj in encoder.encode_batch(random_flist('0', COLUMNS, size))]
+
+
+def decode(container, raws):
+    get_feature_list_decoder().decode({'algorithmId': '0', 'nodeId': 0, 'data': list(map(json.loads, raws))},
+                                      container.flist)
+    container.extend_raw(raws)
+
+
+class TestRawFeature(object):
+    def test_dumps_result(self):
+        result = {'status': 1, 'feature': RawJSON('{"meanHf": 1, "feature1": "1,2"}')}
+        assert json.loads(dumps_result(result)) == {'status': 1, 'feature': {'meanHf': 1, 'feature1': '1,2'}}
+        assert json.loads(dumps_result({'feature': RawJSON('{}')})) == {'feature': {}}
+        assert json.loads(dumps_result({'status': 1, 'feature': {'a': 1}})) == {'status': 1, 'feature': {'a': 1}}
+
+        coalescer = ResultCoalescer(COALESCE_PROCESS, 0, 0, 10, lambda: 0)
+        coalescer.add(0, '0', result)
+        assert json.loads(coalescer.pop_ready(True)[0].body) == [json.loads(dumps_result(result))]
+
+    def test_container(self):
+        container = create_container(COLUMNS)
+        raws = create_raws(5)
+        decode(container, raws)
+        assert container.get_raw() == raws
+
+        # 数据被移除后无法一一对应
+        container.flist.remove(0)
+        assert container.get_raw() is None
+        container.clear()
+        assert container.get_raw() == []
+
+    def test_encode_feature(self):
+        controller = RabbitMQSendController.__new__(RabbitMQSendController)
+        controller._feature_encoder = get_feature_item_encoder()
+
+        container = create_container(COLUMNS)
+        raws = create_raws(3)
+        decode(container, raws)
+        # 二进制数据等没有原始字符串的数据需要重新编码
+        container._raw[1] = None
+        features = controller._encode_feature(container)
+        assert features[0] == raws[0] and isinstance(features[0], RawJSON)
+        assert features[1] == controller._feature_encoder.encode(container.flist.get_ref(1), container.flist)
+        assert features[2] == raws[2]
+
+        # 没有保留原始字符串时全部重新编码
+        container.extend_raw([None])
+        assert controller._encode_feature(container) == controller._feature_encoder.encode_batch(container.flist)
@@ -0,0 +1,62 @@
+"""
+
+@create on: 2026.10.18
+"""
+import warnings
+
+import numpy as np
+
+from scdap.util import codec
+
+
+def old_array_to_string(array, ln, decimals=1):
+    # 原有的编码方式, 用于校验编码结果逐字节相同
+    if ln:
+        array = np.log(array)
+    return ','.join(map(str, np.round(array, decimals)))
+
+
+class TestCodec(object):
+    def test_array_to_string(self):
+        rng = np.random.default_rng(0)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            cases = [
+                np.array([0., -0., np.nan, np.inf, -np.inf, 1e16, -3e17, 0.05, 0.15, 0.25, 2.35, 123456789012345.6]),
+                np.zeros(0),
+                np.arange(5)
+            ]
+            cases += [rng.normal(size=24) * 10. ** rng.integers(-3, 19) for _ in range(500)]
+            for array in cases:
+                for ln in (False, True):
+                    assert codec.array_to_string(array, ln=ln) == old_array_to_string(array, ln)
+
+    def test_arrays_to_strings(self):
+        matrix = np.random.random_sample((50, 24)) * 1000
+        assert codec.arrays_to_strings(matrix, ln=True) == [old_array_to_string(row, True) for row in matrix]
+        rows = [np.arange(3.), np.arange(4.)]
+        assert codec.arrays_to_strings(rows) == [old_array_to_string(row, False) for row in rows]
+        assert codec.arrays_to_strings([]) == []
+
+    def test_decimals(self):
+        rng = np.random.default_rng(1)
+        cases = [np.array([0., -0., 0.5, 1.25, 2.5, 3.14159, 10., 1e16, np.nan, np.inf])]
+        cases += [rng.normal(size=24) * 10. ** rng.integers(-3, 6) for _ in range(100)]
+        for decimals in (0, 2, 3):
+            for array in cases:
+                assert codec.array_to_string(array, decimals=decimals) == old_array_to_string(array, False, decimals)
+            matrix = np.asarray(cases[1:])
+            assert codec.arrays_to_strings(matrix, decimals=decimals) == \
+                [old_array_to_string(row, False, decimals) for row in matrix]
+
+    def test_strings_to_arrays(self):
+        matrix = np.round(np.random.random_sample((5, 24)) * 10, 1)
+        strings = codec.arrays_to_strings(matrix)
+        result = codec.strings_to_arrays(strings)
+        assert isinstance(result, np.ndarray) and result.shape == (5, 24)
+        assert result.tolist() == matrix.tolist()
+        assert np.allclose(codec.strings_to_arrays(strings, exp=True), np.exp(matrix))
+
+        result = codec.strings_to_arrays(['1,2', '', None, '3'])
+        assert [r.tolist() for r in result] == [[1., 2.], [], [], [3.]]
+        assert codec.string_to_array('1.5,2', exp=False).tolist() == [1.5, 2.]
@@ -0,0 +1,306 @@
+"""
+
+@create on: 2026.10.18
+"""
+from datetime import datetime
+from threading import current_thread
+from typing import List
+
+import numpy as np
+import pytest
+
+from scdap.flag import column
+from scdap.data import Container, Result
+from scdap.frame.function import BaseFunction, BaseDecision, BaseEvaluation
+from scdap.frame.worker.normal_realtime import NormalRealTimeWorker
+
+from unittests.flist_utils import random_flist
+
+
+class _Information(object):
+    @staticmethod
+    def get_information() -> dict:
+        return {
+            'author': '',
+            'description': '',
+            'email': '',
+            'version': ''
+        }
+
+    def is_realtime_function(self) -> bool:
+        return True
+
+    def set_parameter(self, parameter: dict):
+        pass
+
+    def reset(self):
+        pass
+
+
+class BatchDecision(_Information, BaseDecision):
+    def get_column(self) -> List[str]:
+        return [column.meanhf]
+
+    @staticmethod
+    def get_function_name() -> str:
+        return 'batchdecision9001'
+
+    def compute(self):
+        self.result.set_status(int(self.container.get_meanhf() > 500))
+
+    def compute_batch(self, data, status):
+        return (np.asarray(data[column.meanhf]) > 500).astype(np.int64)
+
+
+class BatchEvaluation(_Information, BaseEvaluation):
+    def get_health_define(self) -> List[str]:
+        return ['batch_a', 'batch_b']
+
+    def get_column(self) -> List[str]:
+        return [column.meanhf]
+
+    @staticmethod
+    def get_function_name() -> str:
+        return 'batchevaluation9002'
+
+    def compute(self):
+        # 识别结果为0时健康度为0, 延续之前的健康度
+        status = self.result.get_status()
+        self.result.set_total_score(status * (int(self.container.get_meanhf()) % 100), 50 + status)
+
+    def compute_batch(self, data, status):
+        meanhf = np.asarray(data[column.meanhf]).astype(np.int64) % 100
+        return np.stack([status * meanhf, 50 + status], axis=1)
+
+
+class RowDecision(BatchDecision):
+    @staticmethod
+    def get_function_name() -> str:
+        return 'rowdecision9003'
+
+    compute_batch = BaseFunction.compute_batch
+
+
+class _Crimp(object):
+    def __init__(self, devices):
+        self._ldcr = list()
+        for index, dev in enumerate(devices):
+            container = Container(dev, index, index, datetime.now, True)
+            result = Result(dev, index, index, datetime.now, True)
+            self._ldcr.append((dev, container, result))
+
+    def get_cr(self, dev):
+        for aid, container, result in self._ldcr:
+            if aid == dev:
+                return container, result
+
+    def copy_ldcr(self):
+        return self._ldcr.copy()
+
+    def generator_dcr(self):
+        for dcr in self._ldcr:
+            yield dcr
+
+    def generator_cr(self):
+        for _, container, result in self._ldcr:
+            yield container, result
+
+    def generator_result(self):
+        for _, _, result in self._ldcr:
+            yield result
+
+
+@pytest.fixture(autouse=True)
+def offline_function(monkeypatch):
+    # 不通过接口获取健康度定义
+    monkeypatch.setattr(BaseFunction, 'get_score_limit', lambda self: [True] * self.get_health_size())
+    monkeypatch.setattr(BaseFunction, 'get_score_reverse', lambda self: [True] * self.get_health_size())
+
+
+def create_worker(devices, decision, **option):
+    crimp = _Crimp(devices)
+    worker = NormalRealTimeWorker(devices[0], tuple(devices), crimp,
+                                  [{'function': decision}], [{'function': BatchEvaluation}], debug=True, **option)
+    worker.initial()
+    for _, container, result in crimp.generator_dcr():
+        container.bind_worker(worker)
+        result.bind_worker(worker)
+    worker.bind_crimp()
+    return worker, crimp
+
+
+def fill(size, *crimps):
+    for dev, container, _ in crimps[0].generator_dcr():
+        flist = random_flist(dev, list(map(str, container.flist.select_keys())), size)
+        for crimp in crimps:
+            crimp.get_cr(dev)[0].flist.extend_itemlist(flist)
+
+
+def results(crimp):
+    output = dict()
+    for dev, _, result in crimp.generator_dcr():
+        rlist = result.rlist
+        output[dev] = [(rlist.get_status(i), rlist.get_time(i), list(rlist.get_score(i))) for i in range(rlist.size())]
+    return output
+
+
+class TestComputeBatch(object):
+    def test_has_compute_batch(self):
+        worker, _ = create_worker(['100'], BatchDecision)
+        assert worker.can_compute_batch()
+        worker, _ = create_worker(['100'], RowDecision)
+        assert not worker.can_compute_batch()
+        worker, _ = create_worker(['100'], BatchDecision, compute_batch=False)
+        assert not worker.can_compute_batch()
+        # 批量计算不会运行其他算法, 也不会并行计算
+        worker, _ = create_worker(['100', '101'], BatchDecision, device_executor='thread')
+        assert worker.is_parallel() and not worker.can_compute_batch()
+        worker, _ = create_worker(['100'], BatchDecision)
+        worker._other = [worker._decision[0]]
+        assert not worker.can_compute_batch()
+
+    def test_compute(self):
+        devices = ['100', '101']
+        batch_worker, batch_crimp = create_worker(devices, BatchDecision)
+        row_worker, row_crimp = create_worker(devices, BatchDecision, compute_batch=False)
+        for _ in range(3):
+            fill(20, batch_crimp, row_crimp)
+            batch_worker.compute()
+            row_worker.compute()
+            for _, container, _ in batch_crimp.generator_dcr():
+                assert container.flist.position_at_the_end()
+
+        expect = results(row_crimp)
+        assert results(batch_crimp) == expect
+        assert all(len(expect[dev]) == 60 for dev in devices)
+
+    def test_shape(self):
+        class WrongDecision(BatchDecision):
+            @staticmethod
+            def get_function_name() -> str:
+                return 'wrongdecision9004'
+
+            def compute_batch(self, data, status):
+                return np.zeros(1)
+
+        worker, crimp = create_worker(['100'], WrongDecision)
+        fill(5, crimp)
+        with pytest.raises(ValueError):
+            worker.compute()
+
+
+class TestExecutionPlan(object):
+    def test_bind(self, monkeypatch):
+        worker, crimp = create_worker(['100'], RowDecision)
+        decision = worker._decision[0]
+        count = [0]
+        set_cr = BaseFunction.set_cr
+
+        def counter(self, container, result):
+            count[0] += 1
+            set_cr(self, container, result)
+
+        monkeypatch.setattr(BaseFunction, 'set_cr', counter)
+        for _ in range(3):
+            fill(5, crimp)
+            worker.compute()
+        # 单点位只需要绑定一次数据接口
+        assert count[0] == 2
+        assert decision.container is worker._plan['decision']['100'][0][2]
+
+        # 重置后需要重新绑定
+        worker.reset()
+        assert decision.container is None
+        fill(5, crimp)
+        worker.compute()
+        assert count[0] == 2 + 2 + 2
+        assert decision.container is not None
+        assert crimp.get_cr('100')[1].size() == 20
+
+    def test_set_parameter(self):
+        worker, crimp = create_worker(['100', '101'], RowDecision)
+        decision = worker._decision[0]
+        calls = list()
+
+        def compute():
+            calls.append(decision.container.get_algorithm_id())
+            type(decision).compute(decision)
+
+        def set_parameter(parameter):
+            # 设置参数时替换实现
+            decision.compute = compute
+
+        decision.set_parameter = set_parameter
+        worker.set_parameter({decision.get_function_id(): {}})
+        fill(5, crimp)
+        worker.compute()
+        assert calls == ['100', '101'] * 5
+
+
+class TestParallel(object):
+    def test_compute(self, monkeypatch):
+        threads = set()
+        compute = RowDecision.compute
+
+        def thread_compute(self):
+            threads.add(current_thread())
+            compute(self)
+
+        monkeypatch.setattr(RowDecision, 'compute', thread_compute)
+        devices = ['100', '101', '102']
+        parallel_worker, parallel_crimp = create_worker(devices, RowDecision, device_executor='thread')
+        serial_worker, serial_crimp = create_worker(devices, RowDecision)
+        assert parallel_worker.is_parallel() and not serial_worker.is_parallel()
+
+        # 每一个点位拥有独立的算法实例
+        functions = [parallel_worker._plan['decision'][dev][0][0] for dev in devices]
+        assert len(set(map(id, functions))) == 3
+        assert parallel_worker._decision[0] not in functions
+
+        for _ in range(3):
+            fill(20, parallel_crimp, serial_crimp)
+            parallel_worker.compute()
+            assert threads and current_thread() not in threads
+            threads.clear()
+            serial_worker.compute()
+            assert threads == {current_thread()}
+            threads.clear()
+        expect = results(serial_crimp)
+        assert results(parallel_crimp) == expect
+        assert all(len(expect[dev]) == 60 for dev in devices)
+
+    def test_replica(self):
+        devices = ['100', '101']
+        worker, crimp = create_worker(devices, RowDecision, device_executor='thread')
+        decision = worker._decision[0]
+        parameters = list()
+        resets = list()
+        for fun in worker._generator_function(decision):
+            fun.set_parameter = lambda parameter, fun=fun: parameters.append((fun, parameter))
+            fun.reset = lambda fun=fun: resets.append(fun)
+
+        worker.set_parameter({decision.get_function_id(): {'a': 1}})
+        assert len(parameters) == 3 and len(set(id(fun) for fun, _ in parameters)) == 3
+        assert all(parameter == {'a': 1} for _, parameter in parameters)
+        worker.reset()
+        assert len(resets) == 3
+
+        with pytest.raises(ValueError):
+            create_worker(devices, RowDecision, device_executor='process')
+
+    def test_shutdown(self, monkeypatch):
+        devices = ['100', '101']
+        worker, crimp = create_worker(devices, RowDecision, device_executor='thread')
+        monkeypatch.setattr(worker, 'logger_info', lambda msg: None)
+        for shutdown in [worker.clear, lambda: worker.disconnect([])]:
+            fill(5, crimp)
+            worker.compute()
+            pool = worker._device_pool
+            assert pool is not None
+            # 清空与断线时关闭线程池, 之后的计算重新创建线程池
+            shutdown()
+            assert worker._device_pool is None and pool._shutdown
+        fill(5, crimp)
+        worker.compute()
+        assert worker._device_pool is not None
+        worker.clear()
@@ -0,0 +1,193 @@
+"""
+
+@create on: 2026.10.18
+"""
+import random
+from itertools import chain, compress
+
+import numpy as np
+
+from scdap.util.tc import DATETIME_MIN_TIMESTAMP
+from scdap.frame.worker.md_base import TimeAligner
+from scdap.frame.worker.md_normal_realtime import MDNormalRealTimeWorker
+
+
+class _FList(object):
+    def __init__(self, times):
+        self.times = list(times)
+        self.position = -1
+
+    def size(self):
+        return len(self.times)
+
+    def get_all_time_ms(self, start=None, stop=None):
+        return np.array(self.times[start:stop], dtype=np.int64)
+
+    def remove(self, index):
+        del self.times[index]
+
+    def get_time(self):
+        return self.times[self.position]
+
+
+class _Container(object):
+    def __init__(self, times):
+        self.flist = _FList(times)
+        self._generation = 0
+
+    def size(self):
+        return self.flist.size()
+
+    def generation(self):
+        return self._generation
+
+    def clear(self):
+        self._generation += 1
+        self.flist = _FList([])
+
+    def next(self):
+        self.flist.position += 1
+
+    def remove(self, index):
+        self.flist.remove(index)
+
+
+class _Crimp(object):
+    def __init__(self, containers):
+        self.containers = containers
+
+    def get_container(self, dev):
+        return self.containers[int(dev)]
+
+    def copy_ldcr(self):
+        return [(str(i), c, None) for i, c in enumerate(self.containers)]
+
+
+def reference(times_list, data_delta, max_delay):
+    """
+    原本基于python列表的时间对齐实现, 返回每一次抛出的(时间, 设备)
+    """
+    times_list = [list(times) for times in times_list]
+    align_time = list()
+    for times in times_list:
+        prev, first, index = DATETIME_MIN_TIMESTAMP, True, 0
+        while index < len(times):
+            time = times[index] - times[index] % 1000
+            if time > prev:
+                first = True
+            elif first and time == prev:
+                time = prev + data_delta
+                first = False
+            else:
+                del times[index]
+                continue
+            prev = times[index] = time
+            index += 1
+        align_time.append(times)
+
+    timeline = sorted(set(chain.from_iterable(align_time)))
+    rdict = {t: [0] * len(align_time) for t in timeline}
+    for i, times in enumerate(align_time):
+        for t in times:
+            rdict[t][i] = 1
+    align_val = [rdict[t] for t in timeline]
+
+    output = list()
+    index = 0
+    for i in range(len(align_val)):
+        if index + max_delay <= i or sum(align_val[i]) == len(align_time):
+            for index in range(index, i + 1):
+                output.append((timeline[index], tuple(compress(range(len(align_time)), align_val[index]))))
+            index += 1
+    return align_time, output
+
+
+def random_times(size):
+    times = list()
+    now = 1600000000000
+    for _ in range(size):
+        now += random.choice([0, 0, 300, 1000, 1000, 1000, 2000, -1000])
+        times.append(now)
+    return times
+
+
+class TestTimeAligner(object):
+    def test_reconvert(self):
+        base = 1600000000000
+        aligner = TimeAligner(2, 1000)
+        containers = [_Container([base + t for t in [1000, 2500, 2999, 2000, 4000]]),
+                      _Container([base + t for t in [1000, 2000, 3000]])]
+        times = aligner.reconvert(containers)
+        # 重复一次的时间 + data_delta, 第二次重复以及顺序错误的数据被移除
+        assert (times[0] - base).tolist() == [1000, 2000, 3000, 4000]
+        assert containers[0].flist.times == [base + t for t in [1000, 2500, 2999, 4000]]
+        assert (times[1] - base).tolist() == [1000, 2000, 3000]
+
+        # 只转换新到达的数据
+        containers[1].flist.times.extend([base + 3000, base + 5000])
+        times = aligner.reconvert(containers)
+        assert (times[1] - base).tolist() == [1000, 2000, 3000, 4000, 5000]
+
+        timeline, presence = aligner.align(times)
+        assert (timeline - base).tolist() == [1000, 2000, 3000, 4000, 5000]
+        assert presence.tolist() == [[True, True]] * 4 + [[False, True]]
+
+        # 容器被清空后重新转换, 但是保留之前的时间状态
+        containers[0].clear()
+        containers[0].flist.times = [base + 4000, base + 6000]
+        assert (aligner.reconvert(containers)[0] - base).tolist() == [5000, 6000]
+
+    def test_multi_tick(self):
+        base = 1700000000000
+        aligner = TimeAligner(2, 1000)
+        containers = [_Container([base + t for t in [1000, 2000]]), _Container([base + t for t in [1000, 2000]])]
+        aligner.reconvert(containers)
+
+        # 每一次计算结束后容器都会被清空, 下一批数据的数量不少于上一批
+        for cont in containers:
+            cont.clear()
+        containers[0].flist.times = [base + t for t in [3000, 4000, 5000]]
+        containers[1].flist.times = [base + t for t in [3000, 4000]]
+        times = aligner.reconvert(containers)
+        assert (times[0] - base).tolist() == [3000, 4000, 5000]
+        assert (times[1] - base).tolist() == [3000, 4000]
+
+        for cont in containers:
+            cont.clear()
+        containers[0].flist.times = [base + t for t in [5000, 6000, 7000]]
+        containers[1].flist.times = [base + t for t in [5000, 6000, 7000]]
+        times = aligner.reconvert(containers)
+        # 重复一次的时间 + data_delta, 与修改后的时间重复的数据被移除
+        assert (times[0] - base).tolist() == [6000, 7000]
+        assert containers[0].flist.times == [base + 5000, base + 7000]
+        assert (times[1] - base).tolist() == [5000, 6000, 7000]
+
+    def test_reference(self):
+        random.seed(0)
+        for _ in range(50):
+            times_list = [random_times(random.randint(0, 40)) for _ in range(3)]
+            if not any(times_list):
+                continue
+            expect_times, expect_output = reference(times_list, 1000, 5)
+
+            containers = [_Container(times) for times in times_list]
+            worker = MDNormalRealTimeWorker.__new__(MDNormalRealTimeWorker)
+            worker._devices = ('0', '1', '2')
+            worker._crimp = _Crimp(containers)
+            worker._max_delay = 5
+            worker._aligner = TimeAligner(3, 1000)
+            assert [t.tolist() for t in worker.reconvert()] == expect_times
+            worker._aligner.reset()
+
+            output = list()
+            timeline = np.unique(np.concatenate(expect_times)).tolist()
+            positions = [0] * 3
+            for devices, _, _ in worker._dcr_loop_generator_sync():
+                devices = tuple(int(dev) for dev in devices)
+                times = set(expect_times[d][positions[d]] for d in devices)
+                for d in devices:
+                    positions[d] += 1
+                assert len(times) == 1
+                output.append((times.pop(), devices))
+            assert output == expect_output
+            assert all(t in timeline for t, _ in output)
@@ -2,10 +2,17 @@
 
 @create on: 2021.01.13
 """
+from typing import List
+
 import pytest
 from scdap.wp import Context
+from scdap.flag import column
+from scdap.data import STORAGE_RING
+from scdap.frame.function import BaseDecision
+from scdap.frame.worker.normal_stack import ResultCache, NormalStackWorker
 
 from unittests.flist_utils import random_flist
+from .test_compute_batch import _Information, _Crimp, fill
 
 from .function import Evaluation2, evaluation2_compute
 from .function import Evaluation3, evaluation3_compute
@@ -119,3 +126,119 @@ class TestStackRealtime(object):
             assert context.crimp.get_result(dev).size(), len(score[dev])
             assert status[dev] == list(context.crimp.get_result(dev).rlist.get_all_status())
             assert score[dev] == list(context.crimp.get_result(dev).rlist.get_all_score())
+
+
+class TestResultCache(object):
+    def test_generator_cache(self):
+        columns = ['time', 'meanhf']
+        for storage in [None, STORAGE_RING]:
+            flist = random_flist('100', columns, 10)
+            cache = ResultCache('100', columns, 100, storage)
+            cache.cache_flist(flist, 0, 6)
+            cache.cache_flist(flist, 6)
+            assert cache.flist.size() == 10
+            for i in range(4):
+                cache.add_result(i, flist.get_time(i))
+
+            # 结果数据与特征一一对应
+            generator = cache.generator_cache()
+            for i in range(2):
+                feature, status, time, raw = next(generator)
+                assert raw is None and  status == i and time == flist.get_time(i) and feature.meanhf == flist.get_meanhf(i)
+            # 中途结束时只移除已经抛出的特征
+            generator.close()
+            assert cache.size() == 2 and cache.flist.size() == 8
+
+            result = [(feature.meanhf, status) for feature, status, _, _ in cache.generator_cache()]
+            assert result == [(flist.get_meanhf(i), i) for i in range(2, 4)]
+            assert cache.size() == 0
+            assert cache.flist.size() == 6
+            assert cache.flist.get_meanhf(0) == flist.get_meanhf(4)
+
+
+class VisibleDecision(_Information, BaseDecision):
+    """
+    每一笔数据都输出结果, 并记录计算时数据容器中的数据数量以及指针位置
+    """
+    crimp = None
+    visible = list()
+
+    def is_realtime_function(self) -> bool:
+        return False
+
+    def get_column(self) -> List[str]:
+        return [column.meanhf]
+
+    @staticmethod
+    def get_function_name() -> str:
+        return 'visibledecision9101'
+
+    def compute(self):
+        container = self.crimp.get_cr(self.container.get_algorithm_id())[0]
+        self.visible.append((container.size(), container.flist.get_position()))
+        self.result.add_result(0, self.container.get_time())
+
+
+def create_stack_worker(devices, decision):
+    crimp = _Crimp(devices)
+    worker = NormalStackWorker(devices[0], tuple(devices), crimp, [{'function': decision}], [], debug=True)
+    worker.initial()
+    for _, container, result in crimp.generator_dcr():
+        container.bind_worker(worker)
+        result.bind_worker(worker)
+    worker.bind_crimp()
+    return worker, crimp
+
+
+class TestStackVisibility(object):
+    def test_decision_visibility(self):
+        worker, crimp = create_stack_worker(['100'], VisibleDecision)
+        VisibleDecision.crimp = crimp
+        VisibleDecision.visible = list()
+        for size in [3, 5]:
+            fill(size, crimp)
+            worker.compute()
+            # 识别算法可以获取到本次计算中之前的数据, 但是无法获取到之前计算中的数据
+            assert VisibleDecision.visible == [(size, i) for i in range(size)]
+            assert crimp.get_cr('100')[0].size() == size
+            VisibleDecision.visible.clear()
+            crimp.get_cr('100')[0].clear()
+            crimp.get_cr('100')[1].clear()
+
+
+class HalfDecision(VisibleDecision):
+    """
+    每两笔数据输出一次结果, 结果对应最早未输出结果的数据
+    """
+
+    @staticmethod
+    def get_function_name() -> str:
+        return 'halfdecision9102'
+
+    count = 0
+
+    def compute(self):
+        self.count += 1
+        if self.count % 2 == 0:
+            self.result.add_result(0, self.container.get_time())
+
+
+class TestStackRaw(object):
+    def test_raw(self):
+        worker, crimp = create_stack_worker(['100'], HalfDecision)
+        container, result = crimp.get_cr('100')
+        emitted = list()
+        for tick, size in enumerate([3, 5, 4]):
+            fill(size, crimp)
+            container.extend_raw([f'{tick}-{i}' for i in range(size)])
+            worker.compute()
+            # 原始数据需要与重新放回容器的特征一一对应
+            raws = container.get_raw()
+            assert raws is not None and len(raws) == container.size()
+            emitted.extend(raws)
+            container.clear()
+            result.clear()
+        # 未输出结果的数据与其原始数据一同缓存至下一次计算
+        expect = [f'{tick}-{i}' for tick, size in enumerate([3, 5, 4]) for i in range(size)]
+        assert emitted == expect[:len(emitted)]
+        assert len(emitted) == len(expect) // 2
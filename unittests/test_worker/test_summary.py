@@ -0,0 +1,92 @@
+"""
+
+@create on: 2026.10.18
+"""
+import time
+from threading import current_thread
+
+import pytest
+
+from scdap.frame.worker.base import BaseWorker
+from scdap.frame.worker.summary import SummaryWorker, SUB_EXECUTOR_SERIAL, SUB_EXECUTOR_THREAD
+
+
+class _SubWorker(object):
+    def __init__(self, name, output, delay=0., error=None):
+        self.name = name
+        self.output = output
+        self.delay = delay
+        self.error = error
+        self.thread = None
+
+    def __call__(self):
+        self.thread = current_thread()
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        self.output.append(self.name)
+
+    def clear(self):
+        pass
+
+
+def create_worker(executor, sub_workers):
+    worker = SummaryWorker.__new__(SummaryWorker)
+    worker._sub_executor = executor
+    worker._sub_pool_size = 0
+    worker._pool = None
+    worker._device_pool = None
+    worker._sub_shared = False
+    worker._sub_worker = {sub.name: sub for sub in sub_workers}
+    return worker
+
+
+class TestSummaryWorker(object):
+    def test_serial(self):
+        output = list()
+        worker = create_worker(SUB_EXECUTOR_SERIAL, [_SubWorker(str(i), output) for i in range(5)])
+        worker._compute_sub_worker()
+        assert output == [str(i) for i in range(5)]
+        assert all(sub.thread is current_thread() for sub in worker.sub_workers().values())
+
+    def test_thread(self):
+        output = list()
+        worker = create_worker(SUB_EXECUTOR_THREAD, [_SubWorker(str(i), output, 0.1) for i in range(5)])
+        start = time.time()
+        worker._compute_sub_worker()
+        assert time.time() - start < 0.4
+        assert sorted(output) == [str(i) for i in range(5)]
+        assert all(sub.thread is not current_thread() for sub in worker.sub_workers().values())
+
+        # 共享点位时按顺序计算
+        output.clear()
+        worker._sub_shared = True
+        worker._compute_sub_worker()
+        assert output == [str(i) for i in range(5)]
+
+    def test_thread_exception(self):
+        output = list()
+        # 不论执行的先后顺序, 都按照配置的顺序抛出异常, 并且等待所有的子算法工作组计算完毕
+        worker = create_worker(SUB_EXECUTOR_THREAD, [
+            _SubWorker('0', output, 0.1, KeyError('0')),
+            _SubWorker('1', output, 0., ValueError('1')),
+            _SubWorker('2', output, 0.1),
+        ])
+        with pytest.raises(KeyError):
+            worker._compute_sub_worker()
+        assert output == ['2']
+
+    def test_shutdown(self, monkeypatch):
+        monkeypatch.setattr(BaseWorker, 'disconnect', lambda self, nodes: None)
+        output = list()
+        worker = create_worker(SUB_EXECUTOR_THREAD, [_SubWorker(str(i), output) for i in range(2)])
+        for shutdown in [worker.clear, lambda: worker.disconnect([])]:
+            worker._compute_sub_worker()
+            pool = worker._pool
+            assert pool is not None
+            # 清空与断线时关闭线程池, 之后的计算重新创建线程池
+            shutdown()
+            assert worker._pool is None and pool._shutdown
+        worker._compute_sub_worker()
+        assert worker._pool is not None and len(output) == 6
+        worker.clear()